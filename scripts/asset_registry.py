@@ -0,0 +1,242 @@
+import csv
+import hashlib
+import json
+import zlib
+from collections import namedtuple
+from pathlib import Path
+from config import ASSETS, MOEDAS, INTERVALO_COLETA, REGISTRO_ATIVOS, SHARD, HORARIOS_MERCADO
+from database_manager import criar_tabela_ativos, listar_ativos
+from quote_cache import mercado_do_simbolo
+from logger_config import logger
+
+# Um instrumento do registro; intervalo None = todo tique | One registry instrument; intervalo None = every tick
+Ativo = namedtuple("Ativo", ["simbolo", "nome", "classe", "mercado", "intervalo"])
+
+CLASSES = ("acoes", "moedas")
+
+
+def shard_do_simbolo(classe, simbolo, total):
+    """
+    Retorna a fatia (0..total-1) dona de um símbolo, por hashing de rendezvous.
+    Returns the slice (0..total-1) that owns a symbol, by rendezvous hashing.
+
+    O resultado só depende do símbolo e do total, igual em qualquer processo ou host; ao passar
+    de N para N+1 fatias, só cerca de 1/(N+1) dos símbolos muda de dono.
+    The result only depends on the symbol and the total, the same on any process or host; going
+    from N to N+1 slices, only about 1/(N+1) of the symbols change owner.
+    """
+    def peso(indice):
+        return hashlib.blake2b(f"{indice}:{classe}:{simbolo}".encode(), digest_size=8).digest()
+
+    return max(range(total), key=peso)
+
+def interpretar_shard(texto):
+    """
+    Converte "índice/total" (ex.: "2/8") em (índice, total).
+    Converts "index/total" (e.g. "2/8") into (index, total).
+    """
+    indice, total = (int(parte) for parte in str(texto).split("/"))
+    if not 0 <= indice < total:
+        raise ValueError(f"shard inválido: {texto} | invalid shard: {texto}")
+    return indice, total
+
+def _novo_ativo(simbolo, nome, classe, mercado=None, intervalo=None):
+    """
+    Valida os campos de um ativo e completa o mercado a partir do símbolo.
+    Validates an asset's fields and fills in the market from the symbol.
+    """
+    if classe not in CLASSES:
+        raise ValueError(f"classe inválida para {simbolo}: {classe} | invalid class for {simbolo}: {classe}")
+    # O cache usa o mercado para saber o horário do pregão | The cache uses the market to know the session hours
+    if mercado and mercado not in HORARIOS_MERCADO:
+        raise ValueError(f"mercado inválido para {simbolo}: {mercado} | invalid market for {simbolo}: {mercado}")
+    intervalo = float(intervalo) if intervalo not in (None, "") else None
+    return Ativo(str(simbolo), str(nome), classe, mercado or mercado_do_simbolo(classe, simbolo), intervalo)
+
+class RegistroAtivos:
+    """
+    Universo de símbolos com metadados (classe, mercado, intervalo de consulta), fatiável entre coletores.
+    Symbol universe with metadata (class, market, poll interval), sliceable across collectors.
+
+    Os símbolos de cada classe são agrupados pelo número de tiques entre consultas: símbolos
+    "quentes" (intervalo curto) são consultados com mais frequência que os "frios". Dentro de um
+    grupo de N tiques, cada símbolo tem uma fase fixa (hash), de modo que cada tique consulta
+    cerca de 1/N do grupo em vez de todos vencerem juntos.
+    Each class's symbols are grouped by the number of ticks between polls: "hot" symbols (short
+    interval) are polled more often than "cold" ones. Within a group of N ticks, each symbol
+    has a fixed (hash) phase, so each tick polls about 1/N of the group instead of all of them
+    coming due together.
+
+    Args:
+        ativos (iterable): Instâncias de Ativo.
+                           Ativo instances.
+        intervalo_base (float): Segundos entre tiques do agendador.
+                                Seconds between scheduler ticks.
+    """
+
+    def __init__(self, ativos, intervalo_base=INTERVALO_COLETA):
+        self.intervalo_base = intervalo_base
+        self.ativos = {}
+        for ativo in ativos:
+            chave = (ativo.classe, ativo.simbolo)
+            if chave in self.ativos:
+                logger.warning(f"Ativo repetido no registro: {ativo.simbolo} | Duplicate asset in the registry: {ativo.simbolo}")
+            self.ativos[chave] = ativo
+        # Classe -> tiques entre consultas -> uma fase por tique, para espalhar a carga do grupo
+        # Class -> ticks between polls -> one phase per tick, to spread the group's load
+        self._grupos = {classe: {} for classe in CLASSES}
+        for ativo in self.ativos.values():
+            passos = 1 if ativo.intervalo is None else max(1, round(ativo.intervalo / intervalo_base))
+            fases = self._grupos[ativo.classe].setdefault(passos, [{} for _ in range(passos)])
+            fases[zlib.crc32(ativo.simbolo.encode()) % passos][ativo.simbolo] = ativo.nome
+
+    @classmethod
+    def de_config(cls, assets=ASSETS, moedas=MOEDAS, intervalo_base=INTERVALO_COLETA):
+        """
+        Monta o registro a partir dos dicionários de config.py, todos consultados a cada tique.
+        Builds the registry from config.py's dictionaries, all polled on every tick.
+        """
+        ativos = [_novo_ativo(simbolo, nome, "acoes") for simbolo, nome in assets.items()]
+        ativos += [_novo_ativo(simbolo, nome, "moedas") for simbolo, nome in moedas.items()]
+        return cls(ativos, intervalo_base)
+
+    @classmethod
+    def de_arquivo(cls, caminho, intervalo_base=INTERVALO_COLETA):
+        """
+        Carrega o registro de um CSV (cabeçalho simbolo,nome,classe[,mercado][,intervalo]) ou de uma lista JSON.
+        Loads the registry from a CSV (header simbolo,nome,classe[,mercado][,intervalo]) or a JSON list.
+
+        Args:
+            caminho (str): Arquivo .csv ou .json.
+                           .csv or .json file.
+            intervalo_base (float): Segundos entre tiques do agendador.
+                                    Seconds between scheduler ticks.
+        """
+        caminho = Path(caminho)
+        with open(caminho, encoding="utf-8", newline="") as arquivo:
+            linhas = json.load(arquivo) if caminho.suffix.lower() == ".json" else list(csv.DictReader(arquivo))
+        ativos = []
+        for numero, linha in enumerate(linhas, start=1):
+            try:
+                ativos.append(_novo_ativo(
+                    linha["simbolo"], linha["nome"], linha["classe"], linha.get("mercado"), linha.get("intervalo")
+                ))
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"{caminho}, registro {numero}: {e} | {caminho}, record {numero}: {e}") from e
+        logger.info(f"{len(ativos)} ativos carregados de {caminho} | {len(ativos)} assets loaded from {caminho}")
+        return cls(ativos, intervalo_base)
+
+    @classmethod
+    def do_banco(cls, pool, intervalo_base=INTERVALO_COLETA):
+        """
+        Carrega o registro da tabela "ativos" (criada vazia se não existir).
+        Loads the registry from the "ativos" table (created empty if it does not exist).
+
+        Args:
+            pool (PoolConexoes): Pool de conexões.
+                                 Connection pool.
+            intervalo_base (float): Segundos entre tiques do agendador.
+                                    Seconds between scheduler ticks.
+        """
+        def carregar(cursor):
+            criar_tabela_ativos(cursor)
+            return listar_ativos(cursor)
+
+        ativos = [_novo_ativo(*linha) for linha in pool.executar(carregar)]
+        logger.info(f"{len(ativos)} ativos carregados do banco | {len(ativos)} assets loaded from the database")
+        return cls(ativos, intervalo_base)
+
+    def __len__(self):
+        return len(self.ativos)
+
+    def fatia(self, indice, total):
+        """
+        Retorna o registro só com os símbolos da fatia; as fatias de 0 a total-1 são disjuntas e cobrem tudo.
+        Returns the registry with only the slice's symbols; slices 0 to total-1 are disjoint and cover everything.
+
+        Args:
+            indice (int): Fatia deste coletor.
+                          This collector's slice.
+            total (int): Quantidade de coletores.
+                         Number of collectors.
+        """
+        if total == 1:
+            return self
+        ativos = [a for a in self.ativos.values() if shard_do_simbolo(a.classe, a.simbolo, total) == indice]
+        return RegistroAtivos(ativos, self.intervalo_base)
+
+    def simbolos(self, classe):
+        """
+        Retorna todos os símbolos da classe, no formato de ASSETS/MOEDAS (símbolo -> nome).
+        Returns all symbols of the class, in the ASSETS/MOEDAS format (symbol -> name).
+        """
+        return {
+            simbolo: nome
+            for fases in self._grupos[classe].values() for fase in fases for simbolo, nome in fase.items()
+        }
+
+    def mercados(self, classe):
+        """
+        Retorna o mercado de cada símbolo da classe (símbolo -> chave de HORARIOS_MERCADO).
+        Returns each class symbol's market (symbol -> HORARIOS_MERCADO key).
+        """
+        return {ativo.simbolo: ativo.mercado for ativo in self.ativos.values() if ativo.classe == classe}
+
+    def devidos(self, classe, tique):
+        """
+        Retorna os símbolos da classe que vencem no tique (símbolo -> nome).
+        Returns the class symbols due on the tick (symbol -> name).
+
+        Args:
+            classe (str): "acoes" ou "moedas".
+                          "acoes" or "moedas".
+            tique (float): Horário do tique, alinhado ao relógio pelo Agendador.
+                           Tick time, aligned to the wall clock by the Agendador.
+        """
+        numero = round(tique / self.intervalo_base)
+        devidos = {}
+        for passos, fases in self._grupos[classe].items():
+            devidos.update(fases[numero % passos])
+        return devidos
+
+    def resumo(self):
+        """
+        Retorna a quantidade de símbolos por classe e por intervalo de consulta (em segundos).
+        Returns the number of symbols per class and per poll interval (in seconds).
+        """
+        return {
+            classe: {passos * self.intervalo_base: sum(map(len, fases)) for passos, fases in sorted(grupos.items())}
+            for classe, grupos in self._grupos.items()
+        }
+
+def carregar_registro(origem=REGISTRO_ATIVOS, shard=SHARD, pool=None, intervalo_base=INTERVALO_COLETA):
+    """
+    Carrega o registro da origem configurada e devolve só a fatia deste coletor.
+    Loads the registry from the configured source and returns only this collector's slice.
+
+    Args:
+        origem (str, optional): Arquivo CSV/JSON, "banco", ou None para ASSETS e MOEDAS.
+                                CSV/JSON file, "banco", or None for ASSETS and MOEDAS.
+        shard (str): Fatia deste coletor, "índice/total".
+                     This collector's slice, "index/total".
+        pool (PoolConexoes, optional): Pool de conexões, obrigatório com "banco".
+                                       Connection pool, required with "banco".
+        intervalo_base (float): Segundos entre tiques do agendador.
+                                Seconds between scheduler ticks.
+
+    Returns:
+        RegistroAtivos: Registro da fatia.
+                        Slice registry.
+    """
+    if origem is None:
+        registro = RegistroAtivos.de_config(intervalo_base=intervalo_base)
+    elif origem == "banco":
+        if pool is None:
+            raise ValueError("registro no banco exige um pool | database registry requires a pool")
+        registro = RegistroAtivos.do_banco(pool, intervalo_base)
+    else:
+        registro = RegistroAtivos.de_arquivo(origem, intervalo_base)
+    indice, total = interpretar_shard(shard)
+    fatia = registro.fatia(indice, total)
+    logger.info(f"Fatia {indice}/{total} do registro: {fatia.resumo()} | Registry slice {indice}/{total}: {fatia.resumo()}")
+    return fatia
@@ -0,0 +1,383 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from functools import partial
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import yfinance as yf
+from concurrency import executar_em_paralelo
+from config import (
+    HOST_YAHOO, TIMEOUT_HTTP, MAX_WORKERS, TAMANHO_LOTE_ACOES, DIAS_POR_TAREFA_BACKFILL,
+    TAREFAS_POR_ONDA_BACKFILL, CAMINHO_CHECKPOINT_BACKFILL
+)
+from cycle_batch import LoteCotacoes
+from data_collector import extrair_fechamentos
+from database_manager import carregar_arquivo_local, registros_para_colunas
+from file_handler import CAMINHO_DATASET, EscritorDataset
+from history_reader import carregar_precos
+from resilience import executar_resiliente
+from logger_config import logger
+
+# Dias baixados antes do início de cada tarefa para achar o fechamento anterior (feriados e fins de semana)
+# Days downloaded before each task's start to find the previous close (holidays and weekends)
+DIAS_AQUECIMENTO = 10
+
+# Destinos aceitos e se gravam no dataset e/ou no banco | Accepted destinations and whether they write to the dataset and/or database
+DESTINOS = {"dataset": (True, False), "banco": (False, True), "ambos": (True, True)}
+
+
+def _como_data(valor):
+    return valor if isinstance(valor, date) else date.fromisoformat(str(valor))
+
+def baixar_historico_yfinance(simbolos, inicio, fim):
+    """
+    Baixa o histórico diário de vários símbolos em [inicio, fim) em uma única requisição ao Yahoo.
+    Downloads the daily history of several symbols in [inicio, fim) in a single Yahoo request.
+
+    Args:
+        simbolos (list): Lista de símbolos.
+                         List of symbols.
+        inicio (date): Primeiro dia (inclusive).
+                       First day (inclusive).
+        fim (date): Último dia (exclusive).
+                    Last day (exclusive).
+
+    Returns:
+        DataFrame: Histórico com colunas (campo, símbolo).
+                   History with (field, symbol) columns.
+    """
+    return yf.download(
+        tickers=list(simbolos),
+        start=inicio.isoformat(),
+        end=fim.isoformat(),
+        interval="1d",
+        group_by="column",
+        auto_adjust=True,
+        threads=True,
+        progress=False,
+        timeout=TIMEOUT_HTTP[1],
+    )
+
+def transporte_historico_fixture(caminho):
+    """
+    Cria um transporte de histórico que lê um download gravado com gravar_fixture, para testes offline.
+    Creates a history transport that reads a download recorded with gravar_fixture, for offline runs.
+
+    Args:
+        caminho (str): Caminho do arquivo pickle (gravado com um período longo, ex.: "max").
+                       Path to the pickle file (recorded with a long period, e.g. "max").
+
+    Returns:
+        function: Transporte compatível com baixar_historico_yfinance.
+                  Transport compatible with baixar_historico_yfinance.
+    """
+    fechamentos = pd.read_pickle(caminho)["Close"]
+    datas = pd.DatetimeIndex(fechamentos.index).tz_localize(None).normalize()
+
+    def baixar(simbolos, inicio, fim):
+        linhas = (datas >= pd.Timestamp(inicio)) & (datas < pd.Timestamp(fim))
+        colunas = [s for s in simbolos if s in fechamentos.columns]
+        return pd.concat({"Close": fechamentos.loc[linhas, colunas]}, axis=1)
+
+    return baixar
+
+def dividir_tarefas(simbolos, inicio, fim, simbolos_por_tarefa=TAMANHO_LOTE_ACOES, dias_por_tarefa=DIAS_POR_TAREFA_BACKFILL):
+    """
+    Divide o intervalo de datas x conjunto de símbolos em tarefas (símbolos, início, fim).
+    Splits the date range x symbol set into (symbols, start, end) tasks.
+
+    As tarefas saem em ordem de data e depois de símbolos, para que cada onda cubra poucas
+    partições de data do dataset.
+    Tasks come out ordered by date and then by symbols, so each wave covers few dataset date
+    partitions.
+
+    Args:
+        simbolos (list): Símbolos a preencher.
+                         Symbols to fill.
+        inicio (date): Primeiro dia (inclusive).
+                       First day (inclusive).
+        fim (date): Último dia (exclusive).
+                    Last day (exclusive).
+        simbolos_por_tarefa (int): Símbolos por requisição.
+                                   Symbols per request.
+        dias_por_tarefa (int): Dias de histórico por requisição.
+                               History days per request.
+
+    Returns:
+        list: Tuplas (símbolos, início, fim).
+              (symbols, start, end) tuples.
+    """
+    simbolos = sorted(simbolos)
+    tarefas = []
+    dia = inicio
+    while dia < fim:
+        proximo = min(fim, dia + timedelta(days=dias_por_tarefa))
+        for posicao in range(0, len(simbolos), simbolos_por_tarefa):
+            tarefas.append((tuple(simbolos[posicao:posicao + simbolos_por_tarefa]), dia, proximo))
+        dia = proximo
+    return tarefas
+
+def chave_tarefa(tarefa):
+    """
+    Identificador estável de uma tarefa, usado no checkpoint.
+    Stable task identifier, used in the checkpoint.
+    """
+    simbolos, inicio, fim = tarefa
+    resumo = hashlib.sha1(",".join(simbolos).encode()).hexdigest()[:12]
+    return f"{inicio.isoformat()}:{fim.isoformat()}:{resumo}"
+
+class CheckpointBackfill:
+    """
+    Registro em SQLite das tarefas já gravadas, para que um backfill interrompido continue de onde parou.
+    SQLite record of the tasks already written, so an interrupted backfill resumes where it stopped.
+
+    Uma tarefa só é marcada depois que sua onda foi gravada em todos os destinos.
+    A task is only marked after its wave has been written to every destination.
+
+    Args:
+        caminho (str): Arquivo SQLite (":memory:" para não persistir).
+                       SQLite file (":memory:" to not persist).
+    """
+
+    def __init__(self, caminho):
+        self._lock = threading.Lock()
+        self._banco = sqlite3.connect(str(caminho), check_same_thread=False)
+        self._banco.execute("""
+            CREATE TABLE IF NOT EXISTS tarefas_concluidas (
+                destino TEXT, chave TEXT, linhas INTEGER, concluida REAL,
+                PRIMARY KEY (destino, chave)
+            )
+        """)
+        self._banco.commit()
+
+    def concluidas(self, destino):
+        """
+        Retorna as chaves das tarefas concluídas para um destino.
+        Returns the keys of the tasks completed for a destination.
+        """
+        with self._lock:
+            return {chave for (chave,) in self._banco.execute(
+                "SELECT chave FROM tarefas_concluidas WHERE destino = ?", (destino,)
+            )}
+
+    def marcar(self, destino, linhas_por_chave):
+        """
+        Marca tarefas como concluídas.
+        Marks tasks as completed.
+
+        Args:
+            destino (str): "dataset", "banco" ou "ambos".
+                           "dataset", "banco" or "ambos".
+            linhas_por_chave (dict): Chave da tarefa -> linhas gravadas.
+                                     Task key -> rows written.
+        """
+        with self._lock:
+            self._banco.executemany(
+                "INSERT OR REPLACE INTO tarefas_concluidas (destino, chave, linhas, concluida) VALUES (?, ?, ?, ?)",
+                [(destino, chave, linhas, time.time()) for chave, linhas in linhas_por_chave.items()]
+            )
+            self._banco.commit()
+
+    def fechar(self):
+        with self._lock:
+            self._banco.close()
+
+def _baixar_tarefa(tarefa, baixar, limite=None):
+    """
+    Baixa uma tarefa e calcula cotação e variação diária de cada símbolo em formato longo.
+    Downloads one task and computes each symbol's daily quote and change in long format.
+
+    Returns:
+        DataFrame: Colunas "simbolo", "horario" (segundos), "cotacao" e "variacao".
+                   Columns "simbolo", "horario" (seconds), "cotacao" and "variacao".
+
+    Raises:
+        RuntimeError: Se o Yahoo devolver um histórico vazio ou curto; a onda conta a tarefa como
+                      falha e ela é repetida na próxima execução.
+                      If Yahoo returns an empty or short history; the wave counts the task as
+                      failed and it is retried on the next run.
+    """
+    simbolos, inicio, fim = tarefa
+
+    def requisitar():
+        historico = baixar(list(simbolos), inicio - timedelta(days=DIAS_AQUECIMENTO), fim)
+        # Com o aquecimento sempre há dois pregões; menos que isso é falha do Yahoo, não lacuna a gravar no checkpoint
+        # With the warm-up there are always two sessions; fewer is a Yahoo failure, not a gap to record in the checkpoint
+        if historico is None or len(historico) < 2:
+            raise RuntimeError(f"histórico vazio ou curto do Yahoo para {len(simbolos)} símbolos | "
+                               f"empty or short Yahoo history for {len(simbolos)} symbols")
+        return historico
+
+    historico = executar_resiliente(HOST_YAHOO, requisitar, limite)
+    fechamentos = extrair_fechamentos(historico, simbolos)
+
+    # Cada pregão diário fica com o horário 00:00:00 da sua data | Each daily session gets its date's 00:00:00 timestamp
+    datas = pd.DatetimeIndex(fechamentos.index)
+    if datas.tz is not None:
+        datas = datas.tz_localize(None)
+    ordem = np.argsort(datas.to_numpy(), kind="stable")
+    horarios = datas.normalize().to_numpy(dtype="datetime64[s]").astype(np.int64)[ordem]
+    precos = fechamentos.to_numpy(dtype=np.float64)[ordem]
+
+    # Formato longo símbolo a símbolo, sem os dias sem pregão de cada mercado
+    # Long format symbol by symbol, without each market's non-trading days
+    validos = ~np.isnan(precos.T)
+    cotacoes = precos.T[validos]
+    codigos = np.broadcast_to(np.arange(precos.shape[1])[:, None], validos.shape)[validos]
+    horarios = np.broadcast_to(horarios, validos.shape)[validos]
+    # Fechamento anterior válido do mesmo símbolo | Previous valid close of the same symbol
+    anteriores = np.empty_like(cotacoes)
+    anteriores[1:] = cotacoes[:-1]
+    anteriores[np.r_[True, codigos[1:] != codigos[:-1]]] = np.nan
+    manter = ~np.isnan(anteriores) & (horarios >= int(pd.Timestamp(inicio).timestamp()))
+    return pd.DataFrame({
+        "simbolo": np.asarray(fechamentos.columns, dtype=object)[codigos[manter]],
+        "horario": horarios[manter],
+        "cotacao": cotacoes[manter],
+        "variacao": (cotacoes[manter] - anteriores[manter]) / anteriores[manter] * 100,
+    })
+
+def _remover_existentes(linhas, raiz):
+    """
+    Remove as linhas cujo (símbolo, horário) já está no dataset, lendo só as partições do intervalo.
+    Removes rows whose (symbol, timestamp) is already in the dataset, reading only the range's partitions.
+    """
+    if linhas.empty:
+        return linhas
+    inicio = pd.Timestamp(int(linhas["horario"].min()), unit="s").to_pydatetime()
+    fim = pd.Timestamp(int(linhas["horario"].max()) + 1, unit="s").to_pydatetime()
+    existentes = carregar_precos(
+        linhas["simbolo"].unique().tolist(), inicio, fim, colunas=["AÇÃO", "HORÁRIO"], raiz=raiz
+    )
+    if not existentes.num_rows:
+        return linhas
+    chaves = pd.MultiIndex.from_arrays([
+        existentes["AÇÃO"].to_numpy(), existentes["HORÁRIO"].cast(pa.int64()).to_numpy()
+    ])
+    repetidas = pd.MultiIndex.from_arrays([linhas["simbolo"], linhas["horario"]]).isin(chaves)
+    return linhas[~repetidas]
+
+def executar_backfill(assets, inicio, fim, destino="dataset", raiz=CAMINHO_DATASET, pool=None,
+                      baixar=baixar_historico_yfinance, max_workers=MAX_WORKERS,
+                      simbolos_por_tarefa=TAMANHO_LOTE_ACOES, dias_por_tarefa=DIAS_POR_TAREFA_BACKFILL,
+                      tarefas_por_onda=TAREFAS_POR_ONDA_BACKFILL, checkpoint=None):
+    """
+    Preenche o histórico diário das ações em paralelo, em ondas gravadas e marcadas no checkpoint.
+    Fills the stocks' daily history in parallel, in waves that are written and checkpointed.
+
+    Cada onda baixa até tarefas_por_onda tarefas com max_workers threads (respeitando o limitador
+    de taxa e o disjuntor do Yahoo), remove as linhas já presentes no dataset, grava no dataset
+    (um arquivo por data) e/ou no banco (LOAD DATA ... REPLACE) e só então marca as tarefas.
+    Tarefas que falharem ficam sem marca e são repetidas na próxima execução.
+    Each wave downloads up to tarefas_por_onda tasks with max_workers threads (honouring Yahoo's
+    rate limiter and circuit breaker), drops rows already in the dataset, writes to the dataset
+    (one file per date) and/or the database (LOAD DATA ... REPLACE) and only then marks the tasks.
+    Failed tasks stay unmarked and are retried on the next run.
+
+    Args:
+        assets (dict): Símbolo -> empresa.
+                       Symbol -> company.
+        inicio (date | str): Primeiro dia (inclusive).
+                             First day (inclusive).
+        fim (date | str): Último dia (exclusive).
+                          Last day (exclusive).
+        destino (str): "dataset", "banco" ou "ambos".
+                       "dataset", "banco" or "ambos".
+        raiz (Path): Diretório raiz do dataset.
+                     Dataset root directory.
+        pool (PoolConexoes, optional): Pool aberto com local_infile=True; obrigatório com o banco.
+                                       Pool opened with local_infile=True; required with the database.
+        baixar (function): Transporte compatível com baixar_historico_yfinance.
+                           Transport compatible with baixar_historico_yfinance.
+        max_workers (int): Tarefas baixadas simultaneamente.
+                           Tasks downloaded concurrently.
+        simbolos_por_tarefa (int): Símbolos por requisição.
+                                   Symbols per request.
+        dias_por_tarefa (int): Dias de histórico por requisição.
+                               History days per request.
+        tarefas_por_onda (int): Tarefas gravadas e marcadas juntas.
+                                Tasks written and checkpointed together.
+        checkpoint (CheckpointBackfill, optional): Checkpoint (padrão: CAMINHO_CHECKPOINT_BACKFILL
+                                                   ou backfill.sqlite ao lado do dataset).
+                                                   Checkpoint (default: CAMINHO_CHECKPOINT_BACKFILL
+                                                   or backfill.sqlite next to the dataset).
+
+    Returns:
+        dict: Tarefas (total, puladas, concluídas, falhas), linhas gravadas e duplicadas,
+              símbolo-dias, segundos e vazão (símbolo-dias/s e linhas/s).
+              Tasks (total, skipped, completed, failed), rows written and duplicated,
+              symbol-days, seconds and throughput (symbol-days/s and rows/s).
+    """
+    no_dataset, no_banco = DESTINOS[destino]
+    if no_banco and pool is None:
+        raise ValueError("backfill no banco exige um pool | database backfill requires a pool")
+    inicio, fim = _como_data(inicio), _como_data(fim)
+    proprio = checkpoint is None
+    if proprio:
+        caminho = CAMINHO_CHECKPOINT_BACKFILL or Path(raiz).parent / "backfill.sqlite"
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        checkpoint = CheckpointBackfill(caminho)
+
+    tarefas = dividir_tarefas(list(assets), inicio, fim, simbolos_por_tarefa, dias_por_tarefa)
+    concluidas = checkpoint.concluidas(destino)
+    pendentes = [tarefa for tarefa in tarefas if chave_tarefa(tarefa) not in concluidas]
+    resumo = {
+        "tarefas": len(tarefas), "puladas": len(tarefas) - len(pendentes), "concluidas": 0, "falhas": 0,
+        "linhas": 0, "duplicadas": 0, "simbolo_dias": 0,
+    }
+    logger.info(f"Backfill de {inicio} a {fim}: {len(pendentes)} de {len(tarefas)} tarefas pendentes | "
+                f"Backfill from {inicio} to {fim}: {len(pendentes)} of {len(tarefas)} tasks pending")
+
+    comeco = time.perf_counter()
+    try:
+        for posicao in range(0, len(pendentes), tarefas_por_onda):
+            onda = pendentes[posicao:posicao + tarefas_por_onda]
+            resultados = executar_em_paralelo([partial(_baixar_tarefa, tarefa, baixar) for tarefa in onda], max_workers)
+            baixadas = [(tarefa, linhas) for tarefa, linhas in zip(onda, resultados) if linhas is not None]
+            resumo["falhas"] += len(onda) - len(baixadas)
+            if not baixadas:
+                continue
+
+            linhas = pd.concat([linhas for _, linhas in baixadas], ignore_index=True)
+            total = len(linhas)
+            linhas = linhas.drop_duplicates(["simbolo", "horario"])
+            if no_dataset:
+                linhas = _remover_existentes(linhas, raiz)
+            resumo["duplicadas"] += total - len(linhas)
+
+            if len(linhas):
+                # Ordem por horário: cada data fecha seu arquivo antes da seguinte | Ordered by time: each date closes its file before the next
+                linhas = linhas.sort_values("horario", kind="stable")
+                lote = LoteCotacoes.de_colunas(
+                    "acoes", linhas["simbolo"], linhas["cotacao"], linhas["variacao"], linhas["horario"], assets
+                )
+                if no_dataset:
+                    with EscritorDataset(raiz) as escritor:
+                        escritor.adicionar("acoes", lote)
+                if no_banco:
+                    colunas = registros_para_colunas("acoes", lote)
+                    pool.executar(lambda cursor: carregar_arquivo_local(cursor, "acoes", colunas))
+
+            checkpoint.marcar(destino, {chave_tarefa(tarefa): len(parcial) for tarefa, parcial in baixadas})
+            resumo["concluidas"] += len(baixadas)
+            resumo["linhas"] += len(linhas)
+            resumo["simbolo_dias"] += sum(len(simbolos) * (ate - de).days for (simbolos, de, ate), _ in baixadas)
+            logger.info(f"Backfill: {resumo['concluidas'] + resumo['puladas']}/{len(tarefas)} tarefas, "
+                        f"{resumo['linhas']} linhas | Backfill: {resumo['concluidas'] + resumo['puladas']}/{len(tarefas)} "
+                        f"tasks, {resumo['linhas']} rows")
+    finally:
+        if proprio:
+            checkpoint.fechar()
+
+    segundos = time.perf_counter() - comeco
+    resumo["segundos"] = segundos
+    resumo["simbolo_dias_por_segundo"] = resumo["simbolo_dias"] / segundos if segundos else 0.0
+    resumo["linhas_por_segundo"] = resumo["linhas"] / segundos if segundos else 0.0
+    if resumo["falhas"]:
+        logger.warning(f"{resumo['falhas']} tarefas falharam e serão repetidas na próxima execução | "
+                       f"{resumo['falhas']} tasks failed and will be retried on the next run")
+    return resumo
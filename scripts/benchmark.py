@@ -0,0 +1,170 @@
+import argparse
+import json
+from pathlib import Path
+from data_collector import gravar_fixture
+from benchmarks.collection import (
+    bench_backfill, bench_cache, bench_coleta_lote, bench_concorrencia, bench_moedas_lote, bench_resiliencia
+)
+from benchmarks.storage import bench_dataset, bench_esquema, bench_excel, bench_insercao, bench_leitura
+from benchmarks.processing import bench_indicadores, bench_lote
+from benchmarks.processes import bench_fatias, bench_processos
+from benchmarks.scenarios import DESTINOS_CENARIO, bench_cenarios, comparar_com_base, gravar_base
+
+
+def _argumentos_banco(subparser):
+    """
+    Adiciona os argumentos de conexão ao MySQL a um subcomando.
+    Adds the MySQL connection arguments to a subcommand.
+    """
+    subparser.add_argument("--host", default="localhost")
+    subparser.add_argument("--user", default="root")
+    subparser.add_argument("--password", default="")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do StockScraper | StockScraper benchmarks")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    gravar = subparsers.add_parser("gravar-fixture", help="Grava um download real do Yahoo | Records a real Yahoo download")
+    gravar.add_argument("caminho")
+    gravar.add_argument("simbolos", nargs="+")
+
+    coleta = subparsers.add_parser("coleta-lote", help="Coleta em lote contra fixture | Batched collection against fixture")
+    coleta.add_argument("caminho")
+    coleta.add_argument("--tamanho-lote", type=int, default=200)
+    coleta.add_argument("--repeticoes", type=int, default=10)
+
+    concorrencia = subparsers.add_parser("concorrencia", help="Vazão por workers contra servidor local | Throughput per worker count against a local server")
+    concorrencia.add_argument("--moedas", type=int, default=50)
+    concorrencia.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    concorrencia.add_argument("--latencia", type=float, default=0.05)
+
+    moedas_lote = subparsers.add_parser("moedas-lote", help="Requisições por par vs. em lote | Per-pair vs. batched requests")
+    moedas_lote.add_argument("--moedas", type=int, default=50)
+    moedas_lote.add_argument("--invalidas", type=int, default=0)
+    moedas_lote.add_argument("--latencia", type=float, default=0.01)
+
+    insercao = subparsers.add_parser("insercao", help="Linhas/s por estratégia de escrita no MySQL | Rows/s per MySQL write strategy")
+    _argumentos_banco(insercao)
+    insercao.add_argument("--linhas", type=int, default=100000)
+    insercao.add_argument("--chunks", type=int, nargs="+", default=[100, 1000, 5000])
+
+    esquema = subparsers.add_parser("esquema", help="Latência de consultas por esquema | Query latency per schema")
+    _argumentos_banco(esquema)
+    esquema.add_argument("--linhas", type=int, default=3000000)
+    esquema.add_argument("--consultas", type=int, default=200)
+
+    dataset = subparsers.add_parser("dataset", help="Arquivo por ciclo vs. dataset particionado | File per cycle vs. partitioned dataset")
+    dataset.add_argument("--ciclos", type=int, default=2000)
+    dataset.add_argument("--simbolos", type=int, default=25)
+
+    leitura = subparsers.add_parser("leitura", help="carregar_precos vs. glob + concat | carregar_precos vs. glob + concat")
+    leitura.add_argument("--dias", type=int, default=30)
+    leitura.add_argument("--ciclos-por-dia", type=int, default=48)
+    leitura.add_argument("--simbolos", type=int, default=200)
+
+    indicadores = subparsers.add_parser("indicadores", help="Indicadores incrementais vs. rolling do pandas | Incremental indicators vs. pandas rolling")
+    indicadores.add_argument("--ciclos", type=int, default=500)
+    indicadores.add_argument("--simbolos", type=int, default=100)
+
+    resiliencia = subparsers.add_parser("resiliencia", help="Ciclos contra um stub com falhas | Cycles against a faulty stub")
+    resiliencia.add_argument("--ciclos", type=int, default=12)
+    resiliencia.add_argument("--taxa-erro", type=float, default=0.2)
+    resiliencia.add_argument("--taxa-travamento", type=float, default=0.05)
+
+    lote = subparsers.add_parser("lote", help="Memória e conversões do LoteCotacoes | LoteCotacoes memory and conversions")
+    lote.add_argument("--simbolos", type=int, default=10000)
+
+    cache = subparsers.add_parser("cache", help="Requisições em um dia simulado com e sem cache | Requests over a simulated day with and without cache")
+    cache.add_argument("--horas", type=float, default=24)
+    cache.add_argument("--intervalo", type=float, default=60)
+
+    backfill = subparsers.add_parser("backfill", help="Vazão, retomada e deduplicação do backfill | Backfill throughput, resumption and deduplication")
+    backfill.add_argument("--simbolos", type=int, default=500)
+    backfill.add_argument("--anos", type=int, default=5)
+    backfill.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    backfill.add_argument("--latencia", type=float, default=0.05)
+
+    fatias = subparsers.add_parser("fatias", help="Escala com N coletores, um por fatia do registro | Scaling with N collectors, one per registry slice")
+    fatias.add_argument("--simbolos", type=int, default=20000)
+    fatias.add_argument("--processos", type=int, nargs="+", default=[1, 2, 4, 8])
+    fatias.add_argument("--latencia", type=float, default=0.05)
+
+    processos = subparsers.add_parser("processos", help="Vazão com 1, 2, 4 e 8 processos coletores | Throughput with 1, 2, 4 and 8 collector processes")
+    processos.add_argument("--simbolos", type=int, default=20000)
+    processos.add_argument("--processos", type=int, nargs="+", default=[1, 2, 4, 8])
+    processos.add_argument("--ciclos", type=int, default=5)
+    processos.add_argument("--latencia", type=float, default=0.05)
+    processos.add_argument("--cpu", type=float, default=0.02)
+    processos.add_argument("--indicadores", action="store_true")
+
+    excel = subparsers.add_parser("excel", help="Exportação Excel: linhas/s e pico de RSS | Excel export: rows/s and peak RSS")
+    excel.add_argument("--linhas", type=int, default=100000)
+
+    cenarios = subparsers.add_parser("cenarios", help="Pipeline completo: ações x ciclos x destino, contra stubs locais | Full pipeline: stocks x cycles x target, against local stubs")
+    cenarios.add_argument("--simbolos", type=int, nargs="+", default=[100, 1000])
+    cenarios.add_argument("--ciclos", type=int, nargs="+", default=[10])
+    cenarios.add_argument("--destinos", nargs="+", choices=DESTINOS_CENARIO, default=["nenhum", "parquet", "sqlite"])
+    cenarios.add_argument("--moedas", type=int, default=20)
+    cenarios.add_argument("--latencia", type=float, default=0.0)
+    cenarios.add_argument("--base", help="Compara com a base gravada neste arquivo | Compares with the baseline stored in this file")
+    cenarios.add_argument("--gravar-base", help="Grava os resultados como base neste arquivo | Writes the results as baseline to this file")
+    cenarios.add_argument("--tolerancia", type=float, default=0.1, help="Piora relativa aceita (0.1 = 10%%) | Accepted relative degradation (0.1 = 10%%)")
+    cenarios.add_argument("--saida", help="Grava os resultados em JSON | Writes the results as JSON")
+    _argumentos_banco(cenarios)
+
+    args = parser.parse_args()
+    if args.comando == "gravar-fixture":
+        gravar_fixture(args.simbolos, args.caminho)
+    elif args.comando == "coleta-lote":
+        print(bench_coleta_lote(args.caminho, args.tamanho_lote, args.repeticoes))
+    elif args.comando == "concorrencia":
+        for resultado in bench_concorrencia(args.moedas, args.workers, args.latencia):
+            print(resultado)
+    elif args.comando == "moedas-lote":
+        print(bench_moedas_lote(args.moedas, args.invalidas, args.latencia))
+    elif args.comando == "insercao":
+        print(bench_insercao(args.host, args.user, args.password, args.linhas, args.chunks))
+    elif args.comando == "esquema":
+        print(bench_esquema(args.host, args.user, args.password, args.linhas, args.consultas))
+    elif args.comando == "dataset":
+        print(bench_dataset(args.ciclos, args.simbolos))
+    elif args.comando == "leitura":
+        print(bench_leitura(args.dias, args.ciclos_por_dia, args.simbolos))
+    elif args.comando == "indicadores":
+        print(bench_indicadores(args.ciclos, args.simbolos))
+    elif args.comando == "resiliencia":
+        for resultado in bench_resiliencia(args.ciclos, taxa_erro=args.taxa_erro, taxa_travamento=args.taxa_travamento):
+            print(resultado)
+    elif args.comando == "lote":
+        print(bench_lote(args.simbolos))
+    elif args.comando == "cache":
+        print(bench_cache(args.horas, args.intervalo))
+    elif args.comando == "backfill":
+        for nome, resultado in bench_backfill(args.simbolos, args.anos, args.workers, args.latencia).items():
+            print(nome, resultado)
+    elif args.comando == "fatias":
+        for quantidade, resultado in bench_fatias(args.simbolos, args.processos, latencia=args.latencia).items():
+            print(quantidade, resultado)
+    elif args.comando == "processos":
+        for nome, resultado in bench_processos(args.simbolos, args.processos, args.ciclos, args.latencia, args.cpu, args.indicadores).items():
+            print(nome, resultado)
+    elif args.comando == "excel":
+        print(bench_excel(args.linhas))
+    elif args.comando == "cenarios":
+        banco = (args.host, args.user, args.password, "StockScraperBench") if "mysql" in args.destinos else None
+        resultados = bench_cenarios(args.simbolos, args.ciclos, args.destinos, args.moedas, args.latencia, banco)
+        for nome, resultado in resultados.items():
+            print(nome, resultado)
+        if args.saida:
+            Path(args.saida).write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+        if args.gravar_base:
+            gravar_base(resultados, args.gravar_base)
+        if args.base:
+            regressoes = comparar_com_base(resultados, args.base, args.tolerancia)
+            for regressao in regressoes:
+                print("REGRESSÃO | REGRESSION", regressao)
+            if regressoes:
+                raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
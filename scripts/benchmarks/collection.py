@@ -0,0 +1,302 @@
+import tempfile
+import time
+import pandas as pd
+from pathlib import Path
+from data_collector import (
+    coletar_dados_acoes_lote, obter_cotacoes_moedas, obter_cotacoes_moedas_lote, transporte_fixture
+)
+from http_client import metricas_http, diferenca_metricas
+from file_handler import estatisticas_arquivos
+from history_reader import carregar_precos
+from quote_cache import CacheCotacoes, coletar_acoes_com_cache, obter_moedas_com_cache
+from config import ASSETS, MOEDAS, HOST_YAHOO
+from datetime import datetime, timedelta
+import concurrency
+from concurrency import calcular_limite
+from resilience import FilaMortos, coletar_com_fila, disjuntor_para
+from backfill import CheckpointBackfill, executar_backfill
+from functools import partial
+from benchmarks.stubs import ManipuladorFalhas, cronometrar, iniciar_servidor_stub, transporte_historico_sintetico
+from logger_config import logger
+
+
+def bench_coleta_lote(caminho_fixture, tamanho_lote=200, repeticoes=10):
+    """
+    Mede a coleta em lote contra uma fixture gravada, sem acessar a rede.
+    Measures batched collection against a recorded fixture, without network access.
+
+    Args:
+        caminho_fixture (str): Caminho da fixture gravada com gravar_fixture.
+                               Path of the fixture recorded with gravar_fixture.
+        tamanho_lote (int): Quantidade de símbolos por requisição.
+                            Number of symbols per request.
+        repeticoes (int): Quantidade de execuções.
+                          Number of runs.
+
+    Returns:
+        dict: Símbolos, segundos por ciclo e símbolos por segundo.
+              Symbols, seconds per cycle and symbols per second.
+    """
+    baixar = transporte_fixture(caminho_fixture)
+    assets = {s: s for s in pd.read_pickle(caminho_fixture)["Close"].columns}
+    segundos = cronometrar(lambda: coletar_dados_acoes_lote(assets, tamanho_lote, baixar), repeticoes)
+    resultado = {
+        "simbolos": len(assets),
+        "segundos_por_ciclo": segundos,
+        "simbolos_por_segundo": len(assets) / segundos if segundos else 0.0,
+    }
+    logger.info(f"Coleta em lote: {resultado} | Batched collection: {resultado}")
+    return resultado
+
+def bench_concorrencia(quantidade_moedas=50, workers=(1, 2, 4, 8), latencia=0.05, prazo=None):
+    """
+    Mede a vazão da coleta de moedas contra um servidor local conforme os workers aumentam.
+    Measures currency collection throughput against a local server as workers increase.
+
+    Args:
+        quantidade_moedas (int): Quantidade de moedas sintéticas por ciclo.
+                                 Number of synthetic currencies per cycle.
+        workers (tuple): Quantidades de workers a medir.
+                         Worker counts to measure.
+        latencia (float): Latência simulada do servidor, em segundos.
+                          Simulated server latency, in seconds.
+        prazo (float, optional): Prazo do ciclo em segundos.
+                                 Cycle deadline in seconds.
+
+    Returns:
+        list: Um dicionário por quantidade de workers.
+              One dictionary per worker count.
+    """
+    servidor, url_base = iniciar_servidor_stub(latencia=latencia)
+    moedas = {f"M{i:03d}": f"Moeda {i}" for i in range(quantidade_moedas)}
+    resultados = []
+    try:
+        for quantidade in workers:
+            inicio = time.perf_counter()
+            cotacoes = obter_cotacoes_moedas(moedas, quantidade, calcular_limite(prazo), url_base)
+            segundos = time.perf_counter() - inicio
+            resultados.append({
+                "workers": quantidade,
+                "cotacoes": len(cotacoes),
+                "segundos": segundos,
+                "requisicoes_por_segundo": len(cotacoes) / segundos,
+            })
+            logger.info(f"Concorrência: {resultados[-1]} | Concurrency: {resultados[-1]}")
+    finally:
+        servidor.shutdown()
+    return resultados
+
+def bench_resiliencia(ciclos=12, quantidade_moedas=20, taxa_erro=0.2, taxa_travamento=0.05,
+                      ciclos_fora_do_ar=(4, 7), prazo=3.0, tempo_aberto=2.0, intervalo=1.0):
+    """
+    Roda ciclos de coleta de moedas contra o stub com falhas e registra disjuntor e fila de mortos.
+    Runs currency collection cycles against the faulty stub and records the breaker and dead-letter queue.
+
+    Args:
+        ciclos (int): Ciclos executados.
+                      Cycles run.
+        quantidade_moedas (int): Moedas por ciclo.
+                                 Currencies per cycle.
+        taxa_erro (float): Fração de respostas 503.
+                           Fraction of 503 responses.
+        taxa_travamento (float): Fração de conexões travadas (mais longas que o prazo).
+                                 Fraction of hung connections (longer than the deadline).
+        ciclos_fora_do_ar (tuple): Intervalo [início, fim) de ciclos com a API fora do ar.
+                                   [start, end) range of cycles with the API down.
+        prazo (float): Prazo de cada ciclo em segundos.
+                       Deadline of each cycle in seconds.
+        tempo_aberto (float): Segundos com o circuito aberto antes do teste.
+                              Seconds with the circuit open before the probe.
+        intervalo (float): Intervalo mínimo entre o início dos ciclos, em segundos.
+                           Minimum interval between cycle starts, in seconds.
+
+    Returns:
+        list: Um dicionário por ciclo.
+              One dictionary per cycle.
+    """
+    servidor, url_base = iniciar_servidor_stub(
+        ManipuladorFalhas, taxa_erro=taxa_erro, taxa_travamento=taxa_travamento, travamento=prazo * 5
+    )
+    disjuntor = disjuntor_para(url_base)
+    disjuntor.tempo_aberto = tempo_aberto
+    moedas = {f"M{i:03d}": f"Moeda {i}" for i in range(quantidade_moedas)}
+    coletar = partial(obter_cotacoes_moedas_lote, tamanho_lote=5, url_base=url_base)
+    fila = FilaMortos(caminho=None)
+    resultados = []
+    try:
+        for ciclo in range(ciclos):
+            servidor.RequestHandlerClass.fora_do_ar = ciclos_fora_do_ar[0] <= ciclo < ciclos_fora_do_ar[1]
+            inicio = time.perf_counter()
+            cotacoes = coletar_com_fila("moedas", coletar, fila, moedas, max_workers=4, limite=calcular_limite(prazo))
+            resultados.append({
+                "ciclo": ciclo,
+                "fora_do_ar": servidor.RequestHandlerClass.fora_do_ar,
+                "cotacoes": len(cotacoes),
+                "segundos": time.perf_counter() - inicio,
+                "disjuntor": disjuntor.metricas(),
+                "fila_mortos": fila.metricas(),
+            })
+            logger.info(f"Resiliência: {resultados[-1]} | Resilience: {resultados[-1]}")
+            time.sleep(max(0.0, intervalo - resultados[-1]["segundos"]))
+    finally:
+        servidor.shutdown()
+        fila.fechar()
+    return resultados
+
+def bench_moedas_lote(quantidade_moedas=50, invalidas=0, latencia=0.01):
+    """
+    Compara requisições por par com requisições em lote contra um servidor local.
+    Compares per-pair requests with batched requests against a local server.
+
+    Args:
+        quantidade_moedas (int): Quantidade de moedas válidas.
+                                 Number of valid currencies.
+        invalidas (int): Quantidade de moedas inválidas, para exercitar a divisão do lote.
+                         Number of invalid currencies, to exercise batch splitting.
+        latencia (float): Latência simulada do servidor, em segundos.
+                          Simulated server latency, in seconds.
+
+    Returns:
+        dict: Cotações, segundos e métricas HTTP de cada modo.
+              Quotes, seconds and HTTP metrics for each mode.
+    """
+    servidor, url_base = iniciar_servidor_stub(latencia=latencia)
+    moedas = {f"M{i:03d}": f"Moeda {i}" for i in range(quantidade_moedas)}
+    moedas.update({f"X{i:02d}": f"Inválida {i}" for i in range(invalidas)})
+    modos = {
+        "por_par": lambda: obter_cotacoes_moedas(moedas, url_base=url_base),
+        "lote": lambda: obter_cotacoes_moedas_lote(moedas, url_base=url_base),
+    }
+    resultados = {}
+    try:
+        for nome, funcao in modos.items():
+            antes = metricas_http()
+            inicio = time.perf_counter()
+            cotacoes = funcao()
+            resultados[nome] = {
+                "cotacoes": len(cotacoes),
+                "segundos": time.perf_counter() - inicio,
+                **diferenca_metricas(antes, metricas_http()),
+            }
+            logger.info(f"Moedas ({nome}): {resultados[nome]} | Currencies ({nome}): {resultados[nome]}")
+    finally:
+        servidor.shutdown()
+    return resultados
+
+def bench_cache(horas=24, intervalo=60, inicio="2024-06-03T00:00:00-03:00"):
+    """
+    Simula um dia de ciclos com relógio simulado e conta as requisições com e sem o cache de cotações.
+    Simulates a day of cycles with a simulated clock and counts requests with and without the quote cache.
+
+    Args:
+        horas (float): Duração simulada.
+                       Simulated duration.
+        intervalo (float): Segundos entre ciclos.
+                           Seconds between cycles.
+        inicio (str): Início da simulação (ISO com fuso).
+                      Simulation start (ISO with time zone).
+
+    Returns:
+        dict: Requisições e símbolos baixados sem e com cache, e métricas do cache.
+              Requests and symbols downloaded without and with the cache, and cache metrics.
+    """
+    contagem = {"requisicoes": 0, "simbolos": 0}
+
+    def baixar(simbolos, periodo="2d"):
+        contagem["requisicoes"] += 1
+        contagem["simbolos"] += len(simbolos)
+        datas = pd.date_range("2024-01-01", periods=2 if periodo == "2d" else 1)
+        return pd.concat({"Close": pd.DataFrame({s: [100.0] * len(datas) for s in simbolos}, index=datas)}, axis=1)
+
+    def coletar_moedas(moedas, max_workers=1, limite=None):
+        contagem["requisicoes"] += 1
+        contagem["simbolos"] += len(moedas)
+        return [{"NOME": nome, "MOEDA": moeda, "COTAÇÃO": 1.0, "VARIAÇÃO PERCENTUAL": 0.0,
+                 "TENDÊNCIA": "Caindo | Down", "DATA E HORÁRIO": inicio} for moeda, nome in moedas.items()]
+
+    # O relógio é simulado: os limitadores de taxa reais deixariam a simulação em tempo real
+    # The clock is simulated: the real rate limiters would make the simulation run in real time
+    limitadores = dict(concurrency._limitadores)
+    concurrency._limitadores[HOST_YAHOO] = concurrency.LimitadorTaxa(1e9, 1e9)
+
+    instantes = [datetime.fromisoformat(inicio).timestamp() + i * intervalo for i in range(int(horas * 3600 / intervalo))]
+    for instante in instantes:
+        coletar_dados_acoes_lote(ASSETS, baixar=baixar)
+        coletar_moedas(MOEDAS)
+    sem_cache = dict(contagem)
+
+    contagem.update(requisicoes=0, simbolos=0)
+    cache = CacheCotacoes(caminho=None)
+    for instante in instantes:
+        coletar_acoes_com_cache(ASSETS, cache, baixar=baixar, agora=instante)
+        obter_moedas_com_cache(MOEDAS, cache, coletar=coletar_moedas, agora=instante)
+    concurrency._limitadores.clear()
+    concurrency._limitadores.update(limitadores)
+    resultado = {"ciclos": len(instantes), "sem_cache": sem_cache, "com_cache": dict(contagem), "cache": cache.metricas()}
+    logger.info(f"Cache: {resultado} | Cache: {resultado}")
+    return resultado
+
+def bench_backfill(simbolos=500, anos=5, workers=(1, 4, 8), latencia=0.05):
+    """
+    Mede a vazão do backfill por quantidade de workers e verifica a retomada pelo checkpoint e a deduplicação.
+    Measures backfill throughput per worker count and checks checkpoint resumption and deduplication.
+
+    Cenários: metade das tarefas falha (execução interrompida), a execução seguinte retoma só o
+    que faltou, e uma terceira sem checkpoint baixa tudo de novo sem gravar duplicatas.
+    Scenarios: half of the tasks fail (interrupted run), the next run resumes only what was
+    missing, and a third one without checkpoint downloads everything again without writing duplicates.
+
+    Args:
+        simbolos (int): Símbolos sintéticos.
+                        Synthetic symbols.
+        anos (int): Anos de histórico.
+                    Years of history.
+        workers (tuple): Quantidades de workers comparadas.
+                         Worker counts compared.
+        latencia (float): Atraso artificial por requisição, em segundos.
+                          Artificial delay per request, in seconds.
+
+    Returns:
+        dict: Resumo de cada execução.
+              Summary of each run.
+    """
+    assets = {f"SIM{i:05d}": f"Empresa {i}" for i in range(simbolos)}
+    inicio = datetime(2019, 1, 1).date()
+    fim = inicio + timedelta(days=365 * anos)
+    meio = inicio + (fim - inicio) / 2
+
+    # O limitador real do Yahoo dominaria a medida; aqui só a vazão do pipeline interessa
+    # Yahoo's real rate limiter would dominate the measurement; only the pipeline throughput matters here
+    limitadores = dict(concurrency._limitadores)
+    concurrency._limitadores[HOST_YAHOO] = concurrency.LimitadorTaxa(1e9, 1e9)
+    resultados = {}
+    try:
+        for quantidade in workers:
+            with tempfile.TemporaryDirectory() as diretorio:
+                resultados[f"workers_{quantidade}"] = executar_backfill(
+                    assets, inicio, fim, raiz=Path(diretorio) / "dataset", baixar=transporte_historico_sintetico(latencia),
+                    max_workers=quantidade, checkpoint=CheckpointBackfill(":memory:")
+                )
+
+        with tempfile.TemporaryDirectory() as diretorio:
+            raiz = Path(diretorio) / "dataset"
+            checkpoint = CheckpointBackfill(Path(diretorio) / "backfill.sqlite")
+            falha = transporte_historico_sintetico(latencia, falhar=lambda simbolos, de, ate: ate > meio)
+            resultados["interrompido"] = executar_backfill(assets, inicio, fim, raiz=raiz, baixar=falha, max_workers=max(workers), checkpoint=checkpoint)
+            baixar = transporte_historico_sintetico(latencia)
+            resultados["retomado"] = executar_backfill(assets, inicio, fim, raiz=raiz, baixar=baixar, max_workers=max(workers), checkpoint=checkpoint)
+            checkpoint.fechar()
+            resultados["sem_checkpoint"] = executar_backfill(
+                assets, inicio, fim, raiz=raiz, baixar=baixar, max_workers=max(workers), checkpoint=CheckpointBackfill(":memory:")
+            )
+            tabela = carregar_precos(raiz=raiz, colunas=["AÇÃO", "HORÁRIO"])
+            resultados["dataset"] = {
+                "linhas": tabela.num_rows,
+                "unicas": len(set(zip(tabela["AÇÃO"].to_pylist(), tabela["HORÁRIO"].to_pylist()))),
+                **estatisticas_arquivos(raiz),
+            }
+    finally:
+        concurrency._limitadores.clear()
+        concurrency._limitadores.update(limitadores)
+    logger.info(f"Backfill: {resultados} | Backfill: {resultados}")
+    return resultados
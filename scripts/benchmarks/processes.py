@@ -0,0 +1,189 @@
+import multiprocessing
+import tempfile
+import time
+import pandas as pd
+from pathlib import Path
+from data_collector import coletar_dados_acoes_lote
+from config import HOST_YAHOO
+from metrics import metricas
+import concurrency
+from asset_registry import carregar_registro
+from process_pool import ColetorProcessos
+from functools import partial
+from benchmarks.stubs import receber_resultados
+from logger_config import configurar_logs_processo, fila_logs_processos, logger
+
+
+def _baixar_dois_dias(latencia, simbolos, periodo="2d"):
+    """
+    Transporte sintético de dois pregões com atraso fixo (função de módulo, para processos spawn).
+    Synthetic two-session transport with a fixed delay (module-level function, for spawn processes).
+    """
+    time.sleep(latencia)
+    datas = pd.date_range("2024-01-01", periods=2)
+    return pd.concat({"Close": pd.DataFrame({s: [100.0, 101.0] for s in simbolos}, index=datas)}, axis=1)
+
+def _baixar_com_cpu(latencia, cpu, simbolos, periodo="2d"):
+    """
+    Como _baixar_dois_dias, mais cpu segundos de processamento puro por requisição (o pós-processamento do yfinance).
+    Like _baixar_dois_dias, plus cpu seconds of pure processing per request (yfinance's post-processing).
+    """
+    fim = time.process_time() + cpu
+    while time.process_time() < fim:
+        pass
+    return _baixar_dois_dias(latencia, simbolos, periodo)
+
+def _executar_fatia(caminho, shard, ciclos, intervalo, latencia, fila, fila_logs):
+    """
+    Coletor de uma fatia em um processo próprio: carrega o registro, pega sua fatia e roda os ciclos.
+    Collector for one slice in its own process: loads the registry, takes its slice and runs the cycles.
+    """
+    configurar_logs_processo(fila_logs)
+    # Cada processo tem seu limitador; aqui só a divisão do trabalho interessa
+    # Each process has its own limiter; only the split of the work matters here
+    concurrency._limitadores[HOST_YAHOO] = concurrency.LimitadorTaxa(1e9, 1e9)
+    inicio = time.perf_counter()
+    registro = carregar_registro(caminho, shard, intervalo_base=intervalo)
+    cotacoes = 0
+    for ciclo in range(ciclos):
+        ativos = registro.devidos("acoes", ciclo * intervalo)
+        cotacoes += len(coletar_dados_acoes_lote(ativos, baixar=partial(_baixar_dois_dias, latencia)))
+    fila.put((shard, sorted(registro.simbolos("acoes")), cotacoes, time.perf_counter() - inicio))
+
+def bench_fatias(simbolos=20000, processos=(1, 2, 4, 8), ciclos=6, intervalo=10, latencia=0.05):
+    """
+    Roda N coletores em processos locais, cada um com sua fatia do registro, e mede a escala.
+    Runs N collectors in local processes, each with its own registry slice, and measures scaling.
+
+    O registro sintético mistura símbolos quentes (todo tique), mornos (60 s) e frios (300 s).
+    Também confere que as fatias são disjuntas e cobrem todo o registro.
+    The synthetic registry mixes hot (every tick), warm (60 s) and cold (300 s) symbols.
+    It also checks that the slices are disjoint and cover the whole registry.
+
+    Args:
+        simbolos (int): Símbolos no registro.
+                        Symbols in the registry.
+        processos (tuple): Quantidades de coletores comparadas.
+                           Collector counts compared.
+        ciclos (int): Tiques simulados por coletor.
+                      Simulated ticks per collector.
+        intervalo (float): Segundos entre tiques.
+                           Seconds between ticks.
+        latencia (float): Atraso artificial por requisição, em segundos.
+                          Artificial delay per request, in seconds.
+
+    Returns:
+        dict: Métricas por quantidade de processos.
+              Metrics per process count.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    resultados = {}
+    with tempfile.TemporaryDirectory() as temporario:
+        caminho = Path(temporario) / "ativos.csv"
+        with open(caminho, "w", encoding="utf-8", newline="") as arquivo:
+            arquivo.write("simbolo,nome,classe,intervalo\n")
+            for i in range(simbolos):
+                frequencia = "" if i % 10 == 0 else 60 if i % 2 else 300
+                arquivo.write(f"SIM{i:05d},Empresa {i},acoes,{frequencia}\n")
+
+        for quantidade in processos:
+            fila = contexto.Queue()
+            inicio = time.perf_counter()
+            trabalhadores = [
+                contexto.Process(target=_executar_fatia, args=(caminho, f"{i}/{quantidade}", ciclos, intervalo, latencia, fila, fila_logs_processos()))
+                for i in range(quantidade)
+            ]
+            for trabalhador in trabalhadores:
+                trabalhador.start()
+            try:
+                fatias = receber_resultados(fila, trabalhadores)
+            except (RuntimeError, TimeoutError) as e:
+                resultados[quantidade] = {"erro": str(e)}
+                logger.error(f"Fatias ({quantidade}): {e} | Slices ({quantidade}): {e}")
+                continue
+            segundos = time.perf_counter() - inicio
+
+            tamanhos = [len(simbolos_fatia) for _, simbolos_fatia, _, _ in fatias]
+            todos = [simbolo for _, simbolos_fatia, _, _ in fatias for simbolo in simbolos_fatia]
+            cotacoes = sum(cotacoes for _, _, cotacoes, _ in fatias)
+            resultados[quantidade] = {
+                "segundos": segundos,
+                "coleta_max": max(segundos_fatia for _, _, _, segundos_fatia in fatias),
+                "cotacoes": cotacoes,
+                "cotacoes_por_segundo": cotacoes / segundos,
+                "simbolos_por_fatia": tamanhos,
+                "desequilibrio": max(tamanhos) / (sum(tamanhos) / len(tamanhos)),
+                "disjuntas": len(todos) == len(set(todos)),
+                "cobertura": len(set(todos)) == simbolos,
+            }
+            logger.info(f"Fatias ({quantidade}): {resultados[quantidade]} | Slices ({quantidade}): {resultados[quantidade]}")
+    return resultados
+
+def bench_processos(simbolos=20000, processos=(1, 2, 4, 8), ciclos=5, latencia=0.05, cpu=0.02, indicadores=False):
+    """
+    Mede a vazão da coleta em processos por quantidade de coletores, contra a coleta em threads.
+    Measures multi-process collection throughput per collector count, against thread collection.
+
+    Cada requisição sintética gasta latencia segundos de espera e cpu segundos de CPU, imitando
+    o download e o pós-processamento do yfinance. O tempo de criação dos processos fica fora
+    da medida (um ciclo de aquecimento antes).
+    Each synthetic request spends latencia seconds waiting and cpu seconds of CPU, imitating
+    yfinance's download and post-processing. Process start-up time is left out of the
+    measurement (one warm-up cycle first).
+
+    Args:
+        simbolos (int): Ações por ciclo.
+                        Stocks per cycle.
+        processos (tuple): Quantidades de coletores comparadas.
+                           Collector counts compared.
+        ciclos (int): Ciclos medidos.
+                      Measured cycles.
+        latencia (float): Espera por requisição, em segundos.
+                          Wait per request, in seconds.
+        cpu (float): CPU por requisição, em segundos.
+                     CPU per request, in seconds.
+        indicadores (bool): Calcular indicadores no escritor.
+                            Compute indicators in the writer.
+
+    Returns:
+        dict: Métricas das threads e de cada quantidade de processos.
+              Metrics for threads and for each process count.
+    """
+    assets = {f"SIM{i:05d}": f"Empresa {i}" for i in range(simbolos)}
+    baixar = partial(_baixar_com_cpu, latencia, cpu)
+    limitadores = dict(concurrency._limitadores)
+    concurrency._limitadores[HOST_YAHOO] = concurrency.LimitadorTaxa(1e9, 1e9)
+    resultados = {}
+    try:
+        inicio = time.perf_counter()
+        cotacoes = sum(len(coletar_dados_acoes_lote(assets, baixar=baixar, max_workers=8)) for _ in range(ciclos))
+        segundos = time.perf_counter() - inicio
+        resultados["threads_8"] = {"segundos": segundos, "cotacoes": cotacoes, "cotacoes_por_segundo": cotacoes / segundos}
+    finally:
+        concurrency._limitadores.clear()
+        concurrency._limitadores.update(limitadores)
+
+    for quantidade in processos:
+        with tempfile.TemporaryDirectory() as temporario:
+            coletor = ColetorProcessos(
+                quantidade, baixar=baixar, raiz=Path(temporario), indicadores=indicadores, limites={HOST_YAHOO: (1e9, 1e9)}
+            )
+            with coletor:
+                coletor.enviar({"SIM00000": "Empresa 0"}, {})
+                coletor.aguardar()
+                inicio = time.perf_counter()
+                for _ in range(ciclos):
+                    coletor.enviar(assets, {})
+                resumos = coletor.aguardar()
+                segundos = time.perf_counter() - inicio
+                metricas = coletor.metricas()
+            cotacoes = sum(resumo["linhas"] for resumo in resumos)
+            resultados[f"processos_{quantidade}"] = {
+                "segundos": segundos,
+                "cotacoes": cotacoes,
+                "cotacoes_por_segundo": cotacoes / segundos,
+                "espera_envio": metricas["espera_envio"],
+                "gravacao_max": max(resumo["segundos"] for resumo in resumos),
+            }
+        logger.info(f"Processos ({quantidade}): {resultados[f'processos_{quantidade}']} | Processes ({quantidade}): {resultados[f'processos_{quantidade}']}")
+    return resultados
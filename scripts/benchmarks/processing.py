@@ -0,0 +1,118 @@
+import random
+import time
+import tracemalloc
+import pandas as pd
+from file_handler import EscritorDataset
+from indicators import MotorIndicadores
+from cycle_batch import LoteCotacoes
+from database_manager import registros_para_colunas
+from datetime import datetime, timedelta
+from benchmarks.stubs import cronometrar, gerar_ciclo_acoes
+from logger_config import logger
+
+
+def bench_indicadores(ciclos=500, simbolos=100, janela=20, periodo_ema=12):
+    """
+    Compara o MotorIndicadores incremental com o recálculo via rolling do pandas sobre todo o histórico.
+    Compares the incremental MotorIndicadores with recomputing pandas rolling over the full history.
+
+    Args:
+        ciclos (int): Ciclos simulados.
+                      Simulated cycles.
+        simbolos (int): Símbolos por ciclo.
+                        Symbols per cycle.
+        janela (int): Tamanho da janela móvel.
+                      Rolling window size.
+        periodo_ema (int): Período da EMA.
+                           EMA period.
+
+    Returns:
+        dict: Milissegundos por ciclo de cada abordagem e maior diferença absoluta no último ciclo.
+              Milliseconds per cycle for each approach and largest absolute difference on the last cycle.
+    """
+    gerador = random.Random(42)
+    nomes = [f"SYM{i:05d}" for i in range(simbolos)]
+    inicio_ciclos = datetime(2024, 1, 1, 10)
+    lotes = [gerar_ciclo_acoes(nomes, inicio_ciclos + timedelta(seconds=10 * i), gerador) for i in range(ciclos)]
+
+    motor = MotorIndicadores(janela, periodo_ema)
+    inicio = time.perf_counter()
+    for dados in lotes:
+        incremental = motor.atualizar("acoes", dados)
+    segundos_incremental = time.perf_counter() - inicio
+
+    historico = []
+    inicio = time.perf_counter()
+    for dados in lotes:
+        historico.extend((item["AÇÃO"], item["COTAÇÃO"]) for item in dados)
+        precos = pd.DataFrame(historico, columns=["simbolo", "preco"]).groupby("simbolo")["preco"]
+        ultimos = pd.DataFrame({
+            "media": precos.rolling(janela, min_periods=1).mean().groupby(level=0).last(),
+            "minimo": precos.rolling(janela, min_periods=1).min().groupby(level=0).last(),
+            "maximo": precos.rolling(janela, min_periods=1).max().groupby(level=0).last(),
+            "ema": precos.apply(lambda p: p.ewm(span=periodo_ema, adjust=False).mean().iloc[-1]),
+            "volatilidade": precos.apply(lambda p: p.pct_change().rolling(janela, min_periods=2).std().iloc[-1]),
+        })
+    segundos_pandas = time.perf_counter() - inicio
+
+    diferenca = 0.0
+    for linha in incremental:
+        esperado = ultimos.loc[linha["SÍMBOLO"]]
+        for coluna, chave in (("MÉDIA MÓVEL", "media"), ("MÍNIMA DA JANELA", "minimo"), ("MÁXIMA DA JANELA", "maximo"),
+                              ("EMA", "ema"), ("VOLATILIDADE", "volatilidade")):
+            diferenca = max(diferenca, float(abs(linha[coluna] - esperado[chave])))
+    resultado = {
+        "ms_por_ciclo_incremental": segundos_incremental / ciclos * 1000,
+        "ms_por_ciclo_pandas": segundos_pandas / ciclos * 1000,
+        "maior_diferenca": diferenca,
+    }
+    logger.info(f"Indicadores: {resultado} | Indicators: {resultado}")
+    return resultado
+
+def bench_lote(simbolos=10000, repeticoes=5):
+    """
+    Compara memória por linha e tempo de conversão da lista de dicionários e do LoteCotacoes.
+    Compares memory per row and conversion time of the list of dictionaries and LoteCotacoes.
+
+    Args:
+        simbolos (int): Símbolos no ciclo.
+                        Symbols in the cycle.
+        repeticoes (int): Repetições de cada conversão.
+                          Repetitions of each conversion.
+
+    Returns:
+        dict: Bytes por linha e milissegundos por conversão de cada representação.
+              Bytes per row and milliseconds per conversion of each representation.
+    """
+    nomes = [f"SYM{i:05d}" for i in range(simbolos)]
+    horario = datetime(2024, 1, 1, 10)
+
+    tracemalloc.start()
+    dados = gerar_ciclo_acoes(nomes, horario, random.Random(42))
+    bytes_dicionarios = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    lote = LoteCotacoes.de_registros("acoes", dados)
+    bytes_lote = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    def ms(funcao):
+        return cronometrar(funcao, repeticoes) * 1000
+
+    resultado = {
+        "linhas": simbolos,
+        "bytes_por_linha": {"dicionarios": bytes_dicionarios / simbolos, "lote": bytes_lote / simbolos},
+        "ms_montar_lote": ms(lambda: LoteCotacoes.de_registros("acoes", dados)),
+        "ms_arrow": {
+            "dicionarios": ms(lambda: list(EscritorDataset._particionar("acoes", dados))),
+            "lote": ms(lambda: list(EscritorDataset._particionar("acoes", lote))),
+            "lote_sem_cast": ms(lote.para_arrow),
+        },
+        "ms_pandas": {"dicionarios": ms(lambda: pd.DataFrame(dados)), "lote": ms(lote.para_pandas)},
+        "ms_colunas_banco": {
+            "dicionarios": ms(lambda: registros_para_colunas("acoes", dados)),
+            "lote": ms(lambda: registros_para_colunas("acoes", lote)),
+        },
+    }
+    logger.info(f"Lote colunar: {resultado} | Columnar batch: {resultado}")
+    return resultado
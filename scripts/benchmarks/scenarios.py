@@ -0,0 +1,326 @@
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from data_collector import coletar_ciclo, coletar_dados_acoes_lote, obter_cotacoes_moedas_lote
+from file_handler import EscritorDataset, estatisticas_arquivos, salvar_excel_streaming
+from cycle_batch import LoteCotacoes
+from config import LIMITES_TAXA, MAX_WORKERS, PRAZO_CICLO, TAMANHO_LOTE_ACOES
+from connection_pool import PoolConexoes
+from database_manager import criar_tabelas, salvar_ciclo, COLUNAS_TABELAS, CHAVES_TABELAS
+from metrics import metricas
+import concurrency
+from functools import partial
+from benchmarks.stubs import ManipuladorAwesomeAPI, ManipuladorYahoo, baixar_spark, iniciar_servidor_stub, percentil, receber_resultados
+from logger_config import configurar_logs_processo, fila_logs_processos, logger
+
+
+class _CursorSqlite:
+    """
+    Cursor DB-API do sqlite3 que aceita o SQL do database_manager (parâmetros %s e ON DUPLICATE KEY UPDATE).
+    sqlite3 DB-API cursor that accepts database_manager's SQL (%s parameters and ON DUPLICATE KEY UPDATE).
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @staticmethod
+    def _traduzir(sql):
+        upsert = re.search(r"INSERT INTO (\w+) .* ON DUPLICATE KEY UPDATE", sql)
+        if upsert:
+            chaves = ", ".join(CHAVES_TABELAS[upsert.group(1)])
+            sql = sql.replace("ON DUPLICATE KEY UPDATE", f"ON CONFLICT ({chaves}) DO UPDATE SET")
+            sql = re.sub(r"VALUES\((\w+)\)", r"excluded.\1", sql)
+        return sql.replace("%s", "?")
+
+    def execute(self, sql, parametros=()):
+        return self._cursor.execute(self._traduzir(sql), parametros)
+
+    def executemany(self, sql, linhas):
+        return self._cursor.executemany(self._traduzir(sql), linhas)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+class _PoolSqlite:
+    """
+    Destino SQLite descartável com a interface do PoolConexoes usada por salvar_ciclo.
+    Disposable SQLite target with the PoolConexoes interface used by salvar_ciclo.
+
+    Só a criação das tabelas é própria (mesmas colunas e chaves do esquema de série temporal, sem
+    partições); a gravação passa por salvar_ciclo, inserir_dados e inserir_lote, como no MySQL.
+    Only table creation is its own (same columns and keys as the time-series schema, without
+    partitions); writes go through salvar_ciclo, inserir_dados and inserir_lote, as on MySQL.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._banco = sqlite3.connect(caminho)
+        for tabela, colunas in COLUNAS_TABELAS.items():
+            self._banco.execute(
+                f"CREATE TABLE IF NOT EXISTS {tabela} ({', '.join(colunas)}, PRIMARY KEY ({', '.join(CHAVES_TABELAS[tabela])}))"
+            )
+
+    def executar(self, funcao):
+        with self._banco:
+            return funcao(_CursorSqlite(self._banco.cursor()))
+
+    def fechar(self):
+        self._banco.close()
+
+DESTINOS_CENARIO = ("nenhum", "parquet", "sqlite", "mysql", "excel")
+
+# Métrica do cenário -> True se maior é melhor | Scenario metric -> True if higher is better
+METRICAS_CENARIO = {
+    "ciclos_por_segundo": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "pico_rss_mb": False,
+    "bytes_gravados": False,
+}
+
+def nome_cenario(simbolos, moedas, ciclos, destino):
+    return f"acoes={simbolos},moedas={moedas},ciclos={ciclos},destino={destino}"
+
+def _abrir_destino(destino, diretorio, banco):
+    """
+    Abre o destino de gravação do cenário e retorna (gravar, encerrar).
+    Opens the scenario's storage target and returns (gravar, encerrar).
+
+    encerrar() grava o que estiver pendente, libera o destino e retorna os bytes gravados.
+    encerrar() flushes whatever is pending, releases the target and returns the bytes written.
+    """
+    if destino == "nenhum":
+        return (lambda lote_acoes, lote_moedas: None), (lambda: 0)
+    if destino == "parquet":
+        escritor = EscritorDataset(Path(diretorio) / "dataset")
+
+        def gravar(lote_acoes, lote_moedas):
+            escritor.adicionar("acoes", lote_acoes)
+            escritor.adicionar("moedas", lote_moedas)
+
+        def encerrar():
+            escritor.fechar()
+            return estatisticas_arquivos(diretorio)["bytes"]
+
+        return gravar, encerrar
+    if destino == "sqlite":
+        sqlite = _PoolSqlite(Path(diretorio) / "bench.db")
+
+        def encerrar():
+            sqlite.fechar()
+            return estatisticas_arquivos(diretorio, "*.db*")["bytes"]
+
+        return (lambda lote_acoes, lote_moedas: salvar_ciclo(sqlite, lote_acoes, lote_moedas)), encerrar
+    if destino == "excel":
+        contador = iter(range(1 << 30))
+
+        def gravar(lote_acoes, lote_moedas):
+            salvar_excel_streaming(lote_acoes, lote_moedas, f"ciclo_{next(contador):05d}.xlsx", diretorio)
+
+        return gravar, lambda: estatisticas_arquivos(diretorio, "*.xlsx")["bytes"]
+    if destino == "mysql":
+        if not banco:
+            raise ValueError("destino mysql exige --host/--user/--password | mysql target requires --host/--user/--password")
+        host, user, password, database = banco
+        pool = PoolConexoes(host, user, password, database)
+        pool.executar(criar_tabelas)
+
+        def medir_e_remover(cursor):
+            cursor.execute("ANALYZE TABLE acoes, moedas")
+            cursor.fetchall()
+            cursor.execute(
+                "SELECT COALESCE(SUM(data_length + index_length), 0) FROM information_schema.TABLES WHERE table_schema = %s",
+                (database,)
+            )
+            escritos = int(cursor.fetchone()[0])
+            # Banco descartável: removido ao final do cenário | Disposable database: dropped at the end of the scenario
+            cursor.execute(f"DROP DATABASE {database}")
+            return escritos
+
+        def encerrar():
+            try:
+                return pool.executar(medir_e_remover)
+            finally:
+                pool.fechar()
+
+        return (lambda lote_acoes, lote_moedas: salvar_ciclo(pool, lote_acoes, lote_moedas)), encerrar
+    raise ValueError(f"destino desconhecido: {destino} | unknown target: {destino}")
+
+def _executar_cenario(simbolos, moedas, ciclos, destino, url_yahoo, url_moedas, banco, fila, fila_logs):
+    """
+    Roda um cenário em um processo isolado (pico de RSS só dele) e envia o resultado pela fila.
+    Runs one scenario in an isolated process (its own peak RSS) and sends the result through the queue.
+    """
+    configurar_logs_processo(fila_logs)
+    # O cenário mede o pipeline, não a cota das fontes reais | The scenario measures the pipeline, not the real sources' quota
+    concurrency.configurar_limites({dominio: (1e9, 1e9) for dominio in LIMITES_TAXA})
+    assets = {f"SIM{i:05d}": f"Empresa {i}" for i in range(simbolos)}
+    codigos = {f"M{i:03d}": f"Moeda {i}" for i in range(moedas)}
+    coletar_acoes = partial(coletar_dados_acoes_lote, tamanho_lote=TAMANHO_LOTE_ACOES, baixar=partial(baixar_spark, url_yahoo))
+    coletar_moedas = partial(obter_cotacoes_moedas_lote, url_base=url_moedas)
+
+    with tempfile.TemporaryDirectory() as temporario:
+        gravar, encerrar = _abrir_destino(destino, temporario, banco)
+
+        def ciclo():
+            dados_acoes, dados_moedas = coletar_ciclo(
+                assets, codigos, MAX_WORKERS, PRAZO_CICLO, coletar_acoes, coletar_moedas
+            )
+            # Mesmo caminho da persistência de main.coletar | Same path as main.coletar's persistence
+            gravar(LoteCotacoes.de_registros("acoes", dados_acoes), LoteCotacoes.de_registros("moedas", dados_moedas))
+            return len(dados_acoes) + len(dados_moedas)
+
+        encerrado = False
+        try:
+            # Aquecimento: imports, conexões e arquivos abertos ficam fora da medida
+            # Warm-up: imports, connections and opened files are left out of the measurement
+            ciclo()
+            metricas.limpar()
+            latencias, cotacoes = [], 0
+            inicio = time.perf_counter()
+            for _ in range(ciclos):
+                inicio_ciclo = time.perf_counter()
+                cotacoes += ciclo()
+                latencias.append(time.perf_counter() - inicio_ciclo)
+            total = time.perf_counter() - inicio
+            # Encerrar grava os buffers pendentes; medido à parte | Closing flushes pending buffers; measured separately
+            inicio_encerrar = time.perf_counter()
+            escritos = encerrar()
+            encerrado = True
+            encerramento = time.perf_counter() - inicio_encerrar
+        finally:
+            if not encerrado:
+                encerrar()
+
+    etapas = {
+        nome: round(resumo["p50"] * 1000, 3)
+        for nome, resumo in metricas.instantaneo()["histogramas"].items() if nome.startswith("etapa_segundos")
+    }
+    fila.put({
+        "ciclos_por_segundo": ciclos / total,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        # ru_maxrss é em KiB no Linux | ru_maxrss is in KiB on Linux
+        "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "bytes_gravados": escritos,
+        "cotacoes": cotacoes,
+        "cotacoes_esperadas": ciclos * (simbolos + moedas),
+        "encerrar_ms": encerramento * 1000,
+        "etapas_p50_ms": etapas,
+    })
+
+def bench_cenarios(simbolos=(100, 1000), ciclos=(10,), destinos=("nenhum", "parquet", "sqlite"), moedas=20,
+                   latencia=0.0, banco=None):
+    """
+    Roda a matriz de cenários (ações x ciclos x destino) do pipeline completo contra stubs locais.
+    Runs the scenario matrix (stocks x cycles x target) of the full pipeline against local stubs.
+
+    Cada cenário coleta do stub do Yahoo e do stub da AwesomeAPI pelo mesmo caminho de main.coletar
+    (coletar_ciclo, LoteCotacoes, destino) e roda em um processo próprio, para que o pico de RSS
+    seja só dele. Os ciclos são executados em sequência, sem esperar o intervalo do agendador.
+    Each scenario collects from the Yahoo stub and the AwesomeAPI stub along main.coletar's path
+    (coletar_ciclo, LoteCotacoes, target) and runs in its own process, so the peak RSS is its own.
+    Cycles run back to back, without waiting for the scheduler interval.
+
+    Args:
+        simbolos (tuple): Quantidades de ações.
+                          Stock counts.
+        ciclos (tuple): Quantidades de ciclos medidos.
+                        Measured cycle counts.
+        destinos (tuple): Destinos de gravação (ver DESTINOS_CENARIO).
+                          Storage targets (see DESTINOS_CENARIO).
+        moedas (int): Moedas por ciclo.
+                      Currencies per cycle.
+        latencia (float): Atraso de cada stub por requisição, em segundos.
+                          Each stub's delay per request, in seconds.
+        banco (tuple, optional): (host, user, password, database) descartável para o destino mysql.
+                                 Disposable (host, user, password, database) for the mysql target.
+
+    Returns:
+        dict: Nome do cenário -> métricas (ciclos/s, p50/p99 em ms, pico de RSS, bytes gravados).
+              Scenario name -> metrics (cycles/s, p50/p99 in ms, peak RSS, bytes written).
+    """
+    servidor_yahoo, url_yahoo = iniciar_servidor_stub(ManipuladorYahoo, latencia)
+    servidor_moedas, url_moedas = iniciar_servidor_stub(ManipuladorAwesomeAPI, latencia)
+    contexto = multiprocessing.get_context("spawn")
+    resultados = {}
+    try:
+        for quantidade in simbolos:
+            for quantidade_ciclos in ciclos:
+                for destino in destinos:
+                    nome = nome_cenario(quantidade, moedas, quantidade_ciclos, destino)
+                    fila = contexto.Queue()
+                    processo = contexto.Process(
+                        target=_executar_cenario,
+                        args=(quantidade, moedas, quantidade_ciclos, destino, url_yahoo, url_moedas, banco, fila, fila_logs_processos())
+                    )
+                    processo.start()
+                    try:
+                        resultados[nome], = receber_resultados(fila, [processo], PRAZO_CICLO * (quantidade_ciclos + 1) + 600)
+                    except (RuntimeError, TimeoutError) as e:
+                        resultados[nome] = {"erro": f"cenário sem resultado: {e} | scenario without result: {e}"}
+                    logger.info(f"Cenário {nome}: {resultados[nome]} | Scenario {nome}: {resultados[nome]}")
+    finally:
+        servidor_yahoo.shutdown()
+        servidor_moedas.shutdown()
+    return resultados
+
+def _maquina():
+    return {"plataforma": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()}
+
+def gravar_base(resultados, caminho):
+    """
+    Grava (ou atualiza) a base de comparação com os resultados dos cenários e a máquina em que rodaram.
+    Writes (or updates) the comparison baseline with the scenario results and the machine they ran on.
+    """
+    caminho = Path(caminho)
+    base = json.loads(caminho.read_text(encoding="utf-8")) if caminho.exists() else {"cenarios": {}}
+    base["maquina"] = _maquina()
+    base["cenarios"].update({nome: resultado for nome, resultado in resultados.items() if "erro" not in resultado})
+    caminho.write_text(json.dumps(base, indent=2, sort_keys=True), encoding="utf-8")
+    logger.info(f"Base gravada em {caminho} | Baseline written to {caminho}")
+
+def comparar_com_base(resultados, caminho, tolerancia=0.1):
+    """
+    Compara os resultados com a base gravada e retorna as métricas que pioraram além da tolerância.
+    Compares the results with the stored baseline and returns the metrics that got worse beyond the tolerance.
+
+    Args:
+        resultados (dict): Retorno de bench_cenarios.
+                           bench_cenarios's return value.
+        caminho (str): Arquivo da base (ver gravar_base).
+                       Baseline file (see gravar_base).
+        tolerancia (float): Piora relativa aceita (0.1 = 10%).
+                            Accepted relative degradation (0.1 = 10%).
+
+    Returns:
+        list: Regressões (cenário, métrica, base, atual, variação relativa).
+              Regressions (scenario, metric, baseline, current, relative change).
+    """
+    base = json.loads(Path(caminho).read_text(encoding="utf-8"))
+    if base.get("maquina") != _maquina():
+        logger.warning(f"Base gravada em outra máquina: {base.get('maquina')} | Baseline recorded on another machine: {base.get('maquina')}")
+    regressoes = []
+    for nome, resultado in resultados.items():
+        referencia = base["cenarios"].get(nome)
+        if referencia is None:
+            logger.warning(f"Cenário {nome} sem base | Scenario {nome} without baseline")
+            continue
+        if "erro" in resultado or resultado["cotacoes"] < resultado["cotacoes_esperadas"]:
+            regressoes.append({"cenario": nome, "metrica": "cotacoes", "base": referencia["cotacoes"], "atual": resultado.get("cotacoes"), "variacao": None})
+            continue
+        for metrica, maior_melhor in METRICAS_CENARIO.items():
+            anterior, atual = referencia.get(metrica), resultado[metrica]
+            if not anterior:
+                continue
+            variacao = (atual - anterior) / anterior
+            if (-variacao if maior_melhor else variacao) > tolerancia:
+                regressoes.append({"cenario": nome, "metrica": metrica, "base": anterior, "atual": atual, "variacao": variacao})
+    return regressoes
@@ -0,0 +1,315 @@
+import multiprocessing
+import random
+import resource
+import tempfile
+import time
+import pandas as pd
+import pyarrow.dataset as ds
+from pathlib import Path
+import file_handler
+from file_handler import salvar_parquet, EscritorDataset, compactar_dataset, estatisticas_arquivos
+from history_reader import carregar_precos
+from database_manager import (
+    conectar_banco_dados, criar_tabelas, inserir_lote, carregar_arquivo_local, ultima_cotacao,
+    cotacoes_no_intervalo, COLUNAS_TABELAS
+)
+from datetime import datetime, timedelta
+from benchmarks.stubs import gerar_ciclo_acoes, gerar_colunas_acoes, percentil, receber_resultados
+from logger_config import configurar_logs_processo, fila_logs_processos, logger
+
+
+def bench_insercao(host, user, password, linhas=100000, tamanhos_chunk=(100, 1000, 5000), database="StockScraperBench"):
+    """
+    Mede linhas por segundo de cada estratégia de escrita no MySQL.
+    Measures rows per second for each MySQL write strategy.
+
+    Estratégias: uma linha por execute (antiga), executemany por chunk e LOAD DATA LOCAL INFILE.
+    Strategies: one row per execute (legacy), executemany per chunk and LOAD DATA LOCAL INFILE.
+
+    Args:
+        host (str): Host do banco de dados.
+                    Database host.
+        user (str): Usuário do banco de dados.
+                    Database user.
+        password (str): Senha do banco de dados.
+                        Database password.
+        linhas (int): Linhas sintéticas por estratégia.
+                      Synthetic rows per strategy.
+        tamanhos_chunk (tuple): Tamanhos de chunk do executemany a medir.
+                                executemany chunk sizes to measure.
+        database (str): Banco descartável usado no benchmark.
+                        Disposable database used by the benchmark.
+
+    Returns:
+        dict: Linhas por segundo de cada estratégia.
+              Rows per second for each strategy.
+    """
+    conn, cursor = conectar_banco_dados(host, user, password, database, local_infile=True)
+    colunas = gerar_colunas_acoes(linhas)
+    nomes = list(COLUNAS_TABELAS["acoes"])
+    sql = f"INSERT INTO acoes ({', '.join(nomes)}) VALUES ({', '.join(['%s'] * len(nomes))})"
+
+    def por_linha():
+        for linha in zip(*(colunas[nome] for nome in nomes)):
+            cursor.execute(sql, linha)
+
+    estrategias = {"por_linha": por_linha}
+    for tamanho in tamanhos_chunk:
+        estrategias[f"executemany_{tamanho}"] = lambda tamanho=tamanho: inserir_lote(cursor, "acoes", colunas, tamanho)
+    estrategias["load_data"] = lambda: carregar_arquivo_local(cursor, "acoes", colunas)
+
+    resultados = {}
+    try:
+        for nome, funcao in estrategias.items():
+            cursor.execute("DROP TABLE IF EXISTS acoes")
+            criar_tabelas(cursor)
+            inicio = time.perf_counter()
+            funcao()
+            conn.commit()
+            resultados[nome] = linhas / (time.perf_counter() - inicio)
+            logger.info(f"Inserção ({nome}): {resultados[nome]:.0f} linhas/s | Insert ({nome}): {resultados[nome]:.0f} rows/s")
+    finally:
+        cursor.execute(f"DROP DATABASE {database}")
+        cursor.close()
+        conn.close()
+    return resultados
+
+def bench_esquema(host, user, password, linhas=3000000, consultas=200, database="StockScraperBench"):
+    """
+    Compara a latência de consultas entre o esquema simples e o de série temporal.
+    Compares query latency between the simple and the time-series schema.
+
+    Mede "última cotação de X" e "cotações de X em um dia" sobre linhas sintéticas.
+    Measures "latest quote for X" and "quotes for X over one day" over synthetic rows.
+
+    Args:
+        host (str): Host do banco de dados.
+                    Database host.
+        user (str): Usuário do banco de dados.
+                    Database user.
+        password (str): Senha do banco de dados.
+                        Database password.
+        linhas (int): Linhas sintéticas carregadas em cada esquema.
+                      Synthetic rows loaded into each schema.
+        consultas (int): Consultas de cada tipo.
+                         Queries of each kind.
+        database (str): Banco descartável usado no benchmark.
+                        Disposable database used by the benchmark.
+
+    Returns:
+        dict: Latências p50/p99 em milissegundos por esquema e consulta.
+              p50/p99 latencies in milliseconds per schema and query.
+    """
+    conn, cursor = conectar_banco_dados(host, user, password, database, local_infile=True)
+    # Ciclos de 15 minutos espalham as linhas por alguns meses (várias partições)
+    # 15-minute cycles spread the rows over a few months (several partitions)
+    colunas = gerar_colunas_acoes(linhas, passo=timedelta(minutes=15))
+    simbolos = sorted(set(colunas["acao"][:500]))
+    primeiro_dia = datetime.strptime(colunas["horario"][0], "%Y-%m-%d %H:%M:%S")
+    dias = max(1, (datetime.strptime(colunas["horario"][-1], "%Y-%m-%d %H:%M:%S") - primeiro_dia).days)
+    gerador = random.Random(7)
+    resultados = {}
+    try:
+        for modo in ("simples", "serie_temporal"):
+            cursor.execute("DROP TABLE IF EXISTS acoes")
+            criar_tabelas(cursor, modo)
+            carregar_arquivo_local(cursor, "acoes", colunas)
+            conn.commit()
+            latencias = {"ultima": [], "dia": []}
+            for _ in range(consultas):
+                simbolo = gerador.choice(simbolos)
+                inicio = time.perf_counter()
+                ultima_cotacao(cursor, "acoes", simbolo)
+                latencias["ultima"].append((time.perf_counter() - inicio) * 1000)
+                dia = primeiro_dia + timedelta(days=gerador.randrange(dias))
+                inicio = time.perf_counter()
+                cotacoes_no_intervalo(cursor, "acoes", simbolo, dia, dia + timedelta(days=1))
+                latencias["dia"].append((time.perf_counter() - inicio) * 1000)
+            for consulta, valores in latencias.items():
+                resultados[f"{modo}_{consulta}"] = {"p50_ms": percentil(valores, 50), "p99_ms": percentil(valores, 99)}
+            logger.info(f"Esquema {modo}: {resultados} | Schema {modo}: {resultados}")
+    finally:
+        cursor.execute(f"DROP DATABASE {database}")
+        cursor.close()
+        conn.close()
+    return resultados
+
+def bench_dataset(ciclos=2000, simbolos=25, intervalo=10, linhas_por_grupo=10000):
+    """
+    Compara um arquivo Parquet por ciclo com o dataset particionado, antes e depois da compactação.
+    Compares one Parquet file per cycle with the partitioned dataset, before and after compaction.
+
+    Args:
+        ciclos (int): Quantidade de ciclos simulados.
+                      Number of simulated cycles.
+        simbolos (int): Símbolos por ciclo.
+                        Symbols per cycle.
+        intervalo (int): Segundos entre ciclos simulados.
+                         Seconds between simulated cycles.
+        linhas_por_grupo (int): Linhas por row group do dataset.
+                                Rows per dataset row group.
+
+    Returns:
+        dict: Arquivos, bytes, segundos de escrita e de leitura de cada layout.
+              Files, bytes, write seconds and read seconds for each layout.
+    """
+    gerador = random.Random(42)
+    nomes = [f"SYM{i:05d}" for i in range(simbolos)]
+    inicio_ciclos = datetime(2024, 1, 1, 10)
+    lotes = [gerar_ciclo_acoes(nomes, inicio_ciclos + timedelta(seconds=intervalo * i), gerador) for i in range(ciclos)]
+    resultados = {}
+    with tempfile.TemporaryDirectory() as temporario:
+        legado = Path(temporario) / "legado"
+        inicio = time.perf_counter()
+        for i, dados in enumerate(lotes):
+            salvar_parquet(dados, f"dados_acoes_{i:06d}.parquet", legado)
+        escrita = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        linhas = len(pd.concat(pd.read_parquet(a) for a in sorted(legado.glob("dados_acoes_*.parquet"))))
+        resultados["um_arquivo_por_ciclo"] = {
+            **estatisticas_arquivos(legado), "linhas": linhas,
+            "segundos_escrita": escrita, "segundos_leitura": time.perf_counter() - inicio,
+        }
+
+        raiz = Path(temporario) / "dataset"
+        inicio = time.perf_counter()
+        with EscritorDataset(raiz, linhas_por_grupo) as escritor:
+            for dados in lotes:
+                escritor.adicionar("acoes", dados)
+        escrita = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        linhas = ds.dataset(raiz, format="parquet", partitioning="hive").to_table().num_rows
+        resultados["dataset"] = {
+            **estatisticas_arquivos(raiz), "linhas": linhas,
+            "segundos_escrita": escrita, "segundos_leitura": time.perf_counter() - inicio,
+        }
+
+        # Compactação de um dataset com vários arquivos pequenos (um escritor por ciclo)
+        # Compaction of a dataset with many small files (one writer per cycle)
+        fragmentado = Path(temporario) / "fragmentado"
+        for dados in lotes[:min(ciclos, 500)]:
+            with EscritorDataset(fragmentado, linhas_por_grupo) as escritor:
+                escritor.adicionar("acoes", dados)
+        antes = estatisticas_arquivos(fragmentado)
+        inicio = time.perf_counter()
+        compactar_dataset(fragmentado, linhas_por_grupo)
+        resultados["compactacao"] = {
+            "antes": antes, "depois": estatisticas_arquivos(fragmentado),
+            "segundos": time.perf_counter() - inicio,
+        }
+    logger.info(f"Dataset: {resultados} | Dataset: {resultados}")
+    return resultados
+
+def bench_leitura(dias=30, ciclos_por_dia=48, simbolos=200, consultados=5):
+    """
+    Compara carregar_precos com o glob + concat de todos os arquivos por ciclo no pandas.
+    Compares carregar_precos with globbing + concatenating every per-cycle file in pandas.
+
+    A consulta pede poucos símbolos, três colunas e um único dia no meio do período.
+    The query asks for a few symbols, three columns and a single day in the middle of the period.
+
+    Args:
+        dias (int): Dias sintéticos.
+                    Synthetic days.
+        ciclos_por_dia (int): Ciclos por dia.
+                              Cycles per day.
+        simbolos (int): Símbolos por ciclo.
+                        Symbols per cycle.
+        consultados (int): Símbolos pedidos na consulta.
+                           Symbols requested by the query.
+
+    Returns:
+        dict: Segundos e linhas retornadas por cada abordagem.
+              Seconds and returned rows for each approach.
+    """
+    gerador = random.Random(42)
+    nomes = [f"SYM{i:05d}" for i in range(simbolos)]
+    primeiro = datetime(2024, 1, 1)
+    passo = timedelta(days=1) / ciclos_por_dia
+    alvo = nomes[:consultados]
+    inicio_consulta = primeiro + timedelta(days=dias // 2)
+    fim_consulta = inicio_consulta + timedelta(days=1)
+    colunas = ["AÇÃO", "HORÁRIO", "COTAÇÃO"]
+    resultados = {}
+    with tempfile.TemporaryDirectory() as temporario:
+        legado, raiz = Path(temporario) / "legado", Path(temporario) / "dataset"
+        with EscritorDataset(raiz) as escritor:
+            for i in range(dias * ciclos_por_dia):
+                dados = gerar_ciclo_acoes(nomes, primeiro + passo * i, gerador)
+                salvar_parquet(dados, f"dados_acoes_{i:06d}.parquet", legado)
+                escritor.adicionar("acoes", dados)
+
+        inicio = time.perf_counter()
+        tudo = pd.concat(pd.read_parquet(a) for a in legado.glob("dados_acoes_*.parquet"))
+        horarios = pd.to_datetime(tudo["HORÁRIO"])
+        filtrado = tudo.loc[tudo["AÇÃO"].isin(alvo) & (horarios >= inicio_consulta) & (horarios < fim_consulta), colunas]
+        resultados["glob_concat"] = {"segundos": time.perf_counter() - inicio, "linhas": len(filtrado)}
+
+        inicio = time.perf_counter()
+        tabela = carregar_precos(alvo, inicio_consulta, fim_consulta, colunas, raiz=raiz)
+        resultados["carregar_precos"] = {"segundos": time.perf_counter() - inicio, "linhas": tabela.num_rows}
+    logger.info(f"Leitura: {resultados} | Read: {resultados}")
+    return resultados
+
+def _medir_excel(nome_funcao, linhas, diretorio, fila, fila_logs):
+    """
+    Executa uma exportação Excel em um processo isolado e mede tempo e pico de RSS.
+    Runs one Excel export in an isolated process and measures time and peak RSS.
+    """
+    configurar_logs_processo(fila_logs)
+    gerador = random.Random(42)
+    nomes = [f"SYM{i:05d}" for i in range(500)]
+    dados = []
+    for i in range(0, linhas, len(nomes)):
+        dados.extend(gerar_ciclo_acoes(nomes, datetime(2024, 1, 1) + timedelta(seconds=10 * i), gerador)[:linhas - i])
+    df_acoes = pd.DataFrame(dados)
+    del dados
+    moedas = [{
+        "NOME": f"Moeda {i}",
+        "MOEDA": f"M{i:02d}",
+        "COTAÇÃO": round(gerador.uniform(0.1, 10), 4),
+        "VARIAÇÃO PERCENTUAL": 0.0,
+        "TENDÊNCIA": "Caindo | Down",
+        "DATA E HORÁRIO": "2024-01-01 00:00:00",
+    } for i in range(20)]
+    rss_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    getattr(file_handler, nome_funcao)(df_acoes, moedas, f"{nome_funcao}.xlsx", diretorio)
+    segundos = time.perf_counter() - inicio
+    # ru_maxrss é em KiB no Linux | ru_maxrss is in KiB on Linux
+    rss_depois = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    fila.put({
+        "segundos": segundos,
+        "linhas_por_segundo": linhas / segundos,
+        "pico_rss_mb": rss_depois / 1024,
+        "aumento_rss_mb": (rss_depois - rss_antes) / 1024,
+    })
+
+def bench_excel(linhas=100000, funcoes=("salvar_excel_formatado", "salvar_excel_streaming")):
+    """
+    Compara linhas por segundo e pico de memória das exportações Excel, cada uma em seu processo.
+    Compares rows per second and peak memory of the Excel exports, each in its own process.
+
+    Args:
+        linhas (int): Linhas na aba de ações.
+                      Rows in the stock sheet.
+        funcoes (tuple): Nomes das funções de file_handler a medir.
+                         Names of the file_handler functions to measure.
+
+    Returns:
+        dict: Métricas de cada função.
+              Metrics for each function.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    resultados = {}
+    with tempfile.TemporaryDirectory() as temporario:
+        for nome in funcoes:
+            fila = contexto.Queue()
+            processo = contexto.Process(target=_medir_excel, args=(nome, linhas, temporario, fila, fila_logs_processos()))
+            processo.start()
+            try:
+                resultados[nome], = receber_resultados(fila, [processo])
+            except (RuntimeError, TimeoutError) as e:
+                resultados[nome] = {"erro": str(e)}
+            logger.info(f"Excel ({nome}): {resultados[nome]} | Excel ({nome}): {resultados[nome]}")
+    return resultados
@@ -0,0 +1,379 @@
+import json
+import queue
+import random
+import threading
+import time
+import numpy as np
+import pandas as pd
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from http_client import obter_sessao
+from config import TIMEOUT_HTTP
+from database_manager import COLUNAS_TABELAS
+from datetime import datetime, timedelta
+
+
+# Prazo padrão para um processo de benchmark devolver o resultado | Default deadline for a benchmark process to return its result
+PRAZO_RESULTADO = 3600
+# Intervalo entre as verificações dos processos | Interval between process checks
+INTERVALO_VERIFICACAO = 1.0
+
+
+def receber_resultados(fila, processos, prazo=PRAZO_RESULTADO):
+    """
+    Lê um resultado por processo da fila, sem travar se algum processo morrer antes de enviar o seu.
+    Reads one result per process from the queue, without hanging if a process dies before sending its own.
+
+    Em caso de falha os processos restantes são encerrados.
+    On failure the remaining processes are terminated.
+
+    Args:
+        fila (multiprocessing.Queue): Fila em que cada processo envia um resultado.
+                                      Queue each process sends one result to.
+        processos (list): Processos já iniciados.
+                          Already started processes.
+        prazo (float): Segundos para receber todos os resultados.
+                       Seconds to receive every result.
+
+    Returns:
+        list: Resultados, na ordem de chegada.
+              Results, in arrival order.
+
+    Raises:
+        RuntimeError: Se um processo terminar com erro (ex.: falta de memória, erro de import) ou
+                      todos terminarem sem enviar os resultados.
+                      If a process exits with an error (e.g. out of memory, import error) or all
+                      of them exit without sending the results.
+        TimeoutError: Se o prazo acabar.
+                      If the deadline runs out.
+    """
+    limite = time.monotonic() + prazo
+    resultados = []
+    try:
+        while len(resultados) < len(processos):
+            try:
+                resultados.append(fila.get(timeout=INTERVALO_VERIFICACAO))
+                continue
+            except queue.Empty:
+                pass
+            falhos = [f"{processo.name}={processo.exitcode}" for processo in processos if processo.exitcode]
+            if falhos:
+                raise RuntimeError(f"processos terminaram com erro: {', '.join(falhos)} | "
+                                   f"processes exited with an error: {', '.join(falhos)}")
+            if all(processo.exitcode is not None for processo in processos) and fila.empty():
+                raise RuntimeError(f"processos terminaram sem enviar {len(processos) - len(resultados)} resultados | "
+                                   f"processes exited without sending {len(processos) - len(resultados)} results")
+            if time.monotonic() >= limite:
+                raise TimeoutError(f"sem resultados em {prazo}s | no results within {prazo}s")
+    except (RuntimeError, TimeoutError):
+        for processo in processos:
+            if processo.is_alive():
+                processo.terminate()
+        raise
+    finally:
+        for processo in processos:
+            processo.join()
+    return resultados
+
+def cronometrar(funcao, repeticoes):
+    """
+    Executa a função várias vezes e retorna o tempo médio em segundos.
+    Runs the function several times and returns the mean time in seconds.
+    """
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes
+
+def percentil(valores, percentil):
+    """
+    Retorna o percentil (0-100) de uma lista de valores.
+    Returns the percentile (0-100) of a list of values.
+    """
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * percentil / 100))]
+
+class ManipuladorAwesomeAPI(BaseHTTPRequestHandler):
+    """
+    Responde como a AwesomeAPI (/json/last/XXX-BRL) com cotações sintéticas.
+    Answers like AwesomeAPI (/json/last/XXX-BRL) with synthetic quotes.
+
+    Moedas iniciadas por "X" são inválidas e derrubam a requisição inteira, como na API real.
+    Currencies starting with "X" are invalid and fail the whole request, as in the real API.
+    """
+
+    protocol_version = "HTTP/1.1"
+    latencia = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latencia)
+        pares = self.path.rsplit("/", 1)[-1].split(",")
+        if any(par.startswith("X") for par in pares):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        corpo = {}
+        for par in pares:
+            moeda = par.split("-")[0]
+            bid = round(random.uniform(0.5, 10), 4)
+            corpo[f"{moeda}BRL"] = {"code": moeda, "codein": "BRL", "bid": str(bid), "ask": str(round(bid * 1.001, 4))}
+        dados = json.dumps(corpo).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, format, *args):
+        pass
+
+class ManipuladorFalhas(ManipuladorAwesomeAPI):
+    """
+    Stub da AwesomeAPI com injeção de falhas: erros 503, conexões travadas e queda total.
+    AwesomeAPI stub with fault injection: 503 errors, hung connections and full outage.
+
+    Os atributos de classe podem ser trocados com o servidor rodando (servidor.RequestHandlerClass).
+    Class attributes can be changed while the server runs (servidor.RequestHandlerClass).
+    """
+
+    taxa_erro = 0.0
+    taxa_travamento = 0.0
+    travamento = 30.0
+    fora_do_ar = False
+
+    def do_GET(self):
+        sorteio = random.random()
+        if self.fora_do_ar or sorteio < self.taxa_erro:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if sorteio < self.taxa_erro + self.taxa_travamento:
+            time.sleep(self.travamento)
+        super().do_GET()
+
+def iniciar_servidor_stub(manipulador=ManipuladorAwesomeAPI, latencia=0.0, **atributos):
+    """
+    Inicia um servidor HTTP local em uma porta livre, em segundo plano.
+    Starts a local HTTP server on a free port, in the background.
+
+    Args:
+        manipulador (type): Classe que trata as requisições.
+                            Request handler class.
+        latencia (float): Atraso artificial por requisição, em segundos.
+                          Artificial delay per request, in seconds.
+        **atributos: Outros atributos de classe do manipulador (ex.: taxa_erro).
+                     Other handler class attributes (e.g. taxa_erro).
+
+    Returns:
+        tuple: Servidor e URL base.
+               Server and base URL.
+    """
+    classe = type(manipulador.__name__, (manipulador,), {"latencia": latencia, **atributos})
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), classe)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+def gerar_colunas_acoes(quantidade, simbolos=500, inicio=datetime(2024, 1, 1), passo=timedelta(seconds=10)):
+    """
+    Gera um lote colunar sintético de cotações de ações.
+    Generates a synthetic columnar batch of stock quotes.
+
+    Args:
+        quantidade (int): Quantidade de linhas.
+                          Number of rows.
+        simbolos (int): Quantidade de símbolos distintos.
+                        Number of distinct symbols.
+        inicio (datetime): Horário da primeira linha.
+                           Timestamp of the first row.
+        passo (timedelta): Intervalo entre ciclos.
+                           Interval between cycles.
+
+    Returns:
+        dict: Colunas da tabela acoes.
+              Columns of the acoes table.
+    """
+    gerador = random.Random(42)
+    nomes = [f"SYM{i:05d}" for i in range(simbolos)]
+    colunas = {coluna: [] for coluna in COLUNAS_TABELAS["acoes"]}
+    for i in range(quantidade):
+        symbol = nomes[i % simbolos]
+        variacao = gerador.uniform(-5, 5)
+        colunas["empresa"].append(f"Empresa {symbol}")
+        colunas["acao"].append(symbol)
+        colunas["cotacao"].append(round(gerador.uniform(1, 500), 2))
+        colunas["variacao_percentual"].append(variacao)
+        colunas["horario"].append((inicio + passo * (i // simbolos)).strftime("%Y-%m-%d %H:%M:%S"))
+        colunas["tendencia"].append("Subindo | Up" if variacao > 0 else "Caindo | Down")
+        colunas["link"].append(f"https://finance.yahoo.com/quote/{symbol}")
+    return colunas
+
+def gerar_ciclo_acoes(simbolos, horario, gerador=random):
+    """
+    Gera as linhas de um ciclo de coleta de ações no formato de coletar_dados_acoes.
+    Generates the rows of one stock collection cycle in the coletar_dados_acoes format.
+
+    Args:
+        simbolos (list): Símbolos do ciclo.
+                         Symbols of the cycle.
+        horario (datetime): Horário do ciclo.
+                            Cycle timestamp.
+        gerador (Random): Gerador de números aleatórios.
+                          Random number generator.
+
+    Returns:
+        list: Lista de dicionários com os dados das ações.
+              List of dictionaries with stock data.
+    """
+    texto_horario = horario.strftime("%Y-%m-%d %H:%M:%S")
+    dados = []
+    for symbol in simbolos:
+        variacao = gerador.uniform(-5, 5)
+        dados.append({
+            "EMPRESA": f"Empresa {symbol}",
+            "AÇÃO": symbol,
+            "COTAÇÃO": round(gerador.uniform(1, 500), 2),
+            "VARIAÇÃO PERCENTUAL": variacao,
+            "HORÁRIO": texto_horario,
+            "TENDÊNCIA": "Subindo | Up" if variacao > 0 else "Caindo | Down",
+            "LINK": f"https://finance.yahoo.com/quote/{symbol}"
+        })
+    return dados
+
+def transporte_historico_sintetico(latencia=0.0, falhar=None):
+    """
+    Cria um transporte de histórico diário sintético e determinístico (passeio aleatório por símbolo).
+    Creates a synthetic, deterministic daily history transport (random walk per symbol).
+
+    Args:
+        latencia (float): Atraso artificial por requisição, em segundos.
+                          Artificial delay per request, in seconds.
+        falhar (function, optional): Recebe (símbolos, início, fim) e diz se a requisição deve falhar com HTTP 404.
+                                     Takes (symbols, start, end) and tells whether the request should fail with HTTP 404.
+
+    Returns:
+        function: Transporte compatível com baixar_historico_yfinance.
+                  Transport compatible with baixar_historico_yfinance.
+    """
+    def baixar(simbolos, inicio, fim):
+        time.sleep(latencia)
+        if falhar is not None and falhar(simbolos, inicio, fim):
+            resposta = requests.Response()
+            resposta.status_code = 404
+            raise requests.HTTPError("404 sintético | synthetic 404", response=resposta)
+        datas = pd.bdate_range(inicio, fim - timedelta(days=1))
+        dias = (datas - pd.Timestamp("2000-01-01")).days.to_numpy()
+        colunas = {}
+        for simbolo in simbolos:
+            # Preço em função só do símbolo e do dia: downloads repetidos dão os mesmos valores
+            # Price depends only on the symbol and the day: repeated downloads give the same values
+            semente = sum(map(ord, simbolo))
+            colunas[simbolo] = 50 + semente % 100 + 10 * np.sin(dias / (7 + semente % 13))
+        return pd.concat({"Close": pd.DataFrame(colunas, index=datas)}, axis=1)
+
+    return baixar
+
+def precos_sinteticos(simbolo, dias, semente=42):
+    """
+    Gera fechamentos diários sintéticos (passeio aleatório) determinísticos por símbolo e semente.
+    Generates synthetic daily closes (random walk), deterministic per symbol and seed.
+
+    Args:
+        simbolo (str): Símbolo da ação.
+                       Stock symbol.
+        dias (int): Quantidade de pregões.
+                    Number of sessions.
+        semente (int): Semente do gerador.
+                       Generator seed.
+
+    Returns:
+        list: Fechamentos, do mais antigo ao mais recente.
+              Closes, from oldest to newest.
+    """
+    gerador = random.Random(f"{semente}:{simbolo}")
+    preco = gerador.uniform(5, 500)
+    precos = []
+    for _ in range(dias):
+        preco *= 1 + gerador.gauss(0, 0.02)
+        precos.append(round(preco, 4))
+    return precos
+
+class ManipuladorYahoo(BaseHTTPRequestHandler):
+    """
+    Responde como o endpoint spark do Yahoo (/v7/finance/spark?symbols=A,B&range=2d) com fechamentos sintéticos.
+    Answers like Yahoo's spark endpoint (/v7/finance/spark?symbols=A,B&range=2d) with synthetic closes.
+
+    Símbolos iniciados por "Z" ficam fora da resposta, como papéis sem dados na API real.
+    Symbols starting with "Z" are left out of the response, like tickers without data in the real API.
+    """
+
+    protocol_version = "HTTP/1.1"
+    latencia = 0.0
+    semente = 42
+
+    def do_GET(self):
+        time.sleep(self.latencia)
+        endereco = urlparse(self.path)
+        if endereco.path != "/v7/finance/spark":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        consulta = parse_qs(endereco.query)
+        simbolos = [s for s in consulta.get("symbols", [""])[0].split(",") if s and not s.startswith("Z")]
+        dias = int(consulta.get("range", ["2d"])[0].rstrip("d"))
+        hoje = int(time.time()) // 86400 * 86400
+        carimbos = [hoje - 86400 * (dias - 1 - i) for i in range(dias)]
+        corpo = {"spark": {"result": [
+            {"symbol": simbolo, "response": [{
+                "timestamp": carimbos,
+                "indicators": {"quote": [{"close": precos_sinteticos(simbolo, dias, self.semente)}]},
+            }]}
+            for simbolo in simbolos
+        ], "error": None}}
+        dados = json.dumps(corpo).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, format, *args):
+        pass
+
+def baixar_spark(url_base, simbolos, periodo="2d"):
+    """
+    Transporte HTTP para o stub do Yahoo, no formato de baixar_yfinance (função de módulo, para processos spawn).
+    HTTP transport for the Yahoo stub, in baixar_yfinance's format (module-level function, for spawn processes).
+
+    Args:
+        url_base (str): URL base do stub (ver iniciar_servidor_stub com ManipuladorYahoo).
+                        Stub base URL (see iniciar_servidor_stub with ManipuladorYahoo).
+        simbolos (list): Lista de símbolos.
+                         List of symbols.
+        periodo (str): Período do histórico (padrão: "2d").
+                       History period (default: "2d").
+
+    Returns:
+        DataFrame: Histórico com colunas (campo, símbolo).
+                   History with (field, symbol) columns.
+    """
+    response = obter_sessao().get(
+        f"{url_base}/v7/finance/spark",
+        params={"symbols": ",".join(simbolos), "range": periodo, "interval": "1d"},
+        timeout=TIMEOUT_HTTP,
+    )
+    response.raise_for_status()
+    fechamentos = {}
+    for item in response.json()["spark"]["result"]:
+        resposta = item["response"][0]
+        fechamentos[item["symbol"]] = pd.Series(
+            resposta["indicators"]["quote"][0]["close"], index=pd.to_datetime(resposta["timestamp"], unit="s")
+        )
+    if not fechamentos:
+        return pd.DataFrame()
+    return pd.concat({"Close": pd.DataFrame(fechamentos)}, axis=1)
@@ -0,0 +1,184 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+from config import LIMITES_TAXA
+from logger_config import logger
+
+
+class LimitadorTaxa:
+    """
+    Limitador de taxa no estilo token bucket, seguro entre threads.
+    Thread-safe token bucket rate limiter.
+
+    Args:
+        taxa (float): Tokens repostos por segundo.
+                      Tokens refilled per second.
+        capacidade (int): Quantidade máxima de tokens (rajada).
+                          Maximum number of tokens (burst).
+    """
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade)
+        self._tokens = float(capacidade)
+        self._atualizado = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _repor(self, agora):
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado) * self.taxa)
+        self._atualizado = agora
+
+    def adquirir(self, limite=None):
+        """
+        Aguarda até haver um token disponível ou até o limite ser atingido.
+        Waits until a token is available or the deadline is reached.
+
+        Args:
+            limite (float, optional): Prazo absoluto em time.monotonic().
+                                      Absolute deadline in time.monotonic().
+
+        Returns:
+            bool: True se o token foi obtido, False se o prazo expirou.
+                  True if the token was acquired, False if the deadline expired.
+        """
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._repor(agora)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                espera = (1 - self._tokens) / self.taxa
+            if limite is not None and agora + espera > limite:
+                return False
+            time.sleep(espera)
+
+_limitadores = {}
+_limitadores_lock = threading.Lock()
+_limites = dict(LIMITES_TAXA)
+
+def configurar_limites(limites=LIMITES_TAXA, partes=1):
+    """
+    Redefine os limites por host deste processo, dividindo-os entre processos que compartilham a mesma cota.
+    Redefines this process's per-host limits, splitting them across processes sharing the same quota.
+
+    Args:
+        limites (dict): Host -> (requisições por segundo, rajada), como em LIMITES_TAXA.
+                        Host -> (requests per second, burst), as in LIMITES_TAXA.
+        partes (int): Processos que dividem a cota; cada um fica com 1/partes.
+                      Processes splitting the quota; each one gets 1/partes.
+    """
+    with _limitadores_lock:
+        _limites.clear()
+        _limites.update({
+            dominio: (taxa / partes, max(1.0, capacidade / partes)) for dominio, (taxa, capacidade) in limites.items()
+        })
+        _limitadores.clear()
+
+def limitador_para(url_ou_host):
+    """
+    Retorna o limitador de taxa compartilhado do host, conforme config.LIMITES_TAXA (ou configurar_limites).
+    Returns the shared rate limiter for the host, as configured in config.LIMITES_TAXA (or configurar_limites).
+
+    Args:
+        url_ou_host (str): URL completa ou nome do host.
+                           Full URL or host name.
+
+    Returns:
+        LimitadorTaxa: Limitador do host, ou None se o host não tiver limite.
+                       Host limiter, or None if the host has no limit.
+    """
+    host = urlparse(url_ou_host).hostname if "://" in url_ou_host else url_ou_host
+    # URL sem host (ex.: "http://") não tem limitador | A URL without a host (e.g. "http://") has no limiter
+    if not host:
+        return None
+    for dominio, (taxa, capacidade) in list(_limites.items()):
+        if host == dominio or host.endswith("." + dominio):
+            with _limitadores_lock:
+                if dominio not in _limitadores:
+                    _limitadores[dominio] = LimitadorTaxa(taxa, capacidade)
+                return _limitadores[dominio]
+    return None
+
+def aguardar_taxa(url_ou_host, limite=None):
+    """
+    Consome um token do limitador do host, levantando TimeoutError se o prazo expirar.
+    Consumes a token from the host limiter, raising TimeoutError if the deadline expires.
+
+    Args:
+        url_ou_host (str): URL completa ou nome do host.
+                           Full URL or host name.
+        limite (float, optional): Prazo absoluto em time.monotonic().
+                                  Absolute deadline in time.monotonic().
+    """
+    limitador = limitador_para(url_ou_host)
+    if limitador is not None and not limitador.adquirir(limite):
+        raise TimeoutError(f"prazo do ciclo esgotado aguardando {url_ou_host} | cycle deadline exhausted waiting for {url_ou_host}")
+
+def calcular_limite(prazo):
+    """
+    Converte um prazo em segundos para um limite absoluto em time.monotonic().
+    Converts a deadline in seconds into an absolute time.monotonic() limit.
+
+    Args:
+        prazo (float): Prazo em segundos, ou None para sem limite.
+                       Deadline in seconds, or None for no limit.
+
+    Returns:
+        float: Limite absoluto, ou None.
+               Absolute limit, or None.
+    """
+    return None if prazo is None else time.monotonic() + prazo
+
+def executar_em_paralelo(tarefas, max_workers, limite=None):
+    """
+    Executa tarefas em um pool de threads e retorna os resultados na ordem das tarefas.
+    Runs tasks on a thread pool and returns the results in task order.
+
+    Tarefas que falharem ou não terminarem até o limite resultam em None.
+    Tasks that fail or do not finish before the limit yield None.
+
+    Args:
+        tarefas (list): Lista de funções sem argumentos.
+                        List of zero-argument functions.
+        max_workers (int): Quantidade de threads.
+                           Number of threads.
+        limite (float, optional): Prazo absoluto em time.monotonic().
+                                  Absolute deadline in time.monotonic().
+
+    Returns:
+        list: Resultados na mesma ordem de tarefas.
+              Results in the same order as tasks.
+    """
+    if max_workers <= 1:
+        resultados = []
+        for tarefa in tarefas:
+            if limite is not None and time.monotonic() >= limite:
+                logger.warning("Prazo do ciclo esgotado; tarefas restantes ignoradas. | Cycle deadline exhausted; remaining tasks skipped.")
+                resultados.append(None)
+                continue
+            resultados.append(_executar(tarefa))
+        return resultados
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futuros = [executor.submit(_executar, tarefa) for tarefa in tarefas]
+        timeout = None if limite is None else max(0.0, limite - time.monotonic())
+        _, pendentes = wait(futuros, timeout=timeout)
+        if pendentes:
+            logger.warning(f"Prazo do ciclo esgotado com {len(pendentes)} tarefas pendentes. | Cycle deadline exhausted with {len(pendentes)} pending tasks.")
+        return [None if futuro in pendentes else futuro.result() for futuro in futuros]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _executar(tarefa):
+    """
+    Executa uma tarefa registrando exceções em vez de propagá-las.
+    Runs a task, logging exceptions instead of propagating them.
+    """
+    try:
+        return tarefa()
+    except Exception as e:
+        logger.error(f"Erro em tarefa concorrente: {e} | Error in concurrent task: {e}")
+        return None
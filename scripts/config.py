@@ -1,3 +1,5 @@
+import os
+
 # Ações Nacionais (Brasil) | National Stocks (Brazil)
 ASSETS = {
     "PETR4.SA": "Petrobras",
@@ -44,3 +46,104 @@ MOEDAS = {
     "ETH": "Ethereum",
     "CAD": "Dólar Canadense"
 }
+
+
+# Quantidade de símbolos por requisição em massa ao Yahoo | Number of symbols per bulk Yahoo request
+TAMANHO_LOTE_ACOES = 200
+
+# Coleta concorrente | Concurrent collection
+MAX_WORKERS = 8
+PRAZO_CICLO = 60  # Prazo global de cada ciclo em segundos | Global deadline of each cycle in seconds
+HOST_YAHOO = "finance.yahoo.com"
+URL_AWESOMEAPI = "https://economia.awesomeapi.com.br"
+TAMANHO_LOTE_MOEDAS = 50  # Pares por requisição à AwesomeAPI | Pairs per AwesomeAPI request
+TAMANHO_POOL_HTTP = 10  # Conexões keep-alive por host | Keep-alive connections per host
+
+# Limites por host: (requisições por segundo, rajada) | Per-host limits: (requests per second, burst)
+LIMITES_TAXA = {
+    "finance.yahoo.com": (5, 10),
+    "economia.awesomeapi.com.br": (3, 5)
+}
+
+# Coleta em processos | Multi-process collection
+CAPACIDADE_FILA_PROCESSOS = 16  # Lotes em espera por fila; acima disso a etapa anterior bloqueia | Batches waiting per queue; above it the previous stage blocks
+
+# Métricas: faixas dos histogramas de latência em segundos | Metrics: latency histogram buckets in seconds
+LIMITES_HISTOGRAMA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PREFIXO_METRICAS = "stockscraper"
+
+# Resiliência das requisições | Request resilience
+TIMEOUT_HTTP = (3.05, 10)  # (conexão, leitura) em segundos | (connect, read) in seconds
+TENTATIVAS_REDE = 3  # Tentativas por requisição em falhas transitórias | Attempts per request on transient failures
+ESPERA_BASE_REDE = 0.5  # Base do backoff exponencial com jitter | Exponential backoff with jitter base
+ESPERA_MAXIMA_REDE = 8
+FALHAS_DISJUNTOR = 5  # Falhas seguidas que abrem o circuito da fonte | Consecutive failures that open the source circuit
+TEMPO_DISJUNTOR_ABERTO = 60  # Segundos até testar a fonte de novo | Seconds until the source is probed again
+TENTATIVAS_FILA_MORTOS = 20  # Ciclos repetindo um símbolo falho antes de descartá-lo | Cycles replaying a failed symbol before dropping it
+
+# Linhas por comando INSERT em lote | Rows per batched INSERT statement
+TAMANHO_CHUNK_INSERCAO = 1000
+
+# Esquema do banco: "simples" (id AUTO_INCREMENT) ou "serie_temporal" (chave (símbolo, horário) e partições mensais)
+# Database schema: "simples" (AUTO_INCREMENT id) or "serie_temporal" ((symbol, timestamp) key and monthly partitions)
+# None = automático: "serie_temporal" em bancos novos; tabelas do esquema antigo continuam em "simples" até "python main.py migrar"
+# None = automatic: "serie_temporal" on new databases; tables on the old schema stay "simples" until "python main.py migrar"
+MODO_ESQUEMA = None
+MESES_PARTICAO_A_FRENTE = 3
+
+# Pool de conexões do banco | Database connection pool
+TAMANHO_POOL_BANCO = 4
+TIMEOUT_POOL_BANCO = 30  # Segundos aguardando uma conexão livre | Seconds waiting for a free connection
+TENTATIVAS_BANCO = 3  # Tentativas por lote quando a conexão cai | Attempts per batch when the connection drops
+
+# Backfill histórico | Historical backfill
+DIAS_POR_TAREFA_BACKFILL = 365  # Dias de histórico por requisição | History days per request
+TAREFAS_POR_ONDA_BACKFILL = 32  # Tarefas gravadas e marcadas no checkpoint juntas | Tasks written and checkpointed together
+
+# Linhas por row group no dataset Parquet | Rows per row group in the Parquet dataset
+TAMANHO_GRUPO_LINHAS = 10000
+# Segundos máximos até as linhas do dataset ficarem visíveis aos leitores (0 = só ao fechar)
+# Maximum seconds until dataset rows become visible to readers (0 = only on close)
+INTERVALO_DESCARGA_DATASET = 300
+
+# Indicadores incrementais | Incremental indicators
+JANELA_INDICADORES = 20  # Cotações na janela móvel | Quotes in the rolling window
+PERIODO_EMA = 12
+INTERVALO_BARRA = 60  # Duração das barras OHLC em segundos | OHLC bar length in seconds
+
+# Cache de cotações: validade em segundos por classe com o mercado aberto | Quote cache: per-class lifetime in seconds while the market is open
+TTL_CACHE = {
+    "acoes": 60,
+    "moedas": 30
+}
+CAPACIDADE_CACHE = 10000  # Cotações mantidas em memória (LRU) | Quotes kept in memory (LRU)
+
+# Pregão de cada mercado: (fuso, abertura, fechamento, dias úteis com 0 = segunda); None = 24 horas
+# Trading session of each market: (time zone, open, close, weekdays with 0 = Monday); None = 24 hours
+HORARIOS_MERCADO = {
+    "B3": ("America/Sao_Paulo", "10:00", "17:00", (0, 1, 2, 3, 4)),
+    "NYSE": ("America/New_York", "09:30", "16:00", (0, 1, 2, 3, 4)),
+    "FOREX": ("America/New_York", None, None, (0, 1, 2, 3, 4)),
+    "CRIPTO": ("UTC", None, None, (0, 1, 2, 3, 4, 5, 6))
+}
+CRIPTOMOEDAS = {"BTC", "ETH"}
+ATRASO_COTACOES = 20 * 60  # Segundos após o fechamento até a cotação final chegar | Seconds after the close until the final quote arrives
+
+# Execução não interativa; variáveis de ambiente STOCKSCRAPER_* sobrepõem os padrões
+# Non-interactive run; STOCKSCRAPER_* environment variables override the defaults
+USAR_BANCO = os.environ.get("STOCKSCRAPER_USAR_BANCO", "sim").lower() in ["s", "sim", "y", "yes", "1", "true"]
+DB_HOST = os.environ.get("STOCKSCRAPER_DB_HOST", "localhost")
+DB_USER = os.environ.get("STOCKSCRAPER_DB_USER", "root")
+DB_PASSWORD = os.environ.get("STOCKSCRAPER_DB_PASSWORD", "")
+DB_NAME = os.environ.get("STOCKSCRAPER_DB_NAME", "CoinAI")
+TEMPO_EXECUCAO = float(os.environ.get("STOCKSCRAPER_TEMPO_EXECUCAO", "60"))  # Minutos; 0 = sem limite | Minutes; 0 = no limit
+INTERVALO_COLETA = float(os.environ.get("STOCKSCRAPER_INTERVALO", "10"))  # Segundos entre tiques | Seconds between ticks
+CAMINHO_CACHE = os.environ.get("STOCKSCRAPER_CACHE") or None  # Arquivo SQLite do cache (vazio = só memória) | Cache SQLite file (empty = memory only)
+PROCESSOS_COLETA = int(os.environ.get("STOCKSCRAPER_PROCESSOS", "0"))  # Processos coletores (0 = coleta no processo principal) | Collector processes (0 = collect in the main process)
+REGISTRO_ATIVOS = os.environ.get("STOCKSCRAPER_REGISTRO") or None  # Arquivo CSV/JSON ou "banco" (vazio = ASSETS e MOEDAS) | CSV/JSON file or "banco" (empty = ASSETS and MOEDAS)
+SHARD = os.environ.get("STOCKSCRAPER_SHARD", "0/1")  # Fatia deste coletor, "índice/total" | This collector's slice, "index/total"
+CAMINHO_CHECKPOINT_BACKFILL = os.environ.get("STOCKSCRAPER_CHECKPOINT_BACKFILL") or None  # Arquivo SQLite do checkpoint (vazio = ao lado do dataset) | Checkpoint SQLite file (empty = next to the dataset)
+CAMINHO_FILA_MORTOS = os.environ.get("STOCKSCRAPER_FILA_MORTOS") or None  # Arquivo SQLite da fila de mortos | Dead-letter SQLite file
+PORTA_METRICAS = int(os.environ.get("STOCKSCRAPER_PORTA_METRICAS", "0"))  # Endpoint HTTP local das métricas (0 = desligado) | Local HTTP metrics endpoint (0 = off)
+ARQUIVO_METRICAS = os.environ.get("STOCKSCRAPER_ARQUIVO_METRICAS") or None  # JSON Lines com as métricas de cada ciclo | JSON Lines with each cycle's metrics
+NIVEL_LOG = os.environ.get("STOCKSCRAPER_LOG_NIVEL", "INFO").upper()  # DEBUG mostra cada cotação | DEBUG shows every quote
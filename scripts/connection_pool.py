@@ -0,0 +1,246 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+import pymysql
+from config import TAMANHO_POOL_BANCO, TIMEOUT_POOL_BANCO, TENTATIVAS_BANCO
+from database_manager import conectar_banco_dados
+from logger_config import logger
+
+# Erros que indicam conexão perdida; o lote pode ser repetido em outra conexão
+# Errors that indicate a lost connection; the batch can be retried on another connection
+ERROS_CONEXAO = (pymysql.err.OperationalError, pymysql.err.InterfaceError, ConnectionError)
+
+
+class PoolConexoes:
+    """
+    Pool de conexões MySQL com pre-ping, reconexão e métricas de espera.
+    MySQL connection pool with pre-ping, reconnection and wait metrics.
+
+    Args:
+        host (str): Host do banco de dados.
+                    Database host.
+        user (str): Usuário do banco de dados.
+                    Database user.
+        password (str): Senha do banco de dados.
+                        Database password.
+        database (str): Nome do banco de dados (criado se não existir).
+                        Database name (created if it does not exist).
+        tamanho (int): Quantidade máxima de conexões abertas.
+                       Maximum number of open connections.
+        timeout (float): Segundos máximos aguardando uma conexão livre.
+                         Maximum seconds waiting for a free connection.
+        pre_ping (bool): Testa a conexão (ping com reconexão) antes de entregá-la.
+                         Tests the connection (ping with reconnect) before handing it out.
+        local_infile (bool): Habilita LOAD DATA LOCAL INFILE nas conexões.
+                             Enables LOAD DATA LOCAL INFILE on the connections.
+    """
+
+    def __init__(self, host, user, password, database, tamanho=TAMANHO_POOL_BANCO,
+                 timeout=TIMEOUT_POOL_BANCO, pre_ping=True, local_infile=False):
+        self._parametros = (host, user, password, database)
+        self._local_infile = local_infile
+        self.tamanho = tamanho
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self._livres = queue.LifoQueue(maxsize=tamanho)
+        self._lock = threading.Lock()
+        self._abertas = 0
+        self._metricas = {
+            "checkouts": 0,
+            "espera_total": 0.0,
+            "espera_max": 0.0,
+            "checkout_total": 0.0,
+            "checkout_max": 0.0,
+            "reconexoes": 0,
+            "retentativas": 0,
+        }
+
+    def _conectar(self):
+        """
+        Abre uma conexão nova em uma vaga já reservada; libera a vaga se falhar.
+        Opens a new connection in an already reserved slot; releases the slot on failure.
+        """
+        try:
+            conn, cursor = conectar_banco_dados(*self._parametros, local_infile=self._local_infile)
+        except Exception:
+            with self._lock:
+                self._abertas -= 1
+            raise
+        cursor.close()
+        return conn
+
+    def _descartar(self, conn):
+        with self._lock:
+            self._abertas -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def obter(self):
+        """
+        Retira uma conexão saudável do pool, abrindo uma nova se houver vaga.
+        Checks out a healthy connection from the pool, opening a new one if there is room.
+
+        Returns:
+            Connection: Conexão pymysql.
+                        pymysql connection.
+
+        Raises:
+            TimeoutError: Se nenhuma conexão ficar livre dentro do timeout.
+                          If no connection becomes free within the timeout.
+        """
+        inicio = time.perf_counter()
+        try:
+            conn = self._livres.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                pode_abrir = self._abertas < self.tamanho
+                if pode_abrir:
+                    self._abertas += 1
+            if pode_abrir:
+                conn = self._conectar()
+            else:
+                try:
+                    conn = self._livres.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"nenhuma conexão livre em {self.timeout}s | no free connection within {self.timeout}s")
+        espera = time.perf_counter() - inicio
+
+        if self.pre_ping:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                # O MySQL pode ter fechado a conexão ociosa (wait_timeout) durante o intervalo
+                # MySQL may have closed the idle connection (wait_timeout) during the interval
+                logger.warning("Conexão inativa descartada; reconectando. | Stale connection dropped; reconnecting.")
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = self._conectar()
+                with self._lock:
+                    self._metricas["reconexoes"] += 1
+
+        checkout = time.perf_counter() - inicio
+        with self._lock:
+            self._metricas["checkouts"] += 1
+            self._metricas["espera_total"] += espera
+            self._metricas["espera_max"] = max(self._metricas["espera_max"], espera)
+            self._metricas["checkout_total"] += checkout
+            self._metricas["checkout_max"] = max(self._metricas["checkout_max"], checkout)
+        return conn
+
+    def devolver(self, conn, descartar=False):
+        """
+        Devolve uma conexão ao pool, ou a fecha se estiver com problema.
+        Returns a connection to the pool, or closes it if it is broken.
+
+        Args:
+            conn: Conexão obtida com obter().
+                  Connection obtained from obter().
+            descartar (bool): Fecha a conexão em vez de reaproveitá-la.
+                              Closes the connection instead of reusing it.
+        """
+        if descartar:
+            self._descartar(conn)
+        else:
+            self._livres.put_nowait(conn)
+
+    @contextmanager
+    def conexao(self):
+        """
+        Context manager que obtém e devolve uma conexão, com rollback em caso de erro.
+        Context manager that checks out and returns a connection, rolling back on error.
+        """
+        conn = self.obter()
+        try:
+            yield conn
+        except ERROS_CONEXAO:
+            self.devolver(conn, descartar=True)
+            raise
+        except Exception:
+            try:
+                conn.rollback()
+            finally:
+                self.devolver(conn)
+            raise
+        except BaseException:
+            # KeyboardInterrupt/SystemExit podem chegar no meio de um comando: o estado da conexão é
+            # incerto, então ela é fechada, mas a vaga volta ao pool
+            # KeyboardInterrupt/SystemExit may arrive mid-statement: the connection state is
+            # uncertain, so it is closed, but its slot goes back to the pool
+            self.devolver(conn, descartar=True)
+            raise
+        else:
+            self.devolver(conn)
+
+    def executar(self, funcao, tentativas=TENTATIVAS_BANCO):
+        """
+        Executa funcao(cursor) em uma transação, repetindo o lote inteiro se a conexão cair.
+        Runs funcao(cursor) in a transaction, retrying the whole batch if the connection drops.
+
+        Args:
+            funcao (function): Recebe um cursor e executa os comandos do lote.
+                               Takes a cursor and runs the batch statements.
+            tentativas (int): Quantidade máxima de tentativas.
+                              Maximum number of attempts.
+
+        Returns:
+            O retorno de funcao.
+            The return value of funcao.
+        """
+        for tentativa in range(1, tentativas + 1):
+            try:
+                with self.conexao() as conn:
+                    with conn.cursor() as cursor:
+                        resultado = funcao(cursor)
+                    conn.commit()
+                    return resultado
+            except ERROS_CONEXAO as e:
+                if tentativa == tentativas:
+                    raise
+                with self._lock:
+                    self._metricas["retentativas"] += 1
+                logger.warning(f"Conexão perdida ({e}); repetindo o lote ({tentativa}/{tentativas}). | Connection lost ({e}); retrying the batch ({tentativa}/{tentativas}).")
+                time.sleep(min(2 ** (tentativa - 1), 10))
+
+    def metricas(self):
+        """
+        Retorna as métricas de uso do pool.
+        Returns the pool usage metrics.
+
+        Returns:
+            dict: Checkouts, espera e latência de checkout (média e máxima, em segundos),
+                  reconexões, retentativas e conexões abertas/livres.
+                  Checkouts, wait and checkout latency (mean and max, in seconds),
+                  reconnections, retries and open/free connections.
+        """
+        with self._lock:
+            m = dict(self._metricas)
+            abertas = self._abertas
+        checkouts = m["checkouts"] or 1
+        return {
+            "checkouts": m["checkouts"],
+            "espera_media": m["espera_total"] / checkouts,
+            "espera_max": m["espera_max"],
+            "checkout_medio": m["checkout_total"] / checkouts,
+            "checkout_max": m["checkout_max"],
+            "reconexoes": m["reconexoes"],
+            "retentativas": m["retentativas"],
+            "abertas": abertas,
+            "livres": self._livres.qsize(),
+        }
+
+    def fechar(self):
+        """
+        Fecha todas as conexões livres do pool.
+        Closes all free connections in the pool.
+        """
+        while True:
+            try:
+                self._descartar(self._livres.get_nowait())
+            except queue.Empty:
+                break
+        logger.info("Pool de conexões fechado. | Connection pool closed.")
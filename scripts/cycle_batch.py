@@ -0,0 +1,293 @@
+from array import array
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Colunas de cada classe, na ordem dos dicionários coletados | Columns of each class, in the collected dictionaries' order
+COLUNAS_LOTE = {
+    "acoes": {
+        "nome": "EMPRESA",
+        "simbolo": "AÇÃO",
+        "cotacao": "COTAÇÃO",
+        "variacao": "VARIAÇÃO PERCENTUAL",
+        "horario": "HORÁRIO",
+        "tendencia": "TENDÊNCIA",
+        "link": "LINK"
+    },
+    "moedas": {
+        "nome": "NOME",
+        "simbolo": "MOEDA",
+        "cotacao": "COTAÇÃO",
+        "variacao": "VARIAÇÃO PERCENTUAL",
+        "tendencia": "TENDÊNCIA",
+        "horario": "DATA E HORÁRIO"
+    }
+}
+
+# Código 0 = queda, 1 = alta | Code 0 = down, 1 = up
+TENDENCIAS = ("Caindo | Down", "Subindo | Up")
+
+_EPOCA = datetime(1970, 1, 1)
+
+
+def _segundos(horario):
+    """
+    Converte "AAAA-MM-DD HH:MM:SS" (horário local, sem fuso) em segundos desde a época.
+    Converts "YYYY-MM-DD HH:MM:SS" (local time, no time zone) into seconds since the epoch.
+    """
+    return int((datetime.strptime(str(horario), "%Y-%m-%d %H:%M:%S") - _EPOCA).total_seconds())
+
+def _texto_horario(segundos):
+    return (_EPOCA + timedelta(seconds=segundos)).strftime("%Y-%m-%d %H:%M:%S")
+
+def segundos_locais(instante=None):
+    """
+    Retorna o horário local atual (ou de um datetime sem fuso) em segundos desde a época, como em LoteCotacoes.
+    Returns the current local time (or a naive datetime's) in seconds since the epoch, as in LoteCotacoes.
+    """
+    return int(((instante or datetime.now()).replace(microsecond=0) - _EPOCA).total_seconds())
+
+def ler_ipc(buffer):
+    """
+    Lê uma tabela gravada com LoteCotacoes.para_ipc.
+    Reads a table written with LoteCotacoes.para_ipc.
+    """
+    return pa.ipc.open_stream(buffer).read_all()
+
+class LoteCotacoes:
+    """
+    Lote colunar de um ciclo de coleta (ações ou moedas), compartilhado pelos formatos de saída.
+    Columnar batch of one collection cycle (stocks or currencies), shared by the output formats.
+
+    Os símbolos são codificados em dicionário (código int32 por linha), o horário é int64 em
+    segundos (horário local sem fuso, como pa.timestamp("s")), a tendência é int8 e o link é
+    derivado do símbolo só quando pedido. As colunas numéricas são arrays que o Arrow e o
+    numpy leem sem cópia; depois de uma conversão o lote não aceita mais linhas.
+    Symbols are dictionary-encoded (one int32 code per row), the timestamp is int64 seconds
+    (local time without time zone, like pa.timestamp("s")), the trend is int8 and the link is
+    derived from the symbol only when requested. Numeric columns are arrays that Arrow and
+    numpy read without copying; after a conversion the batch accepts no more rows.
+
+    Iterar o lote produz os dicionários no formato original dos coletores.
+    Iterating the batch yields dictionaries in the collectors' original format.
+
+    Args:
+        classe (str): "acoes" ou "moedas".
+                      "acoes" or "moedas".
+    """
+
+    __slots__ = ("classe", "simbolos", "nomes", "_indice", "codigos", "cotacoes", "variacoes", "horarios", "tendencias")
+
+    def __init__(self, classe):
+        self.classe = classe
+        self.simbolos = []
+        self.nomes = []
+        self._indice = {}
+        self.codigos = array("i")
+        self.cotacoes = array("d")
+        self.variacoes = array("d")
+        self.horarios = array("q")
+        self.tendencias = array("b")
+
+    @classmethod
+    def de_registros(cls, classe, dados):
+        """
+        Monta um lote a partir da lista de dicionários de um coletor.
+        Builds a batch from a collector's list of dictionaries.
+        """
+        lote = cls(classe)
+        colunas = COLUNAS_LOTE[classe]
+        horarios = {}
+        for item in dados:
+            texto = item[colunas["horario"]]
+            if texto not in horarios:
+                horarios[texto] = _segundos(texto)
+            lote.adicionar(
+                item[colunas["simbolo"]], item[colunas["nome"]], item[colunas["cotacao"]],
+                item[colunas["variacao"]], horarios[texto], item[colunas["tendencia"]] == TENDENCIAS[1]
+            )
+        return lote
+
+    @classmethod
+    def de_colunas(cls, classe, simbolos, cotacoes, variacoes, horarios, nomes):
+        """
+        Monta um lote a partir de colunas já vetorizadas (ex.: um histórico baixado), sem laço por linha.
+        Builds a batch from already vectorized columns (e.g. a downloaded history), without a per-row loop.
+
+        Args:
+            classe (str): "acoes" ou "moedas".
+                          "acoes" or "moedas".
+            simbolos (sequence): Símbolo de cada linha.
+                                 Symbol of each row.
+            cotacoes (sequence): Cotação de cada linha.
+                                 Quote of each row.
+            variacoes (sequence): Variação percentual de cada linha.
+                                  Percent change of each row.
+            horarios (sequence): Segundos desde a época (horário local) de cada linha.
+                                 Seconds since the epoch (local time) of each row.
+            nomes (dict): Símbolo -> empresa ou nome da moeda.
+                          Symbol -> company or currency name.
+        """
+        lote = cls(classe)
+        codigos, unicos = pd.factorize(np.asarray(simbolos, dtype=object))
+        lote.simbolos = list(unicos)
+        lote.nomes = [nomes[simbolo] for simbolo in lote.simbolos]
+        lote._indice = {simbolo: codigo for codigo, simbolo in enumerate(lote.simbolos)}
+        variacoes = np.asarray(variacoes, dtype=np.float64)
+        lote.codigos.frombytes(codigos.astype(np.int32).tobytes())
+        lote.cotacoes.frombytes(np.asarray(cotacoes, dtype=np.float64).tobytes())
+        lote.variacoes.frombytes(variacoes.tobytes())
+        lote.horarios.frombytes(np.asarray(horarios, dtype=np.int64).tobytes())
+        lote.tendencias.frombytes((variacoes > 0).astype(np.int8).tobytes())
+        return lote
+
+    def adicionar(self, simbolo, nome, cotacao, variacao, horario, alta):
+        """
+        Adiciona uma linha.
+        Adds one row.
+
+        Args:
+            simbolo (str): Ação ou moeda.
+                           Stock or currency.
+            nome (str): Empresa ou nome da moeda.
+                        Company or currency name.
+            cotacao (float): Cotação.
+                             Quote.
+            variacao (float): Variação percentual.
+                              Percent change.
+            horario (int): Segundos desde a época (horário local).
+                           Seconds since the epoch (local time).
+            alta (bool): Tendência de alta.
+                         Upward trend.
+        """
+        codigo = self._indice.get(simbolo)
+        if codigo is None:
+            codigo = self._indice[simbolo] = len(self.simbolos)
+            self.simbolos.append(simbolo)
+            self.nomes.append(nome)
+        self.codigos.append(codigo)
+        self.cotacoes.append(cotacao)
+        self.variacoes.append(variacao)
+        self.horarios.append(horario)
+        self.tendencias.append(1 if alta else 0)
+
+    def __len__(self):
+        return len(self.codigos)
+
+    @property
+    def links(self):
+        """
+        Links do Yahoo por símbolo do dicionário (não por linha), gerados sob demanda.
+        Yahoo links per dictionary symbol (not per row), generated on demand.
+        """
+        return [f"https://finance.yahoo.com/quote/{simbolo}" for simbolo in self.simbolos]
+
+    def coluna(self, nome):
+        """
+        Retorna uma coluna como lista de valores Python, no formato dos dicionários coletados.
+        Returns a column as a list of Python values, in the collected dictionaries' format.
+
+        Args:
+            nome (str): Nome da coluna (ex.: "AÇÃO", "HORÁRIO").
+                        Column name (e.g. "AÇÃO", "HORÁRIO").
+        """
+        campo = {coluna: campo for campo, coluna in COLUNAS_LOTE[self.classe].items()}[nome]
+        if campo in ("simbolo", "nome", "link"):
+            valores = self.links if campo == "link" else self.simbolos if campo == "simbolo" else self.nomes
+            return [valores[codigo] for codigo in self.codigos]
+        if campo == "horario":
+            textos = {segundos: _texto_horario(segundos) for segundos in set(self.horarios)}
+            return [textos[segundos] for segundos in self.horarios]
+        if campo == "tendencia":
+            return [TENDENCIAS[codigo] for codigo in self.tendencias]
+        return list(self.cotacoes if campo == "cotacao" else self.variacoes)
+
+    def __iter__(self):
+        nomes = list(COLUNAS_LOTE[self.classe].values())
+        return (dict(zip(nomes, linha)) for linha in zip(*(self.coluna(nome) for nome in nomes)))
+
+    def para_arrow(self):
+        """
+        Converte o lote em uma tabela Arrow sem copiar as colunas numéricas.
+        Converts the batch into an Arrow table without copying the numeric columns.
+
+        Textos repetidos (símbolo, nome, tendência, link) viram colunas dictionary.
+        Repeated texts (symbol, name, trend, link) become dictionary columns.
+
+        Returns:
+            Table: Tabela com as colunas do dataset da classe.
+                   Table with the class dataset columns.
+        """
+        n = len(self)
+        codigos = pa.Array.from_buffers(pa.int32(), n, [None, pa.py_buffer(self.codigos)])
+        colunas = {
+            "nome": pa.DictionaryArray.from_arrays(codigos, pa.array(self.nomes, pa.string())),
+            "simbolo": pa.DictionaryArray.from_arrays(codigos, pa.array(self.simbolos, pa.string())),
+            "cotacao": pa.Array.from_buffers(pa.float64(), n, [None, pa.py_buffer(self.cotacoes)]),
+            "variacao": pa.Array.from_buffers(pa.float64(), n, [None, pa.py_buffer(self.variacoes)]),
+            "horario": pa.Array.from_buffers(pa.timestamp("s"), n, [None, pa.py_buffer(self.horarios)]),
+            "tendencia": pa.DictionaryArray.from_arrays(
+                pa.Array.from_buffers(pa.int8(), n, [None, pa.py_buffer(self.tendencias)]), pa.array(TENDENCIAS)
+            ),
+        }
+        if self.classe == "acoes":
+            colunas["link"] = pa.DictionaryArray.from_arrays(codigos, pa.array(self.links, pa.string()))
+        return pa.table({coluna: colunas[campo] for campo, coluna in COLUNAS_LOTE[self.classe].items()})
+
+    def para_ipc(self):
+        """
+        Serializa o lote no formato de stream IPC do Arrow, para enviar entre processos sem pickle de dicionários.
+        Serializes the batch in Arrow's IPC stream format, to send between processes without pickling dictionaries.
+
+        Returns:
+            bytes: Stream IPC com a tabela de para_arrow().
+                   IPC stream with the para_arrow() table.
+        """
+        tabela = self.para_arrow()
+        saida = pa.BufferOutputStream()
+        with pa.ipc.new_stream(saida, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        return saida.getvalue().to_pybytes()
+
+    def para_pandas(self, legado=False):
+        """
+        Converte o lote em DataFrame; colunas numéricas são views dos arrays, textos são categóricos.
+        Converts the batch into a DataFrame; numeric columns are views of the arrays, texts are categoricals.
+
+        Args:
+            legado (bool): Horário como texto, como nos dicionários coletados (para o Excel).
+                           Timestamp as text, as in the collected dictionaries (for Excel).
+
+        Returns:
+            DataFrame: Uma linha por cotação.
+                       One row per quote.
+        """
+        codigos = np.frombuffer(self.codigos, dtype=np.int32)
+        # Nomes podem se repetir entre símbolos; as categorias precisam ser únicas
+        # Names may repeat across symbols; categories must be unique
+        if len(set(self.nomes)) == len(self.nomes):
+            nomes = pd.Categorical.from_codes(codigos, categories=self.nomes, validate=False)
+        else:
+            unicos, reindexacao = np.unique(np.array(self.nomes, dtype=object), return_inverse=True)
+            nomes = pd.Categorical.from_codes(reindexacao[codigos], categories=unicos)
+        horarios = np.frombuffer(self.horarios, dtype=np.int64)
+        if legado:
+            # Poucos horários distintos por lote: formata cada um uma vez | Few distinct timestamps per batch: format each once
+            unicos, inverso = np.unique(horarios, return_inverse=True)
+            horarios = np.array([_texto_horario(int(segundos)) for segundos in unicos], dtype=object)[inverso]
+        else:
+            horarios = horarios.view("datetime64[s]")
+        colunas = {
+            "nome": nomes,
+            "simbolo": pd.Categorical.from_codes(codigos, categories=self.simbolos, validate=False),
+            "cotacao": np.frombuffer(self.cotacoes, dtype=np.float64),
+            "variacao": np.frombuffer(self.variacoes, dtype=np.float64),
+            "horario": horarios,
+            "tendencia": pd.Categorical.from_codes(
+                np.frombuffer(self.tendencias, dtype=np.int8), categories=TENDENCIAS, validate=False
+            ),
+        }
+        if self.classe == "acoes":
+            colunas["link"] = pd.Categorical.from_codes(codigos, categories=self.links, validate=False)
+        return pd.DataFrame({coluna: colunas[campo] for campo, coluna in COLUNAS_LOTE[self.classe].items()}, copy=False)
@@ -1,9 +1,57 @@
+import logging
 import yfinance as yf
-import requests
+import pandas as pd
 from datetime import datetime
+from functools import partial
+from urllib.parse import urlparse
+from concurrency import calcular_limite, executar_em_paralelo
+from config import HOST_YAHOO, TAMANHO_LOTE_ACOES, TAMANHO_LOTE_MOEDAS, URL_AWESOMEAPI, TIMEOUT_HTTP
+from resilience import CircuitoAberto, erro_transitorio, executar_resiliente, obter_json, tempo_limite
+from metrics import contar, medir_etapa
 from logger_config import logger
 
-def coletar_dados_acoes(assets):
+def _coletar_acao(symbol, empresa, limite=None):
+    """
+    Coleta os dados de uma única ação.
+    Collects data for a single stock.
+
+    Returns:
+        dict: Dados da ação, ou None se não houver dados ou ocorrer erro.
+              Stock data, or None if there is no data or an error occurs.
+    """
+    try:
+        stock = yf.Ticker(symbol)
+        historico = executar_resiliente(
+            HOST_YAHOO, lambda: stock.history(period="2d", timeout=tempo_limite(limite)[1]), limite
+        )
+        
+        # Verificar se há dados disponíveis | Check if data is available
+        if historico.empty or len(historico) < 2:
+            logger.warning(f"Nenhum dado disponível para a ação {symbol} | No data available for stock {symbol}")
+            return None
+
+        preco_atual = historico["Close"].iloc[-1]
+        preco_anterior = historico["Close"].iloc[-2]
+        variacao_percentual = ((preco_atual - preco_anterior) / preco_anterior) * 100
+        tendencia = "Subindo | Up" if variacao_percentual > 0 else "Caindo | Down"
+        horario = horarios_mercado(historico.index[-1:])[0]
+        link = f"https://finance.yahoo.com/quote/{symbol}"
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"EMPRESA: {empresa} | AÇÃO: {symbol} | COTAÇÃO: {preco_atual} | VARIAÇÃO: {variacao_percentual:.2f}% | HORÁRIO: {horario} | TENDÊNCIA: {tendencia} | LINK: {link}")
+        return {
+            "EMPRESA": empresa,
+            "AÇÃO": symbol,
+            "COTAÇÃO": preco_atual,
+            "VARIAÇÃO PERCENTUAL": variacao_percentual,
+            "HORÁRIO": horario,
+            "TENDÊNCIA": tendencia,
+            "LINK": link
+        }
+    except Exception as e:
+        logger.error(f"Erro ao obter dados da ação {symbol}: {e} | Error getting data for stock {symbol}: {e}")
+        return None
+
+def coletar_dados_acoes(assets, max_workers=1, limite=None):
     """
     Coleta dados das ações.
     Collects stock data.
@@ -11,43 +59,63 @@ def coletar_dados_acoes(assets):
     Args:
         assets (dict): Dicionário de ativos.
                        Dictionary of assets.
+        max_workers (int): Quantidade de requisições simultâneas (padrão: 1, serial).
+                           Number of concurrent requests (default: 1, serial).
+        limite (float, optional): Prazo absoluto do ciclo em time.monotonic().
+                                  Absolute cycle deadline in time.monotonic().
 
     Returns:
         list: Lista de dicionários com os dados das ações.
               List of dictionaries with stock data.
     """
-    dados_acoes = []
-    for symbol, empresa in assets.items():
-        try:
-            stock = yf.Ticker(symbol)
-            historico = stock.history(period="2d")
-            
-            # Verificar se há dados disponíveis | Check if data is available
-            if historico.empty or len(historico) < 2:
-                logger.warning(f"Nenhum dado disponível para a ação {symbol} | No data available for stock {symbol}")
-                continue
-
-            preco_atual = historico["Close"].iloc[-1]
-            preco_anterior = historico["Close"].iloc[-2]
-            variacao_percentual = ((preco_atual - preco_anterior) / preco_anterior) * 100
-            tendencia = "Subindo | Up" if variacao_percentual > 0 else "Caindo | Down"
-            horario = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            link = f"https://finance.yahoo.com/quote/{symbol}"
-            dados_acoes.append({
-                "EMPRESA": empresa,
-                "AÇÃO": symbol,
-                "COTAÇÃO": preco_atual,
-                "VARIAÇÃO PERCENTUAL": variacao_percentual,
-                "HORÁRIO": horario,
-                "TENDÊNCIA": tendencia,
-                "LINK": link
-            })
-            logger.info(f"EMPRESA: {empresa} | AÇÃO: {symbol} | COTAÇÃO: {preco_atual} | VARIAÇÃO: {variacao_percentual:.2f}% | HORÁRIO: {horario} | TENDÊNCIA: {tendencia} | LINK: {link}")
-        except Exception as e:
-            logger.error(f"Erro ao obter dados da ação {symbol}: {e} | Error getting data for stock {symbol}: {e}")
-    return dados_acoes
+    tarefas = [partial(_coletar_acao, symbol, empresa, limite) for symbol, empresa in assets.items()]
+    return [item for item in executar_em_paralelo(tarefas, max_workers, limite) if item is not None]
 
-def obter_cotacoes_moedas(moedas):
+def _obter_cotacao_moeda(moeda, nome, url_base=URL_AWESOMEAPI, limite=None):
+    """
+    Obtém a cotação de uma única moeda em relação ao Real (BRL).
+    Gets the exchange rate of a single currency against BRL.
+
+    Returns:
+        dict: Cotação da moeda, ou None se ocorrer erro.
+              Currency rate, or None if an error occurs.
+    """
+    try:
+        dados = obter_json(f"{url_base}/json/last/{moeda}-BRL", limite)
+        with medir_etapa("parse", classe="moedas"):
+            cotacao = _interpretar_cotacao(moeda, nome, dados[f"{moeda}BRL"])
+        contar("cotacoes_total", classe="moedas")
+        return cotacao
+    except CircuitoAberto as e:
+        logger.warning(f"Moeda {moeda} adiada: {e} | Currency {moeda} deferred: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Erro ao obter dados da moeda {moeda}: {e} | Error getting data for currency {moeda}: {e}")
+        return None
+
+def _interpretar_cotacao(moeda, nome, dados):
+    """
+    Converte a resposta da AwesomeAPI de um par em um dicionário de cotação.
+    Converts the AwesomeAPI response for one pair into a quote dictionary.
+    """
+    cotacao_atual = float(dados["bid"])
+    cotacao_anterior = float(dados["ask"])
+    variacao = ((cotacao_atual - cotacao_anterior) / cotacao_anterior) * 100
+    tendencia = "Subindo | Up" if variacao > 0 else "Caindo | Down"
+    # Horário da cotação na AwesomeAPI (Brasília); sem ele, o da coleta | Quote time from AwesomeAPI (Brasília); without it, the collection time
+    horario = dados.get("create_date") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"MOEDA: {nome} | COTAÇÃO: {cotacao_atual} | VARIAÇÃO: {variacao:.2f}% | TENDÊNCIA: {tendencia} | HORÁRIO: {horario}")
+    return {
+        "NOME": nome,
+        "MOEDA": moeda,
+        "COTAÇÃO": cotacao_atual,
+        "VARIAÇÃO PERCENTUAL": variacao,
+        "TENDÊNCIA": tendencia,
+        "DATA E HORÁRIO": horario
+    }
+
+def obter_cotacoes_moedas(moedas, max_workers=1, limite=None, url_base=URL_AWESOMEAPI):
     """
     Obtém as cotações do Real (BRL) em relação a outras moedas.
     Gets the exchange rates of BRL against other currencies.
@@ -55,31 +123,381 @@ def obter_cotacoes_moedas(moedas):
     Args:
         moedas (dict): Dicionário de moedas.
                        Dictionary of currencies.
+        max_workers (int): Quantidade de requisições simultâneas (padrão: 1, serial).
+                           Number of concurrent requests (default: 1, serial).
+        limite (float, optional): Prazo absoluto do ciclo em time.monotonic().
+                                  Absolute cycle deadline in time.monotonic().
+        url_base (str): URL base da AwesomeAPI (permite apontar para um servidor local).
+                        AwesomeAPI base URL (allows pointing to a local server).
 
     Returns:
         list: Lista de dicionários com as cotações das moedas.
               List of dictionaries with currency exchange rates.
     """
+    tarefas = [partial(_obter_cotacao_moeda, moeda, nome, url_base, limite) for moeda, nome in moedas.items()]
+    return [item for item in executar_em_paralelo(tarefas, max_workers, limite) if item is not None]
+
+def _obter_lote_moedas(moedas, lote, url_base=URL_AWESOMEAPI, limite=None):
+    """
+    Obtém várias moedas em uma única requisição, dividindo o lote ao meio se a API recusar um par.
+    Gets several currencies in a single request, splitting the batch in half if the API rejects a pair.
+
+    Returns:
+        list: Lista de dicionários com as cotações do lote.
+              List of dictionaries with the batch's rates.
+    """
+    try:
+        dados = obter_json(f"{url_base}/json/last/{','.join(f'{moeda}-BRL' for moeda in lote)}", limite)
+    except CircuitoAberto as e:
+        logger.warning(f"Lote {lote[0]}..{lote[-1]} adiado: {e} | Batch {lote[0]}..{lote[-1]} deferred: {e}")
+        return []
+    except Exception as e:
+        if len(lote) == 1 or erro_transitorio(e):
+            # Par único ou falha da fonte já repetida: dividir só multiplicaria as requisições
+            # Single pair or an already retried source failure: splitting would only multiply the requests
+            logger.error(f"Erro ao obter dados das moedas {','.join(lote)}: {e} | Error getting data for currencies {','.join(lote)}: {e}")
+            return []
+        # Um par inválido derruba a requisição inteira; dividir para isolá-lo
+        # One invalid pair fails the whole request; split to isolate it
+        logger.warning(f"Falha no lote {','.join(lote)}; dividindo. | Batch {','.join(lote)} failed; splitting.")
+        meio = len(lote) // 2
+        return (_obter_lote_moedas(moedas, lote[:meio], url_base, limite)
+                + _obter_lote_moedas(moedas, lote[meio:], url_base, limite))
+
     cotacoes = []
-    for moeda, nome in moedas.items():
-        try:
-            response = requests.get(f"https://economia.awesomeapi.com.br/json/last/{moeda}-BRL")
-            response.raise_for_status()
-            dados = response.json()[f"{moeda}BRL"]
-            cotacao_atual = float(dados["bid"])
-            cotacao_anterior = float(dados["ask"])
-            variacao = ((cotacao_atual - cotacao_anterior) / cotacao_anterior) * 100
-            tendencia = "Subindo | Up" if variacao > 0 else "Caindo | Down"
-            horario = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cotacoes.append({
-                "NOME": nome,
-                "MOEDA": moeda,
-                "COTAÇÃO": cotacao_atual,
-                "VARIAÇÃO PERCENTUAL": variacao,
-                "TENDÊNCIA": tendencia,
-                "DATA E HORÁRIO": horario
-            })
-            logger.info(f"MOEDA: {nome} | COTAÇÃO: {cotacao_atual} | VARIAÇÃO: {variacao:.2f}% | TENDÊNCIA: {tendencia} | HORÁRIO: {horario}")
-        except Exception as e:
-            logger.error(f"Erro ao obter dados da moeda {moeda}: {e} | Error getting data for currency {moeda}: {e}")
-    return cotacoes
\ No newline at end of file
+    with medir_etapa("parse", classe="moedas"):
+        for moeda in lote:
+            try:
+                cotacoes.append(_interpretar_cotacao(moeda, moedas[moeda], dados[f"{moeda}BRL"]))
+            except Exception as e:
+                contar("erros_total", fonte=urlparse(url_base).hostname, tipo="resposta")
+                logger.error(f"Erro ao obter dados da moeda {moeda}: {e} | Error getting data for currency {moeda}: {e}")
+    contar("cotacoes_total", len(cotacoes), classe="moedas")
+    return cotacoes
+
+def obter_cotacoes_moedas_lote(moedas, tamanho_lote=TAMANHO_LOTE_MOEDAS, url_base=URL_AWESOMEAPI, max_workers=1, limite=None):
+    """
+    Obtém as cotações das moedas com requisições de vários pares, sobre conexões reaproveitadas.
+    Gets currency rates with multi-pair requests over reused connections.
+
+    Args:
+        moedas (dict): Dicionário de moedas.
+                       Dictionary of currencies.
+        tamanho_lote (int): Quantidade de pares por requisição.
+                            Number of pairs per request.
+        url_base (str): URL base da AwesomeAPI.
+                        AwesomeAPI base URL.
+        max_workers (int): Quantidade de lotes buscados simultaneamente (padrão: 1, serial).
+                           Number of batches fetched concurrently (default: 1, serial).
+        limite (float, optional): Prazo absoluto do ciclo em time.monotonic().
+                                  Absolute cycle deadline in time.monotonic().
+
+    Returns:
+        list: Lista de dicionários com as cotações, no mesmo formato de obter_cotacoes_moedas.
+              List of dictionaries with rates, in the same format as obter_cotacoes_moedas.
+    """
+    codigos = list(moedas)
+    tarefas = [
+        partial(_obter_lote_moedas, moedas, codigos[inicio:inicio + tamanho_lote], url_base, limite)
+        for inicio in range(0, len(codigos), tamanho_lote)
+    ]
+    return [item for lote in executar_em_paralelo(tarefas, max_workers, limite) if lote for item in lote]
+
+def coletar_ciclo(assets, moedas, max_workers=1, prazo=None, coletar_acoes=None, coletar_moedas=None):
+    """
+    Coleta ações e moedas ao mesmo tempo, dentro de um prazo global do ciclo.
+    Collects stocks and currencies at the same time, within a global cycle deadline.
+
+    Args:
+        assets (dict): Dicionário de ativos.
+                       Dictionary of assets.
+        moedas (dict): Dicionário de moedas.
+                       Dictionary of currencies.
+        max_workers (int): Quantidade de requisições simultâneas por fonte.
+                           Number of concurrent requests per source.
+        prazo (float, optional): Prazo do ciclo em segundos.
+                                 Cycle deadline in seconds.
+        coletar_acoes (function, optional): Coletor de ações (padrão: coletar_dados_acoes_lote).
+                                            Stock collector (default: coletar_dados_acoes_lote).
+        coletar_moedas (function, optional): Coletor de moedas (padrão: obter_cotacoes_moedas_lote).
+                                             Currency collector (default: obter_cotacoes_moedas_lote).
+
+    Returns:
+        tuple: Dados das ações e dados das moedas.
+               Stock data and currency data.
+    """
+    limite = calcular_limite(prazo)
+    coletar_acoes = coletar_acoes or partial(coletar_dados_acoes_lote, tamanho_lote=TAMANHO_LOTE_ACOES)
+    coletar_moedas = coletar_moedas or obter_cotacoes_moedas_lote
+    dados_acoes, dados_moedas = executar_em_paralelo([
+        partial(coletar_acoes, assets, max_workers=max_workers, limite=limite),
+        partial(coletar_moedas, moedas, max_workers=max_workers, limite=limite),
+    ], 2, limite)
+    return dados_acoes or [], dados_moedas or []
+
+def baixar_yfinance(simbolos, periodo="2d"):
+    """
+    Baixa o histórico de vários símbolos em uma única requisição ao Yahoo.
+    Downloads the history of several symbols in a single Yahoo request.
+
+    Args:
+        simbolos (list): Lista de símbolos.
+                         List of symbols.
+        periodo (str): Período do histórico (padrão: "2d").
+                       History period (default: "2d").
+
+    Returns:
+        DataFrame: Histórico com colunas (campo, símbolo).
+                   History with (field, symbol) columns.
+    """
+    return yf.download(
+        tickers=list(simbolos),
+        period=periodo,
+        group_by="column",
+        auto_adjust=True,
+        threads=True,
+        progress=False,
+        timeout=TIMEOUT_HTTP[1],
+    )
+
+def transporte_fixture(caminho):
+    """
+    Cria um transporte que lê um download gravado em disco, para testes offline.
+    Creates a transport that reads a download recorded on disk, for offline runs.
+
+    Args:
+        caminho (str): Caminho do arquivo pickle gravado com gravar_fixture.
+                       Path to the pickle file recorded with gravar_fixture.
+
+    Returns:
+        function: Transporte compatível com baixar_yfinance.
+                  Transport compatible with baixar_yfinance.
+    """
+    historico = pd.read_pickle(caminho)
+    fechamentos = historico["Close"]
+
+    def baixar(simbolos, periodo="2d"):
+        colunas = [s for s in simbolos if s in fechamentos.columns]
+        return pd.concat({"Close": fechamentos[colunas]}, axis=1)
+
+    return baixar
+
+def gravar_fixture(simbolos, caminho, periodo="2d"):
+    """
+    Grava um download real do Yahoo em disco para uso com transporte_fixture.
+    Records a real Yahoo download to disk for use with transporte_fixture.
+
+    Args:
+        simbolos (list): Lista de símbolos.
+                         List of symbols.
+        caminho (str): Caminho do arquivo pickle de saída.
+                       Path of the output pickle file.
+        periodo (str): Período do histórico (padrão: "2d").
+                       History period (default: "2d").
+    """
+    baixar_yfinance(simbolos, periodo).to_pickle(caminho)
+    logger.info(f"Fixture gravada em {caminho} | Fixture recorded to {caminho}")
+
+def extrair_fechamentos(historico, simbolos):
+    """
+    Extrai os preços de fechamento como DataFrame (datas x símbolos).
+    Extracts closing prices as a DataFrame (dates x symbols).
+
+    Args:
+        historico (DataFrame): Download do yfinance com colunas (campo, símbolo).
+                               yfinance download with (field, symbol) columns.
+        simbolos (list): Símbolos pedidos, para nomear a coluna de um download de símbolo único.
+                         Requested symbols, to name the column of a single-symbol download.
+    """
+    if historico is None or historico.empty:
+        return pd.DataFrame()
+    if isinstance(historico.columns, pd.MultiIndex):
+        return historico["Close"]
+    # Versões antigas do yfinance retornam colunas simples para um único símbolo
+    # Older yfinance versions return flat columns for a single symbol
+    return historico[["Close"]].set_axis(list(simbolos)[:1], axis=1)
+
+def calcular_variacoes(fechamentos):
+    """
+    Calcula cotação atual, anterior e variação percentual de todos os símbolos de uma vez.
+    Computes current price, previous price and percent change for all symbols at once.
+
+    Args:
+        fechamentos (DataFrame): Preços de fechamento (datas x símbolos).
+                                 Closing prices (dates x symbols).
+
+    Returns:
+        DataFrame: Colunas "atual", "anterior", "pregao" (data do último fechamento), "variacao" e
+                   "tendencia", indexadas por símbolo.
+                   Columns "atual", "anterior", "pregao" (date of the last close), "variacao" and
+                   "tendencia", indexed by symbol.
+    """
+    # Mercados diferentes têm feriados diferentes; considerar só valores válidos por símbolo
+    # Different markets have different holidays; only consider valid values per symbol
+    validos = fechamentos.notna()
+    posicao = validos.iloc[::-1].cumsum().iloc[::-1]
+    ultimo = validos & (posicao == 1)
+    resultado = pd.DataFrame({
+        "atual": fechamentos.where(ultimo).sum(min_count=1),
+        "anterior": fechamentos.where(validos & (posicao == 2)).sum(min_count=1),
+        "pregao": ultimo.idxmax(),
+    }).dropna()
+    resultado["variacao"] = (resultado["atual"] - resultado["anterior"]) / resultado["anterior"] * 100
+    resultado["tendencia"] = resultado["variacao"].gt(0).map({True: "Subindo | Up", False: "Caindo | Down"})
+    return resultado
+
+def baixar_variacoes(lote, baixar=baixar_yfinance, periodo="2d", anteriores=None, limite=None):
+    """
+    Baixa um lote de símbolos (com disjuntor e repetições) e calcula as variações.
+    Downloads a batch of symbols (with circuit breaker and retries) and computes the changes.
+
+    Args:
+        lote (list): Símbolos do lote.
+                     Symbols of the batch.
+        baixar (function): Transporte compatível com baixar_yfinance.
+                           Transport compatible with baixar_yfinance.
+        periodo (str): Período do histórico (padrão: "2d").
+                       History period (default: "2d").
+        anteriores (dict, optional): Fechamentos anteriores já conhecidos por símbolo; com eles,
+                                     basta baixar o último pregão (periodo="1d").
+                                     Previous closes already known per symbol; with them, only
+                                     the last session needs downloading (periodo="1d").
+        limite (float, optional): Prazo absoluto do ciclo em time.monotonic().
+                                  Absolute cycle deadline in time.monotonic().
+
+    Returns:
+        DataFrame: Resultado de calcular_variacoes.
+                   Result of calcular_variacoes.
+    """
+    def requisitar():
+        historico = baixar(lote, periodo)
+        # O yfinance engole os erros HTTP e devolve um histórico vazio | yfinance swallows HTTP errors and returns an empty history
+        if historico is None or historico.empty:
+            raise RuntimeError("resposta vazia do Yahoo | empty Yahoo response")
+        return historico
+
+    historico = executar_resiliente(HOST_YAHOO, requisitar, limite)
+    with medir_etapa("parse", classe="acoes"):
+        fechamentos = extrair_fechamentos(historico, lote)
+        if anteriores and not fechamentos.empty:
+            # Linha sintética com os fechamentos anteriores antes do pregão baixado
+            # Synthetic row with the previous closes before the downloaded session
+            linha = pd.DataFrame([anteriores], index=[fechamentos.index.min() - pd.Timedelta(days=1)])
+            fechamentos = pd.concat([linha.reindex(columns=fechamentos.columns), fechamentos])
+        variacoes = calcular_variacoes(fechamentos)
+    contar("cotacoes_total", len(variacoes), classe="acoes")
+    return variacoes
+
+def horarios_mercado(pregoes, agora=None):
+    """
+    Converte a data do último fechamento de cada cotação no horário de mercado usado como chave.
+    Converts each quote's last close date into the market timestamp used as key.
+
+    Pregões já encerrados ficam com 00:00:00 da data, como as barras diárias do backfill, de modo
+    que consultar de novo a mesma cotação cai na mesma chave; a cotação do pregão do dia é ao
+    vivo e fica com o horário da coleta.
+    Past sessions get their date's 00:00:00, like the backfill's daily bars, so querying the
+    same quote again lands on the same key; a quote from today's session is live and gets the
+    collection time.
+
+    Args:
+        pregoes (sequence): Data (ou horário) do último fechamento de cada cotação.
+                            Date (or timestamp) of each quote's last close.
+        agora (datetime, optional): Horário local da coleta (padrão: datetime.now()).
+                                    Local collection time (default: datetime.now()).
+
+    Returns:
+        list: Horários "AAAA-MM-DD HH:MM:SS", na ordem de pregoes.
+              "YYYY-MM-DD HH:MM:SS" timestamps, in pregoes order.
+    """
+    agora = agora or datetime.now()
+    datas = pd.DatetimeIndex(pregoes)
+    if datas.tz is not None:
+        datas = datas.tz_localize(None)
+    datas = datas.normalize()
+    # Poucas datas distintas por lote: formata cada uma uma vez | Few distinct dates per batch: format each once
+    hoje = pd.Timestamp(agora.date())
+    textos = {data: data.strftime("%Y-%m-%d %H:%M:%S") for data in set(datas) if data < hoje}
+    ao_vivo = agora.strftime("%Y-%m-%d %H:%M:%S")
+    return [textos.get(data, ao_vivo) for data in datas]
+
+def registros_acoes(assets, lote, variacoes):
+    """
+    Monta os dicionários de ações de um lote a partir das variações calculadas.
+    Builds a batch's stock dictionaries from the computed changes.
+
+    Returns:
+        list: Lista de dicionários com os dados das ações do lote.
+              List of dictionaries with the batch's stock data.
+    """
+    disponiveis = variacoes.reindex([s for s in lote if s in variacoes.index])
+    if len(disponiveis) < len(lote):
+        # Um aviso por lote, com os símbolos só em DEBUG | One warning per batch, with the symbols only in DEBUG
+        faltantes = [s for s in lote if s not in variacoes.index]
+        logger.warning(f"{len(faltantes)} ações sem dados no lote {lote[0]}..{lote[-1]} | {len(faltantes)} stocks without data in batch {lote[0]}..{lote[-1]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Ações sem dados: {', '.join(faltantes)} | Stocks without data: {', '.join(faltantes)}")
+
+    dados_acoes = []
+    horarios = horarios_mercado(disponiveis["pregao"])
+    detalhar = logger.isEnabledFor(logging.DEBUG)
+    for symbol, preco_atual, variacao_percentual, tendencia, horario in zip(
+        disponiveis.index, disponiveis["atual"], disponiveis["variacao"], disponiveis["tendencia"], horarios
+    ):
+        link = f"https://finance.yahoo.com/quote/{symbol}"
+        dados_acoes.append({
+            "EMPRESA": assets[symbol],
+            "AÇÃO": symbol,
+            "COTAÇÃO": preco_atual,
+            "VARIAÇÃO PERCENTUAL": variacao_percentual,
+            "HORÁRIO": horario,
+            "TENDÊNCIA": tendencia,
+            "LINK": link
+        })
+        if detalhar:
+            logger.debug(f"EMPRESA: {assets[symbol]} | AÇÃO: {symbol} | COTAÇÃO: {preco_atual} | VARIAÇÃO: {variacao_percentual:.2f}% | HORÁRIO: {horario} | TENDÊNCIA: {tendencia} | LINK: {link}")
+    return dados_acoes
+
+def _coletar_lote(assets, lote, baixar, limite=None):
+    """
+    Coleta um único lote de símbolos com uma requisição em massa.
+    Collects a single batch of symbols with one bulk request.
+
+    Returns:
+        list: Lista de dicionários com os dados das ações do lote.
+              List of dictionaries with the batch's stock data.
+    """
+    try:
+        variacoes = baixar_variacoes(lote, baixar, limite=limite)
+    except Exception as e:
+        logger.error(f"Erro ao obter dados do lote {lote[0]}..{lote[-1]}: {e} | Error getting data for batch {lote[0]}..{lote[-1]}: {e}")
+        return []
+    return registros_acoes(assets, lote, variacoes)
+
+def coletar_dados_acoes_lote(assets, tamanho_lote=200, baixar=baixar_yfinance, max_workers=1, limite=None):
+    """
+    Coleta dados das ações em lotes, com poucas requisições em massa.
+    Collects stock data in batches, using a few bulk requests.
+
+    Args:
+        assets (dict): Dicionário de ativos.
+                       Dictionary of assets.
+        tamanho_lote (int): Quantidade de símbolos por requisição.
+                            Number of symbols per request.
+        baixar (function): Transporte que recebe uma lista de símbolos e retorna o histórico.
+                           Transport that takes a list of symbols and returns the history.
+        max_workers (int): Quantidade de lotes baixados simultaneamente (padrão: 1, serial).
+                           Number of batches downloaded concurrently (default: 1, serial).
+        limite (float, optional): Prazo absoluto do ciclo em time.monotonic().
+                                  Absolute cycle deadline in time.monotonic().
+
+    Returns:
+        list: Lista de dicionários com os dados das ações, no mesmo formato de coletar_dados_acoes.
+              List of dictionaries with stock data, in the same format as coletar_dados_acoes.
+    """
+    simbolos = list(assets)
+    tarefas = [
+        partial(_coletar_lote, assets, simbolos[inicio:inicio + tamanho_lote], baixar, limite)
+        for inicio in range(0, len(simbolos), tamanho_lote)
+    ]
+    return [item for lote in executar_em_paralelo(tarefas, max_workers, limite) if lote for item in lote]
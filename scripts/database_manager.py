@@ -1,7 +1,60 @@
+import os
+import tempfile
+import time
+from datetime import date
 import pymysql
+import pyarrow as pa
+from config import TAMANHO_CHUNK_INSERCAO, MODO_ESQUEMA, MESES_PARTICAO_A_FRENTE
+from cycle_batch import LoteCotacoes
+from metrics import contar, observar
 from logger_config import logger
 
-def conectar_banco_dados(host, user, password, database=None):
+# Colunas do banco e as chaves correspondentes dos dicionários coletados
+# Database columns and the matching keys of the collected dictionaries
+COLUNAS_TABELAS = {
+    "acoes": {
+        "empresa": "EMPRESA",
+        "acao": "AÇÃO",
+        "cotacao": "COTAÇÃO",
+        "variacao_percentual": "VARIAÇÃO PERCENTUAL",
+        "horario": "HORÁRIO",
+        "tendencia": "TENDÊNCIA",
+        "link": "LINK"
+    },
+    "moedas": {
+        "nome": "NOME",
+        "moeda": "MOEDA",
+        "cotacao": "COTAÇÃO",
+        "variacao_percentual": "VARIAÇÃO PERCENTUAL",
+        "tendencia": "TENDÊNCIA",
+        "data_horario": "DATA E HORÁRIO"
+    }
+}
+
+# Chave (símbolo, horário) de cada tabela no esquema de série temporal; o horário é o da cotação
+# no mercado (ver data_collector.horarios_mercado), não o da coleta
+# (symbol, timestamp) key of each table in the time-series schema; the timestamp is the quote's
+# market time (see data_collector.horarios_mercado), not the collection time
+CHAVES_TABELAS = {
+    "acoes": ("acao", "horario"),
+    "moedas": ("moeda", "data_horario")
+}
+
+# Tipos das colunas, compartilhados pelos dois esquemas | Column types, shared by both schemas
+TIPOS_COLUNAS = {
+    "empresa": "VARCHAR(255) NOT NULL",
+    "nome": "VARCHAR(255) NOT NULL",
+    "acao": "VARCHAR(50) NOT NULL",
+    "moeda": "VARCHAR(50) NOT NULL",
+    "cotacao": "FLOAT NOT NULL",
+    "variacao_percentual": "FLOAT NOT NULL",
+    "horario": "DATETIME NOT NULL",
+    "data_horario": "DATETIME NOT NULL",
+    "tendencia": "VARCHAR(50) NOT NULL",
+    "link": "TEXT NOT NULL"
+}
+
+def conectar_banco_dados(host, user, password, database=None, local_infile=False):
     """
     Conecta ao banco de dados MySQL.
     Connects to the MySQL database.
@@ -15,20 +68,22 @@ def conectar_banco_dados(host, user, password, database=None):
                         Database password.
         database (str, optional): Nome do banco de dados.
                                   Database name.
+        local_infile (bool): Habilita LOAD DATA LOCAL INFILE (usado por carregar_arquivo_local).
+                             Enables LOAD DATA LOCAL INFILE (used by carregar_arquivo_local).
 
     Returns:
         tuple: Conexão e cursor.
                Connection and cursor.
     """
     try:
-        conn = pymysql.connect(host=host, user=user, password=password, database=database)
+        conn = pymysql.connect(host=host, user=user, password=password, database=database, local_infile=local_infile)
         cursor = conn.cursor()
         logger.info("Conectado ao banco de dados. | Connected to the database.")
         return conn, cursor
     except pymysql.err.OperationalError as e:
         if e.args[0] == 1049:  # Erro de banco de dados desconhecido | Unknown database error
             logger.info(f"Banco de dados '{database}' não existe. Criando... | Database '{database}' does not exist. Creating...")
-            conn = pymysql.connect(host=host, user=user, password=password)
+            conn = pymysql.connect(host=host, user=user, password=password, local_infile=local_infile)
             cursor = conn.cursor()
             cursor.execute(f"CREATE DATABASE {database}")
             conn.select_db(database)
@@ -41,7 +96,143 @@ def conectar_banco_dados(host, user, password, database=None):
         logger.error(f"Erro ao conectar ao banco de dados: {e} | Error connecting to the database: {e}")
         raise
 
-def criar_tabelas(cursor):
+def _criar_tabelas_simples(cursor):
+    """
+    Cria as tabelas originais, indexadas apenas por um id AUTO_INCREMENT.
+    Creates the original tables, indexed only by an AUTO_INCREMENT id.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS acoes (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        empresa VARCHAR(255) NOT NULL,
+        acao VARCHAR(50) NOT NULL,
+        cotacao FLOAT NOT NULL,
+        variacao_percentual FLOAT NOT NULL,
+        horario DATETIME NOT NULL,
+        tendencia VARCHAR(50) NOT NULL,
+        link TEXT NOT NULL
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS moedas (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        nome VARCHAR(255) NOT NULL,
+        moeda VARCHAR(50) NOT NULL,
+        cotacao FLOAT NOT NULL,
+        variacao_percentual FLOAT NOT NULL,
+        tendencia VARCHAR(50) NOT NULL,
+        data_horario DATETIME NOT NULL
+    )
+    """)
+
+def _mes_seguinte(dia):
+    """
+    Retorna o primeiro dia do mês seguinte.
+    Returns the first day of the following month.
+    """
+    return date(dia.year + dia.month // 12, dia.month % 12 + 1, 1)
+
+def _particoes_mensais(inicio, fim):
+    """
+    Gera as cláusulas de partições mensais de inicio até fim (inclusive).
+    Generates monthly partition clauses from inicio through fim (inclusive).
+    """
+    particoes = []
+    mes = date(inicio.year, inicio.month, 1)
+    while mes <= fim:
+        proximo = _mes_seguinte(mes)
+        particoes.append(f"PARTITION p{mes:%Y%m} VALUES LESS THAN ('{proximo:%Y-%m-%d}')")
+        mes = proximo
+    return particoes
+
+def _ddl_serie_temporal(tabela, nome=None, inicio=None):
+    """
+    Monta o CREATE TABLE de série temporal: chave (símbolo, horário) e partições mensais.
+    Builds the time-series CREATE TABLE: (symbol, timestamp) key and monthly partitions.
+
+    Args:
+        tabela (str): Tabela lógica ("acoes" ou "moedas").
+                      Logical table ("acoes" or "moedas").
+        nome (str, optional): Nome físico da tabela (padrão: tabela).
+                              Physical table name (default: tabela).
+        inicio (date, optional): Primeiro mês particionado (padrão: mês atual).
+                                 First partitioned month (default: current month).
+    """
+    simbolo, horario = CHAVES_TABELAS[tabela]
+    hoje = date.today()
+    fim = hoje
+    for _ in range(MESES_PARTICAO_A_FRENTE):
+        fim = _mes_seguinte(fim)
+    colunas = [simbolo, horario] + [c for c in COLUNAS_TABELAS[tabela] if c not in (simbolo, horario)]
+    particoes = _particoes_mensais(inicio or hoje, fim) + ["PARTITION pmax VALUES LESS THAN (MAXVALUE)"]
+    separador = ",\n            "
+    definicoes = separador.join(f"{coluna} {TIPOS_COLUNAS[coluna]}" for coluna in colunas)
+    return f"""
+        CREATE TABLE IF NOT EXISTS {nome or tabela} (
+            {definicoes},
+            PRIMARY KEY ({simbolo}, {horario}),
+            KEY idx_{nome or tabela}_{horario} ({horario})
+        )
+        PARTITION BY RANGE COLUMNS({horario}) (
+            {separador.join(particoes)}
+        )
+        """
+
+def garantir_particoes(cursor, tabela, meses_a_frente=MESES_PARTICAO_A_FRENTE):
+    """
+    Divide a partição pmax para que existam partições mensais até meses_a_frente.
+    Splits the pmax partition so monthly partitions exist up to meses_a_frente.
+
+    Args:
+        cursor: Cursor do banco de dados.
+                Database cursor.
+        tabela (str): Nome da tabela.
+                      Table name.
+        meses_a_frente (int): Meses futuros que devem ter partição própria.
+                              Future months that must have their own partition.
+    """
+    cursor.execute(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME LIKE 'p2%%'",
+        (tabela,)
+    )
+    existentes = sorted(linha[0] for linha in cursor.fetchall())
+    if not existentes:
+        return
+    ultimo = existentes[-1]
+    inicio = _mes_seguinte(date(int(ultimo[1:5]), int(ultimo[5:7]), 1))
+    fim = date.today()
+    for _ in range(meses_a_frente):
+        fim = _mes_seguinte(fim)
+    novas = _particoes_mensais(inicio, fim)
+    if novas:
+        cursor.execute(
+            f"ALTER TABLE {tabela} REORGANIZE PARTITION pmax INTO "
+            f"({', '.join(novas)}, PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+        )
+        logger.info(f"{len(novas)} partições criadas em {tabela}. | {len(novas)} partitions created in {tabela}.")
+
+def tabelas_legadas(cursor):
+    """
+    Retorna as tabelas de cotações que ainda estão no esquema original (com coluna id).
+    Returns the quote tables still on the original schema (with an id column).
+
+    Args:
+        cursor: Cursor do banco de dados.
+                Database cursor.
+
+    Returns:
+        list: Nomes das tabelas a migrar com migrar_para_serie_temporal.
+              Names of the tables to migrate with migrar_para_serie_temporal.
+    """
+    cursor.execute(
+        "SELECT TABLE_NAME FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND COLUMN_NAME = 'id' AND TABLE_NAME IN (%s, %s)",
+        tuple(COLUNAS_TABELAS)
+    )
+    return sorted(linha[0] for linha in cursor.fetchall())
+
+def criar_tabelas(cursor, modo=MODO_ESQUEMA):
     """
     Cria as tabelas no banco de dados, se não existirem.
     Creates tables in the database if they don't exist.
@@ -49,37 +240,210 @@ def criar_tabelas(cursor):
     Args:
         cursor: Cursor do banco de dados.
                 Database cursor.
+        modo (str, optional): "simples" (id AUTO_INCREMENT), "serie_temporal" (chave (símbolo,
+                              horário), partições mensais e upsert) ou None (automático:
+                              "serie_temporal", ou "simples" se as tabelas ainda forem do esquema
+                              original).
+                              "simples" (AUTO_INCREMENT id), "serie_temporal" ((symbol, timestamp)
+                              key, monthly partitions and upsert) or None (automatic:
+                              "serie_temporal", or "simples" if the tables are still on the
+                              original schema).
+
+    Raises:
+        RuntimeError: Com modo="serie_temporal" explícito, se as tabelas existentes ainda forem do
+                      esquema original; migre com "python main.py migrar".
+                      With an explicit modo="serie_temporal", if the existing tables are still on
+                      the original schema; migrate with "python main.py migrar".
     """
     try:
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS acoes (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            empresa VARCHAR(255) NOT NULL,
-            acao VARCHAR(50) NOT NULL,
-            cotacao FLOAT NOT NULL,
-            variacao_percentual FLOAT NOT NULL,
-            horario DATETIME NOT NULL,
-            tendencia VARCHAR(50) NOT NULL,
-            link TEXT NOT NULL
-        )
-        """)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS moedas (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            nome VARCHAR(255) NOT NULL,
-            moeda VARCHAR(50) NOT NULL,
-            cotacao FLOAT NOT NULL,
-            variacao_percentual FLOAT NOT NULL,
-            tendencia VARCHAR(50) NOT NULL,
-            data_horario DATETIME NOT NULL
-        )
-        """)
+        legadas = tabelas_legadas(cursor) if modo != "simples" else []
+        if modo is None:
+            if legadas:
+                # Instalações antigas seguem coletando até o usuário optar pela migração
+                # Older installs keep collecting until the user opts into the migration
+                logger.warning(
+                    f"Tabelas no esquema antigo ({', '.join(legadas)}); usando o modo \"simples\". Para a chave "
+                    f"(símbolo, horário) e as partições, execute \"python main.py migrar\" | Tables on the old "
+                    f"schema ({', '.join(legadas)}); using \"simples\" mode. For the (symbol, timestamp) key and "
+                    f"partitions, run \"python main.py migrar\""
+                )
+            modo = "simples" if legadas else "serie_temporal"
+        if modo == "serie_temporal":
+            # CREATE TABLE IF NOT EXISTS manteria a tabela antiga, sem chave nem partições, e o upsert nunca deduplicaria
+            # CREATE TABLE IF NOT EXISTS would keep the old table, with no key or partitions, and upserts would never deduplicate
+            if legadas:
+                raise RuntimeError(
+                    f"tabelas no esquema antigo: {', '.join(legadas)}; execute \"python main.py migrar\" "
+                    f"ou use MODO_ESQUEMA = \"simples\" | tables on the old schema: {', '.join(legadas)}; "
+                    f"run \"python main.py migrar\" or set MODO_ESQUEMA = \"simples\""
+                )
+            for tabela in COLUNAS_TABELAS:
+                cursor.execute(_ddl_serie_temporal(tabela))
+                garantir_particoes(cursor, tabela)
+        else:
+            _criar_tabelas_simples(cursor)
         logger.info("Tabelas prontas. | Tables ready.")
     except Exception as e:
         logger.error(f"Erro ao criar tabelas: {e} | Error creating tables: {e}")
         raise
 
-def inserir_dados(cursor, tabela, dados):
+def criar_tabela_ativos(cursor):
+    """
+    Cria a tabela do registro de ativos, se não existir.
+    Creates the asset registry table if it does not exist.
+
+    Args:
+        cursor: Cursor do banco de dados.
+                Database cursor.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ativos (
+        classe VARCHAR(10) NOT NULL,
+        simbolo VARCHAR(50) NOT NULL,
+        nome VARCHAR(255) NOT NULL,
+        mercado VARCHAR(20) NULL,
+        intervalo INT NULL,
+        ativo TINYINT(1) NOT NULL DEFAULT 1,
+        PRIMARY KEY (classe, simbolo)
+    )
+    """)
+
+def listar_ativos(cursor):
+    """
+    Retorna os ativos habilitados do registro.
+    Returns the registry's enabled assets.
+
+    Args:
+        cursor: Cursor do banco de dados.
+                Database cursor.
+
+    Returns:
+        tuple: Linhas (simbolo, nome, classe, mercado, intervalo).
+               (simbolo, nome, classe, mercado, intervalo) rows.
+    """
+    cursor.execute("SELECT simbolo, nome, classe, mercado, intervalo FROM ativos WHERE ativo = 1 ORDER BY classe, simbolo")
+    return cursor.fetchall()
+
+def migrar_para_serie_temporal(cursor, tamanho_chunk=100000):
+    """
+    Migra as tabelas originais (id AUTO_INCREMENT) para o esquema de série temporal.
+    Migrates the original (AUTO_INCREMENT id) tables to the time-series schema.
+
+    Os dados são copiados em faixas de id para uma tabela nova, deduplicados por (símbolo, horário),
+    e as tabelas são trocadas atomicamente; a original fica como <tabela>_legado.
+    Data is copied in id ranges into a new table, deduplicated by (symbol, timestamp),
+    and the tables are swapped atomically; the original is kept as <tabela>_legado.
+
+    Args:
+        cursor: Cursor do banco de dados.
+                Database cursor.
+        tamanho_chunk (int): Linhas copiadas por comando.
+                             Rows copied per statement.
+    """
+    legadas = tabelas_legadas(cursor)
+    for tabela, colunas in COLUNAS_TABELAS.items():
+        try:
+            if tabela not in legadas:
+                logger.info(f"Tabela {tabela} já está no esquema de série temporal. | Table {tabela} is already on the time-series schema.")
+                continue
+
+            _, horario = CHAVES_TABELAS[tabela]
+            cursor.execute(f"SELECT MIN({horario}), COALESCE(MAX(id), 0) FROM {tabela}")
+            menor_horario, maior_id = cursor.fetchone()
+            nova = f"{tabela}_nova"
+            cursor.execute(f"DROP TABLE IF EXISTS {nova}")
+            cursor.execute(_ddl_serie_temporal(tabela, nova, menor_horario.date() if menor_horario else None))
+
+            nomes = ", ".join(colunas)
+            atualizacoes = ", ".join(f"{c} = VALUES({c})" for c in colunas if c not in CHAVES_TABELAS[tabela])
+            for inicio in range(0, maior_id, tamanho_chunk):
+                cursor.execute(
+                    f"INSERT INTO {nova} ({nomes}) SELECT {nomes} FROM {tabela} "
+                    f"WHERE id > %s AND id <= %s ORDER BY id ON DUPLICATE KEY UPDATE {atualizacoes}",
+                    (inicio, inicio + tamanho_chunk)
+                )
+            cursor.execute(f"RENAME TABLE {tabela} TO {tabela}_legado, {nova} TO {tabela}")
+            logger.info(f"Tabela {tabela} migrada; original em {tabela}_legado. | Table {tabela} migrated; original kept as {tabela}_legado.")
+        except Exception as e:
+            logger.error(f"Erro ao migrar a tabela {tabela}: {e} | Error migrating table {tabela}: {e}")
+            raise
+
+def ultima_cotacao(cursor, tabela, simbolo):
+    """
+    Retorna a linha mais recente de um símbolo.
+    Returns the most recent row for a symbol.
+
+    Args:
+        cursor: Cursor do banco de dados.
+                Database cursor.
+        tabela (str): Nome da tabela.
+                      Table name.
+        simbolo (str): Ação ou moeda.
+                       Stock or currency.
+
+    Returns:
+        tuple: Linha com as colunas de COLUNAS_TABELAS, ou None.
+               Row with the COLUNAS_TABELAS columns, or None.
+    """
+    chave, horario = CHAVES_TABELAS[tabela]
+    cursor.execute(
+        f"SELECT {', '.join(COLUNAS_TABELAS[tabela])} FROM {tabela} "
+        f"WHERE {chave} = %s ORDER BY {horario} DESC LIMIT 1",
+        (simbolo,)
+    )
+    return cursor.fetchone()
+
+def cotacoes_no_intervalo(cursor, tabela, simbolo, inicio, fim):
+    """
+    Retorna as linhas de um símbolo com horário em [inicio, fim).
+    Returns a symbol's rows with timestamp in [inicio, fim).
+
+    Args:
+        cursor: Cursor do banco de dados.
+                Database cursor.
+        tabela (str): Nome da tabela.
+                      Table name.
+        simbolo (str): Ação ou moeda.
+                       Stock or currency.
+        inicio (datetime): Início do intervalo (inclusive).
+                           Range start (inclusive).
+        fim (datetime): Fim do intervalo (exclusive).
+                        Range end (exclusive).
+
+    Returns:
+        tuple: Linhas ordenadas por horário.
+               Rows ordered by timestamp.
+    """
+    chave, horario = CHAVES_TABELAS[tabela]
+    cursor.execute(
+        f"SELECT {', '.join(COLUNAS_TABELAS[tabela])} FROM {tabela} "
+        f"WHERE {chave} = %s AND {horario} >= %s AND {horario} < %s ORDER BY {horario}",
+        (simbolo, inicio, fim)
+    )
+    return cursor.fetchall()
+
+def registros_para_colunas(tabela, dados):
+    """
+    Converte uma lista de dicionários coletados (ou um LoteCotacoes ou tabela Arrow) em colunas do banco.
+    Converts a list of collected dictionaries (or a LoteCotacoes or Arrow table) into database columns.
+
+    Args:
+        tabela (str): Nome da tabela.
+                      Table name.
+        dados (list | LoteCotacoes | Table): Dicionários, lote colunar ou tabela Arrow com os dados.
+                                             Dictionaries, columnar batch or Arrow table with data.
+
+    Returns:
+        dict: Nome da coluna do banco -> lista de valores.
+              Database column name -> list of values.
+    """
+    if isinstance(dados, LoteCotacoes):
+        return {coluna: dados.coluna(chave) for coluna, chave in COLUNAS_TABELAS[tabela].items()}
+    if isinstance(dados, pa.Table):
+        return {coluna: dados[chave].to_pylist() for coluna, chave in COLUNAS_TABELAS[tabela].items()}
+    return {coluna: [item[chave] for item in dados] for coluna, chave in COLUNAS_TABELAS[tabela].items()}
+
+def inserir_dados(cursor, tabela, dados, tamanho_chunk=TAMANHO_CHUNK_INSERCAO):
     """
     Insere dados na tabela especificada.
     Inserts data into the specified table.
@@ -89,23 +453,127 @@ def inserir_dados(cursor, tabela, dados):
                 Database cursor.
         tabela (str): Nome da tabela.
                       Table name.
-        dados (list): Lista de dicionários com os dados.
-                      List of dictionaries with data.
+        dados (list | LoteCotacoes): Lista de dicionários ou lote colunar com os dados.
+                                     List of dictionaries or columnar batch with data.
+        tamanho_chunk (int): Linhas por comando INSERT.
+                             Rows per INSERT statement.
+    """
+    inserir_lote(cursor, tabela, registros_para_colunas(tabela, dados), tamanho_chunk)
+
+def inserir_lote(cursor, tabela, colunas, tamanho_chunk=TAMANHO_CHUNK_INSERCAO):
+    """
+    Insere um lote colunar na tabela com INSERTs de várias linhas (executemany).
+    Inserts a columnar batch into the table with multi-row INSERTs (executemany).
+
+    No esquema de série temporal, linhas repetidas de (símbolo, horário) são atualizadas (upsert).
+    On the time-series schema, repeated (symbol, timestamp) rows are updated (upsert).
+
+    Args:
+        cursor: Cursor do banco de dados.
+                Database cursor.
+        tabela (str): Nome da tabela.
+                      Table name.
+        colunas (dict | DataFrame): Nome da coluna do banco -> sequência de valores.
+                                    Database column name -> sequence of values.
+        tamanho_chunk (int): Linhas por comando INSERT.
+                             Rows per INSERT statement.
+
+    Returns:
+        int: Quantidade de linhas inseridas.
+             Number of inserted rows.
     """
+    inicio_etapa = time.perf_counter()
     try:
-        if tabela == "acoes":
-            for item in dados:
-                cursor.execute("""
-                INSERT INTO acoes (empresa, acao, cotacao, variacao_percentual, horario, tendencia, link)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (item["EMPRESA"], item["AÇÃO"], item["COTAÇÃO"], item["VARIAÇÃO PERCENTUAL"], item["HORÁRIO"], item["TENDÊNCIA"], item["LINK"]))
-        elif tabela == "moedas":
-            for item in dados:
-                cursor.execute("""
-                INSERT INTO moedas (nome, moeda, cotacao, variacao_percentual, tendencia, data_horario)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """, (item["NOME"], item["MOEDA"], item["COTAÇÃO"], item["VARIAÇÃO PERCENTUAL"], item["TENDÊNCIA"], item["DATA E HORÁRIO"]))
+        nomes = list(COLUNAS_TABELAS[tabela])
+        atualizacoes = ", ".join(f"{c} = VALUES({c})" for c in nomes if c not in CHAVES_TABELAS[tabela])
+        sql = (
+            f"INSERT INTO {tabela} ({', '.join(nomes)}) VALUES ({', '.join(['%s'] * len(nomes))}) "
+            f"ON DUPLICATE KEY UPDATE {atualizacoes}"
+        )
+        linhas = list(zip(*(colunas[nome] for nome in nomes)))
+        for inicio in range(0, len(linhas), tamanho_chunk):
+            # O pymysql reescreve executemany em um único INSERT com várias tuplas VALUES
+            # pymysql rewrites executemany into a single INSERT with several VALUES tuples
+            cursor.executemany(sql, linhas[inicio:inicio + tamanho_chunk])
+        observar("etapa_segundos", time.perf_counter() - inicio_etapa, etapa="banco", tabela=tabela)
+        contar("linhas_gravadas_total", len(linhas), destino="banco", classe=tabela)
         logger.info(f"Dados inseridos na tabela {tabela}. | Data inserted into table {tabela}.")
+        return len(linhas)
     except Exception as e:
+        contar("erros_total", fonte="banco", tipo="insercao")
         logger.error(f"Erro ao inserir dados na tabela {tabela}: {e} | Error inserting data into table {tabela}: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def salvar_ciclo(pool, dados_acoes, dados_moedas):
+    """
+    Insere as ações e moedas de um ciclo em uma única transação do pool.
+    Inserts a cycle's stocks and currencies in a single pool transaction.
+
+    Se a conexão cair, o lote inteiro é repetido em outra conexão; o upsert torna a repetição segura.
+    If the connection drops, the whole batch is retried on another connection; upserts make the retry safe.
+
+    Args:
+        pool (PoolConexoes): Pool de conexões.
+                             Connection pool.
+        dados_acoes (list | LoteCotacoes): Dados das ações.
+                                           Stock data.
+        dados_moedas (list | LoteCotacoes): Dados das moedas.
+                                            Currency data.
+    """
+    def inserir(cursor):
+        inserir_dados(cursor, "acoes", dados_acoes)
+        inserir_dados(cursor, "moedas", dados_moedas)
+
+    pool.executar(inserir)
+
+def _escapar_campo(valor):
+    """
+    Escapa um valor para o formato de texto padrão do LOAD DATA.
+    Escapes a value for LOAD DATA's default text format.
+    """
+    if valor is None:
+        return "\\N"
+    return str(valor).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+def carregar_arquivo_local(cursor, tabela, colunas):
+    """
+    Carrega um lote colunar grande via LOAD DATA LOCAL INFILE, para backfills.
+    Loads a large columnar batch via LOAD DATA LOCAL INFILE, for backfills.
+
+    A conexão precisa ter sido aberta com local_infile=True. Linhas repetidas substituem as existentes.
+    The connection must have been opened with local_infile=True. Repeated rows replace existing ones.
+
+    Args:
+        cursor: Cursor do banco de dados.
+                Database cursor.
+        tabela (str): Nome da tabela.
+                      Table name.
+        colunas (dict | DataFrame): Nome da coluna do banco -> sequência de valores.
+                                    Database column name -> sequence of values.
+
+    Returns:
+        int: Quantidade de linhas carregadas.
+             Number of loaded rows.
+    """
+    nomes = list(COLUNAS_TABELAS[tabela])
+    inicio_etapa = time.perf_counter()
+    descritor, caminho = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(descritor, "w", encoding="utf-8", newline="") as arquivo:
+            for linha in zip(*(colunas[nome] for nome in nomes)):
+                arquivo.write("\t".join(_escapar_campo(valor) for valor in linha) + "\n")
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s REPLACE INTO TABLE {tabela} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(nomes)})",
+            (caminho,)
+        )
+        observar("etapa_segundos", time.perf_counter() - inicio_etapa, etapa="banco", tabela=tabela)
+        contar("linhas_gravadas_total", cursor.rowcount, destino="banco", classe=tabela)
+        logger.info(f"{cursor.rowcount} linhas carregadas na tabela {tabela}. | {cursor.rowcount} rows loaded into table {tabela}.")
+        return cursor.rowcount
+    except Exception as e:
+        contar("erros_total", fonte="banco", tipo="carga")
+        logger.error(f"Erro ao carregar arquivo na tabela {tabela}: {e} | Error loading file into table {tabela}: {e}")
+        raise
+    finally:
+        os.remove(caminho)
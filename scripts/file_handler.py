@@ -1,64 +1,369 @@
 import os
 import sys
+import time
+import uuid
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pathlib import Path
+from config import TAMANHO_GRUPO_LINHAS, INTERVALO_DESCARGA_DATASET
+from cycle_batch import LoteCotacoes
+from metrics import contar, medir_etapa, observar
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font, Border, Side, PatternFill
 from openpyxl.formatting.rule import CellIsRule
+from openpyxl.utils import get_column_letter
 from logger_config import logger
 
+# Dataset Parquet particionado no estilo Hive (classe=.../data=...) | Hive-style partitioned Parquet dataset (classe=.../data=...)
+CAMINHO_DATASET = Path.home() / "Documents" / "BolsaValores" / "exports" / "dataset"
 
-def salvar_parquet(dados, nome_arquivo):
+# Esquema e coluna de horário de cada classe de ativo | Schema and timestamp column of each asset class
+ESQUEMAS_DATASET = {
+    "acoes": pa.schema([
+        ("EMPRESA", pa.string()),
+        ("AÇÃO", pa.string()),
+        ("COTAÇÃO", pa.float64()),
+        ("VARIAÇÃO PERCENTUAL", pa.float64()),
+        ("HORÁRIO", pa.timestamp("s")),
+        ("TENDÊNCIA", pa.string()),
+        ("LINK", pa.string())
+    ]),
+    "moedas": pa.schema([
+        ("NOME", pa.string()),
+        ("MOEDA", pa.string()),
+        ("COTAÇÃO", pa.float64()),
+        ("VARIAÇÃO PERCENTUAL", pa.float64()),
+        ("TENDÊNCIA", pa.string()),
+        ("DATA E HORÁRIO", pa.timestamp("s"))
+    ]),
+    "indicadores": pa.schema([
+        ("CLASSE", pa.string()),
+        ("SÍMBOLO", pa.string()),
+        ("HORÁRIO", pa.timestamp("s")),
+        ("INÍCIO DA BARRA", pa.timestamp("s")),
+        ("ABERTURA", pa.float64()),
+        ("MÁXIMA", pa.float64()),
+        ("MÍNIMA", pa.float64()),
+        ("FECHAMENTO", pa.float64()),
+        ("MÉDIA MÓVEL", pa.float64()),
+        ("EMA", pa.float64()),
+        ("VOLATILIDADE", pa.float64()),
+        ("MÍNIMA DA JANELA", pa.float64()),
+        ("MÁXIMA DA JANELA", pa.float64())
+    ])
+}
+COLUNAS_HORARIO = {"acoes": "HORÁRIO", "moedas": "DATA E HORÁRIO", "indicadores": "HORÁRIO"}
+
+
+def _registrar_exportacao(etapa, caminho, inicio):
+    """
+    Registra a duração e os bytes de um arquivo exportado nas métricas da etapa.
+    Records the duration and bytes of an exported file in the stage metrics.
+    """
+    observar("etapa_segundos", time.perf_counter() - inicio, etapa=etapa)
+    contar("bytes_gravados_total", Path(caminho).stat().st_size, destino=etapa)
+
+def _como_dataframe(dados):
+    """
+    Converte uma lista de dicionários ou um LoteCotacoes no DataFrame das exportações.
+    Converts a list of dictionaries or a LoteCotacoes into the exports' DataFrame.
+    """
+    if isinstance(dados, LoteCotacoes):
+        return dados.para_pandas(legado=True)
+    return pd.DataFrame(dados)
+
+def salvar_parquet(dados, nome_arquivo, diretorio=None):
     """
     Salva os dados em um arquivo Parquet.
     Saves data to a Parquet file.
 
     Args:
-        dados (list): Lista de dicionários com os dados.
-                      List of dictionaries with data.
+        dados (list | LoteCotacoes): Lista de dicionários ou lote colunar com os dados.
+                                     List of dictionaries or columnar batch with data.
         nome_arquivo (str): Nome do arquivo Parquet.
                             Name of the Parquet file.
+        diretorio (Path, optional): Diretório de saída (padrão: ~/Documents/BolsaValores/exports).
+                                    Output directory (default: ~/Documents/BolsaValores/exports).
 
     Returns:
         str: Caminho completo do arquivo salvo.
              Full path of the saved file.
     """
+    inicio = time.perf_counter()
     try:
-        caminho_documentos = Path.home() / "Documents" / "BolsaValores" / "exports"
+        caminho_documentos = Path(diretorio) if diretorio else Path.home() / "Documents" / "BolsaValores" / "exports"
         caminho_documentos.mkdir(parents=True, exist_ok=True)
         caminho_completo = caminho_documentos / nome_arquivo
-        df = pd.DataFrame(dados)
-        df.to_parquet(caminho_completo, compression="snappy")
+        if isinstance(dados, LoteCotacoes):
+            pq.write_table(dados.para_arrow(), caminho_completo, compression="snappy")
+        else:
+            df = pd.DataFrame(dados)
+            df.to_parquet(caminho_completo, compression="snappy")
+        _registrar_exportacao("parquet", caminho_completo, inicio)
         logger.info(f"Dados salvos em Parquet: {caminho_completo} | Data saved to Parquet: {caminho_completo}")
         return caminho_completo
     except Exception as e:
         logger.error(f"Erro ao salvar dados em Parquet: {e} | Error saving data to Parquet: {e}")
         return None
 
-def salvar_excel_formatado(dados_acoes, dados_moedas, nome_arquivo):
+class EscritorDataset:
+    """
+    Escreve as coletas em um dataset Parquet particionado por classe e data, com poucos arquivos grandes.
+    Writes collections to a Parquet dataset partitioned by class and date, using few large files.
+
+    As linhas ficam em memória até completar um row group, que é gravado por um ParquetWriter
+    mantido aberto enquanto a data da partição não muda. Arquivos em escrita começam com "_"
+    e só recebem o nome final ao serem fechados, para que leitores os ignorem. Com poucas linhas
+    por ciclo um row group levaria horas para encher, por isso a cada intervalo_descarga segundos
+    os buffers são gravados e os arquivos fechados; compactar_dataset junta os arquivos menores.
+    Rows stay in memory until a row group is full, which is written by a ParquetWriter kept open
+    while the partition date does not change. Files being written start with "_" and only get
+    their final name when closed, so readers ignore them. With few rows per cycle a row group
+    would take hours to fill, so every intervalo_descarga seconds the buffers are written and the
+    files closed; compactar_dataset merges the smaller files.
+
+    Args:
+        raiz (Path): Diretório raiz do dataset.
+                     Dataset root directory.
+        linhas_por_grupo (int): Linhas por row group.
+                                Rows per row group.
+        intervalo_descarga (float): Segundos máximos até as linhas ficarem visíveis (0 = só ao fechar).
+                                    Maximum seconds until rows become visible (0 = only on close).
+    """
+
+    def __init__(self, raiz=CAMINHO_DATASET, linhas_por_grupo=TAMANHO_GRUPO_LINHAS,
+                 intervalo_descarga=INTERVALO_DESCARGA_DATASET):
+        self.raiz = Path(raiz)
+        self.linhas_por_grupo = linhas_por_grupo
+        self.intervalo_descarga = intervalo_descarga
+        self._buffers = {}
+        self._escritores = {}
+        self._ultima_descarga = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def adicionar(self, classe, dados):
+        """
+        Adiciona as linhas de uma coleta ao buffer da classe, gravando os row groups completos.
+        Adds a collection's rows to the class buffer, writing full row groups.
+
+        Args:
+            classe (str): "acoes", "moedas" ou "indicadores".
+                          "acoes", "moedas" or "indicadores".
+            dados (list | LoteCotacoes | Table): Dicionários, lote colunar ou tabela Arrow com os dados.
+                                                 Dictionaries, columnar batch or Arrow table with data.
+        """
+        with medir_etapa("parquet", classe=classe):
+            try:
+                for data, tabela in self._particionar(classe, dados):
+                    self._buffers.setdefault((classe, data), []).append(tabela)
+                    contar("linhas_gravadas_total", tabela.num_rows, destino="parquet", classe=classe)
+            except Exception as e:
+                contar("erros_total", fonte="parquet", tipo="conversao")
+                logger.error(f"Erro ao converter dados de {classe} para o dataset: {e} | Error converting {classe} data for the dataset: {e}")
+                return
+            for (classe_buffer, data), tabelas in list(self._buffers.items()):
+                if classe_buffer == classe and sum(t.num_rows for t in tabelas) >= self.linhas_por_grupo:
+                    self._gravar(classe, data)
+            if self.intervalo_descarga and time.monotonic() - self._ultima_descarga >= self.intervalo_descarga:
+                # Publica o que há em memória com o nome final; as próximas linhas vão para arquivos novos
+                # Publishes what is in memory under the final name; the next rows go to new files
+                self.fechar()
+
+    @staticmethod
+    def _particionar(classe, dados):
+        """
+        Converte os dados em tabelas Arrow no esquema da classe, uma por data de partição.
+        Converts the data into Arrow tables in the class schema, one per partition date.
+        """
+        esquema = ESQUEMAS_DATASET[classe]
+        coluna_horario = COLUNAS_HORARIO[classe]
+        if isinstance(dados, (LoteCotacoes, pa.Table)):
+            # Dia de cada linha a partir dos segundos int64, sem formatar texto
+            # Day of each row from the int64 seconds, without formatting text
+            if isinstance(dados, LoteCotacoes):
+                tabela = dados.para_arrow().cast(esquema)
+                dias = np.frombuffer(dados.horarios, dtype=np.int64) // 86400
+            else:
+                tabela = dados.select(esquema.names).cast(esquema)
+                dias = tabela[coluna_horario].cast(pa.int64()).to_numpy() // 86400
+            unicos = np.unique(dias)
+            if len(unicos) == 1:
+                yield str(np.datetime64(int(unicos[0]), "D")), tabela
+                return
+            # Vários dias (ex.: backfill): ordena uma vez e fatia cada dia, sem um filtro por data
+            # Several days (e.g. backfill): sort once and slice each day, without one filter per date
+            ordem = np.argsort(dias, kind="stable")
+            tabela, dias = tabela.take(ordem), dias[ordem]
+            limites = np.searchsorted(dias, unicos).tolist() + [len(dias)]
+            for dia, inicio, fim in zip(unicos, limites, limites[1:]):
+                yield str(np.datetime64(int(dia), "D")), tabela.slice(inicio, fim - inicio)
+            return
+
+        linhas_por_data = {}
+        for item in dados:
+            linhas_por_data.setdefault(str(item[coluna_horario])[:10], []).append(item)
+        for data, linhas in linhas_por_data.items():
+            colunas = {nome: [item[nome] for item in linhas] for nome in esquema.names}
+            for campo in esquema:
+                if pa.types.is_timestamp(campo.type):
+                    horarios = pa.array([str(h) for h in colunas[campo.name]])
+                    colunas[campo.name] = pc.strptime(horarios, format="%Y-%m-%d %H:%M:%S", unit="s")
+            yield data, pa.Table.from_pydict(colunas, schema=esquema)
+
+    def _gravar(self, classe, data):
+        """
+        Grava o buffer de uma partição como um row group no arquivo aberto da partição.
+        Writes a partition buffer as one row group in the partition's open file.
+
+        O buffer só é descartado depois da gravação; se ela falhar, as linhas ficam para a próxima.
+        The buffer is only dropped after the write; if it fails, the rows stay for the next one.
+        """
+        tabelas = self._buffers.get((classe, data))
+        if not tabelas:
+            return
+        try:
+            # Uma data nova encerra os arquivos de datas anteriores da mesma classe
+            # A new date closes the files of earlier dates of the same class
+            for chave in [k for k in self._escritores if k[0] == classe and k[1] < data]:
+                self._fechar_escritor(chave)
+
+            esquema = ESQUEMAS_DATASET[classe]
+            tabela = pa.concat_tables(tabelas)
+
+            if (classe, data) not in self._escritores:
+                diretorio = self.raiz / f"classe={classe}" / f"data={data}"
+                diretorio.mkdir(parents=True, exist_ok=True)
+                nome = f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+                temporario = diretorio / f"_{nome}"
+                escritor = pq.ParquetWriter(temporario, esquema, compression="snappy")
+                self._escritores[(classe, data)] = (escritor, temporario, diretorio / nome)
+            self._escritores[(classe, data)][0].write_table(tabela, row_group_size=self.linhas_por_grupo)
+            del self._buffers[(classe, data)]
+        except Exception as e:
+            contar("erros_total", fonte="parquet", tipo="gravacao")
+            logger.error(f"Erro ao gravar dataset Parquet ({classe}, {data}): {e} | Error writing Parquet dataset ({classe}, {data}): {e}")
+
+    def _fechar_escritor(self, chave):
+        escritor, temporario, final = self._escritores.pop(chave)
+        escritor.close()
+        temporario.rename(final)
+        contar("bytes_gravados_total", final.stat().st_size, destino="parquet")
+        logger.info(f"Arquivo do dataset concluído: {final} | Dataset file completed: {final}")
+
+    def descarregar(self):
+        """
+        Grava todos os buffers pendentes, mesmo com row groups incompletos.
+        Writes all pending buffers, even with incomplete row groups.
+        """
+        for classe, data in list(self._buffers):
+            self._gravar(classe, data)
+
+    def fechar(self):
+        """
+        Grava os buffers pendentes e fecha todos os arquivos abertos; o escritor pode continuar em uso.
+        Writes pending buffers and closes all open files; the writer can still be used afterwards.
+        """
+        self.descarregar()
+        for chave in list(self._escritores):
+            self._fechar_escritor(chave)
+        self._ultima_descarga = time.monotonic()
+
+def compactar_dataset(raiz=CAMINHO_DATASET, linhas_por_grupo=TAMANHO_GRUPO_LINHAS):
+    """
+    Junta os arquivos pequenos de cada partição do dataset em um único arquivo.
+    Merges the small files of each dataset partition into a single file.
+
+    Arquivos em escrita (iniciados por "_") não são tocados.
+    Files being written (starting with "_") are left untouched.
+
+    Args:
+        raiz (Path): Diretório raiz do dataset.
+                     Dataset root directory.
+        linhas_por_grupo (int): Linhas por row group no arquivo compactado.
+                                Rows per row group in the compacted file.
+
+    Returns:
+        dict: Partições compactadas, arquivos antes e depois.
+              Compacted partitions, files before and after.
+    """
+    resumo = {"particoes": 0, "arquivos_antes": 0, "arquivos_depois": 0}
+    for diretorio in sorted(Path(raiz).glob("classe=*/data=*")):
+        arquivos = sorted(a for a in diretorio.glob("*.parquet") if not a.name.startswith(("_", ".")))
+        resumo["arquivos_antes"] += len(arquivos)
+        if len(arquivos) < 2:
+            resumo["arquivos_depois"] += len(arquivos)
+            continue
+        try:
+            tabela = pa.concat_tables(pq.read_table(a) for a in arquivos)
+            nome = f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}-compactado.parquet"
+            temporario = diretorio / f"_{nome}"
+            pq.write_table(tabela, temporario, compression="snappy", row_group_size=linhas_por_grupo)
+            temporario.rename(diretorio / nome)
+            for arquivo in arquivos:
+                arquivo.unlink()
+            resumo["particoes"] += 1
+            resumo["arquivos_depois"] += 1
+            logger.info(f"Partição compactada: {diretorio} ({len(arquivos)} arquivos) | Partition compacted: {diretorio} ({len(arquivos)} files)")
+        except Exception as e:
+            resumo["arquivos_depois"] += len(arquivos)
+            logger.error(f"Erro ao compactar a partição {diretorio}: {e} | Error compacting partition {diretorio}: {e}")
+    return resumo
+
+def estatisticas_arquivos(diretorio, padrao="**/*.parquet"):
+    """
+    Conta os arquivos Parquet e os bytes ocupados em um diretório.
+    Counts the Parquet files and bytes used in a directory.
+
+    Args:
+        diretorio (Path): Diretório a inspecionar.
+                          Directory to inspect.
+        padrao (str): Padrão glob dos arquivos.
+                      File glob pattern.
+
+    Returns:
+        dict: Chaves "arquivos" e "bytes".
+              Keys "arquivos" and "bytes".
+    """
+    arquivos = [a for a in Path(diretorio).glob(padrao) if a.is_file()]
+    return {"arquivos": len(arquivos), "bytes": sum(a.stat().st_size for a in arquivos)}
+
+def salvar_excel_formatado(dados_acoes, dados_moedas, nome_arquivo, diretorio=None):
     """
     Salva os DataFrames em um arquivo Excel com formatação profissional.
     Saves the DataFrames to an Excel file with professional formatting.
 
     Args:
-        dados_acoes (list): Lista de dicionários com os dados das ações.
-                            List of dictionaries with stock data.
-        dados_moedas (list): Lista de dicionários com os dados das moedas.
-                             List of dictionaries with currency data.
+        dados_acoes (list | LoteCotacoes): Dados das ações.
+                                           Stock data.
+        dados_moedas (list | LoteCotacoes): Dados das moedas.
+                                            Currency data.
         nome_arquivo (str): Nome do arquivo Excel.
                             Name of the Excel file.
+        diretorio (Path, optional): Diretório de saída (padrão: ~/Documents/BolsaValores/exports).
+                                    Output directory (default: ~/Documents/BolsaValores/exports).
 
     Returns:
         str: Caminho completo do arquivo salvo.
              Full path of the saved file.
     """
+    inicio = time.perf_counter()
     try:
-        caminho_documentos = Path.home() / "Documents" / "BolsaValores" / "exports"
+        caminho_documentos = Path(diretorio) if diretorio else Path.home() / "Documents" / "BolsaValores" / "exports"
         caminho_documentos.mkdir(parents=True, exist_ok=True)
         caminho_completo = caminho_documentos / nome_arquivo
 
         # Converter listas de dicionários para DataFrames
-        df_acoes = pd.DataFrame(dados_acoes)
-        df_moedas = pd.DataFrame(dados_moedas)
+        df_acoes = _como_dataframe(dados_acoes)
+        df_moedas = _como_dataframe(dados_moedas)
 
         # Salvar em Excel
         with pd.ExcelWriter(caminho_completo, engine="openpyxl") as writer:
@@ -138,9 +443,119 @@ def salvar_excel_formatado(dados_acoes, dados_moedas, nome_arquivo):
                 CellIsRule(operator="equal", formula=['"Caindo | Down"'], fill=red_fill)
             )
 
+        _registrar_exportacao("excel", caminho_completo, inicio)
+        logger.info(f"Dados exportados para {caminho_completo} com sucesso! | Data exported to {caminho_completo} successfully!")
+        return caminho_completo
+    except Exception as e:
+        contar("erros_total", fonte="excel", tipo="gravacao")
+        logger.error(f"Erro ao exportar dados para Excel: {e} | Error exporting data to Excel: {e}")
+        return None
+
+def _escrever_aba_streaming(workbook, nome_aba, df):
+    """
+    Escreve um DataFrame em uma aba write-only, com a formatação de salvar_excel_formatado.
+    Writes a DataFrame to a write-only sheet, with the salvar_excel_formatado formatting.
+    """
+    worksheet = workbook.create_sheet(nome_aba)
+    colunas = list(df.columns)
+
+    # Larguras calculadas no DataFrame inteiro de uma vez; precisam vir antes da primeira linha
+    # Widths computed on the whole DataFrame at once; they must be set before the first row
+    for indice, coluna in enumerate(colunas, 1):
+        maior_valor = df[coluna].astype(str).str.len().max() if len(df) else 0
+        worksheet.column_dimensions[get_column_letter(indice)].width = max(len(str(coluna)), maior_valor) + 2
+
+    # Um conjunto de células estilizadas por coluna, reaproveitado em todas as linhas:
+    # a aba write-only serializa cada linha no append, então os objetos podem ser reutilizados
+    # One set of styled cells per column, reused for every row: the write-only sheet
+    # serializes each row on append, so the objects can be reused
+    thin_border = Border(
+        left=Side(style="thin"),
+        right=Side(style="thin"),
+        top=Side(style="thin"),
+        bottom=Side(style="thin")
+    )
+    alinhamento = Alignment(horizontal="center")
+    cabecalho = []
+    for coluna in colunas:
+        cell = WriteOnlyCell(worksheet, value=coluna)
+        cell.font = Font(bold=True)
+        cell.alignment = alinhamento
+        cell.border = thin_border
+        cabecalho.append(cell)
+    worksheet.append(cabecalho)
+
+    celulas = []
+    for _ in colunas:
+        cell = WriteOnlyCell(worksheet)
+        cell.alignment = alinhamento
+        cell.border = thin_border
+        celulas.append(cell)
+
+    valores = []
+    for coluna in colunas:
+        serie = df[coluna]
+        # NaN vira célula vazia, como no to_excel do pandas | NaN becomes an empty cell, as in pandas to_excel
+        valores.append(serie.astype(object).where(serie.notna(), None).tolist() if serie.hasnans else serie.tolist())
+    for linha in zip(*valores):
+        for cell, valor in zip(celulas, linha):
+            cell.value = valor
+        worksheet.append(celulas)
+
+    # Formatação condicional para tendências | Conditional formatting for trends
+    if "TENDÊNCIA" in colunas and len(df):
+        letra = get_column_letter(colunas.index("TENDÊNCIA") + 1)
+        green_fill = PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid")
+        red_fill = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
+        worksheet.conditional_formatting.add(
+            f"{letra}2:{letra}{len(df) + 1}",
+            CellIsRule(operator="equal", formula=['"Subindo | Up"'], fill=green_fill)
+        )
+        worksheet.conditional_formatting.add(
+            f"{letra}2:{letra}{len(df) + 1}",
+            CellIsRule(operator="equal", formula=['"Caindo | Down"'], fill=red_fill)
+        )
+
+def salvar_excel_streaming(dados_acoes, dados_moedas, nome_arquivo, diretorio=None):
+    """
+    Salva os dados em Excel com a mesma formatação de salvar_excel_formatado, em modo streaming.
+    Saves the data to Excel with the same formatting as salvar_excel_formatado, in streaming mode.
+
+    Usa abas write-only (memória constante) e estilos compartilhados, e calcula as larguras das
+    colunas de forma vetorizada, sem percorrer as células depois de escritas.
+    Uses write-only (constant memory) sheets and shared styles, and computes column widths in a
+    vectorized way, without walking the cells after they are written.
+
+    Args:
+        dados_acoes (list | DataFrame | LoteCotacoes): Dados das ações.
+                                                       Stock data.
+        dados_moedas (list | DataFrame | LoteCotacoes): Dados das moedas.
+                                                        Currency data.
+        nome_arquivo (str): Nome do arquivo Excel.
+                            Name of the Excel file.
+        diretorio (Path, optional): Diretório de saída (padrão: ~/Documents/BolsaValores/exports).
+                                    Output directory (default: ~/Documents/BolsaValores/exports).
+
+    Returns:
+        str: Caminho completo do arquivo salvo.
+             Full path of the saved file.
+    """
+    inicio = time.perf_counter()
+    try:
+        caminho_documentos = Path(diretorio) if diretorio else Path.home() / "Documents" / "BolsaValores" / "exports"
+        caminho_documentos.mkdir(parents=True, exist_ok=True)
+        caminho_completo = caminho_documentos / nome_arquivo
+
+        workbook = Workbook(write_only=True)
+        _escrever_aba_streaming(workbook, "Ações", _como_dataframe(dados_acoes))
+        _escrever_aba_streaming(workbook, "Moedas", _como_dataframe(dados_moedas))
+        workbook.save(caminho_completo)
+
+        _registrar_exportacao("excel", caminho_completo, inicio)
         logger.info(f"Dados exportados para {caminho_completo} com sucesso! | Data exported to {caminho_completo} successfully!")
         return caminho_completo
     except Exception as e:
+        contar("erros_total", fonte="excel", tipo="gravacao")
         logger.error(f"Erro ao exportar dados para Excel: {e} | Error exporting data to Excel: {e}")
         return None
 
@@ -0,0 +1,173 @@
+from datetime import datetime, date
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.dataset as ds
+from file_handler import CAMINHO_DATASET, ESQUEMAS_DATASET, COLUNAS_HORARIO
+from logger_config import logger
+
+# Coluna de símbolo de cada classe de ativo | Symbol column of each asset class
+COLUNAS_SIMBOLO = {"acoes": "AÇÃO", "moedas": "MOEDA", "indicadores": "SÍMBOLO"}
+
+# Partição de data gravada pelo EscritorDataset | Date partition written by EscritorDataset
+PARTICIONAMENTO = ds.partitioning(pa.schema([("data", pa.string())]), flavor="hive")
+
+
+def _como_datetime(valor):
+    """
+    Aceita datetime, date ou texto ISO e retorna datetime (None é mantido).
+    Accepts datetime, date or ISO text and returns datetime (None is kept).
+    """
+    if valor is None or isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, date):
+        return datetime(valor.year, valor.month, valor.day)
+    return datetime.fromisoformat(str(valor))
+
+def abrir_dataset(classe, raiz=CAMINHO_DATASET):
+    """
+    Abre o dataset de uma classe de ativo sem ler os dados (descoberta preguiçosa).
+    Opens an asset class dataset without reading the data (lazy discovery).
+
+    Args:
+        classe (str): "acoes", "moedas" ou "indicadores".
+                      "acoes", "moedas" or "indicadores".
+        raiz (Path): Diretório raiz do dataset.
+                     Dataset root directory.
+
+    Returns:
+        Dataset: Dataset do pyarrow.
+                 pyarrow Dataset.
+    """
+    return ds.dataset(
+        Path(raiz) / f"classe={classe}",
+        schema=ESQUEMAS_DATASET[classe].append(pa.field("data", pa.string())),
+        format="parquet",
+        partitioning=PARTICIONAMENTO,
+    )
+
+def montar_filtro(classe, simbolos=None, inicio=None, fim=None):
+    """
+    Monta o filtro de símbolo e horário, incluindo a poda por partição de data.
+    Builds the symbol and timestamp filter, including date partition pruning.
+
+    Args:
+        classe (str): "acoes", "moedas" ou "indicadores".
+                      "acoes", "moedas" or "indicadores".
+        simbolos (list, optional): Símbolos desejados (padrão: todos).
+                                   Wanted symbols (default: all).
+        inicio (datetime, optional): Horário inicial (inclusive).
+                                     Start timestamp (inclusive).
+        fim (datetime, optional): Horário final (exclusive).
+                                  End timestamp (exclusive).
+
+    Returns:
+        Expression: Filtro do pyarrow, ou None sem restrições.
+                    pyarrow filter, or None without restrictions.
+    """
+    filtros = []
+    coluna_horario = ds.field(COLUNAS_HORARIO[classe])
+    if simbolos is not None:
+        filtros.append(ds.field(COLUNAS_SIMBOLO[classe]).isin(list(simbolos)))
+    if inicio is not None:
+        # A partição "data" permite pular diretórios inteiros antes de abrir os arquivos
+        # The "data" partition lets whole directories be skipped before opening files
+        filtros.append(ds.field("data") >= inicio.date().isoformat())
+        filtros.append(coluna_horario >= pa.scalar(inicio, pa.timestamp("s")))
+    if fim is not None:
+        filtros.append(ds.field("data") <= fim.date().isoformat())
+        filtros.append(coluna_horario < pa.scalar(fim, pa.timestamp("s")))
+    filtro = None
+    for expressao in filtros:
+        filtro = expressao if filtro is None else filtro & expressao
+    return filtro
+
+def _carregar(classe, simbolos, inicio, fim, colunas, formato, raiz):
+    """
+    Lê uma classe do dataset aplicando filtro e projeção de colunas no próprio scan.
+    Reads one class of the dataset applying the filter and column projection in the scan itself.
+    """
+    colunas = list(colunas) if colunas else ESQUEMAS_DATASET[classe].names
+    try:
+        inicio, fim = _como_datetime(inicio), _como_datetime(fim)
+        dataset = abrir_dataset(classe, raiz)
+        tabela = dataset.to_table(columns=colunas, filter=montar_filtro(classe, simbolos, inicio, fim))
+        return tabela.to_pandas() if formato == "pandas" else tabela
+    except FileNotFoundError:
+        logger.warning(f"Nenhum dado de {classe} em {raiz} | No {classe} data in {raiz}")
+        tabela = ESQUEMAS_DATASET[classe].empty_table().select(colunas)
+        return tabela.to_pandas() if formato == "pandas" else tabela
+
+def carregar_precos(simbolos=None, inicio=None, fim=None, colunas=None, formato="arrow", raiz=CAMINHO_DATASET):
+    """
+    Carrega o histórico de ações lendo só as partições, row groups e colunas necessárias.
+    Loads stock history reading only the needed partitions, row groups and columns.
+
+    Args:
+        simbolos (list, optional): Ações desejadas (padrão: todas).
+                                   Wanted stocks (default: all).
+        inicio (datetime | str, optional): Horário inicial (inclusive).
+                                           Start timestamp (inclusive).
+        fim (datetime | str, optional): Horário final (exclusive).
+                                        End timestamp (exclusive).
+        colunas (list, optional): Colunas desejadas (padrão: todas).
+                                  Wanted columns (default: all).
+        formato (str): "arrow" (pyarrow.Table) ou "pandas" (DataFrame).
+                       "arrow" (pyarrow.Table) or "pandas" (DataFrame).
+        raiz (Path): Diretório raiz do dataset.
+                     Dataset root directory.
+
+    Returns:
+        Table | DataFrame: Linhas filtradas.
+                           Filtered rows.
+    """
+    return _carregar("acoes", simbolos, inicio, fim, colunas, formato, raiz)
+
+def carregar_cotacoes_moedas(moedas=None, inicio=None, fim=None, colunas=None, formato="arrow", raiz=CAMINHO_DATASET):
+    """
+    Carrega o histórico de moedas lendo só as partições, row groups e colunas necessárias.
+    Loads currency history reading only the needed partitions, row groups and columns.
+
+    Args:
+        moedas (list, optional): Moedas desejadas (padrão: todas).
+                                 Wanted currencies (default: all).
+        inicio (datetime | str, optional): Horário inicial (inclusive).
+                                           Start timestamp (inclusive).
+        fim (datetime | str, optional): Horário final (exclusive).
+                                        End timestamp (exclusive).
+        colunas (list, optional): Colunas desejadas (padrão: todas).
+                                  Wanted columns (default: all).
+        formato (str): "arrow" (pyarrow.Table) ou "pandas" (DataFrame).
+                       "arrow" (pyarrow.Table) or "pandas" (DataFrame).
+        raiz (Path): Diretório raiz do dataset.
+                     Dataset root directory.
+
+    Returns:
+        Table | DataFrame: Linhas filtradas.
+                           Filtered rows.
+    """
+    return _carregar("moedas", moedas, inicio, fim, colunas, formato, raiz)
+
+def carregar_indicadores(simbolos=None, inicio=None, fim=None, colunas=None, formato="arrow", raiz=CAMINHO_DATASET):
+    """
+    Carrega as séries de indicadores gravadas junto com as cotações.
+    Loads the indicator series written alongside the quotes.
+
+    Args:
+        simbolos (list, optional): Ações ou moedas desejadas (padrão: todas).
+                                   Wanted stocks or currencies (default: all).
+        inicio (datetime | str, optional): Horário inicial (inclusive).
+                                           Start timestamp (inclusive).
+        fim (datetime | str, optional): Horário final (exclusive).
+                                        End timestamp (exclusive).
+        colunas (list, optional): Colunas desejadas (padrão: todas).
+                                  Wanted columns (default: all).
+        formato (str): "arrow" (pyarrow.Table) ou "pandas" (DataFrame).
+                       "arrow" (pyarrow.Table) or "pandas" (DataFrame).
+        raiz (Path): Diretório raiz do dataset.
+                     Dataset root directory.
+
+    Returns:
+        Table | DataFrame: Linhas filtradas.
+                           Filtered rows.
+    """
+    return _carregar("indicadores", simbolos, inicio, fim, colunas, formato, raiz)
@@ -0,0 +1,120 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from config import TAMANHO_POOL_HTTP
+
+_sessao = None
+_sessao_lock = threading.Lock()
+# Contadores do processo; ficam fora dos pools, que o PoolManager descarta ao atingir pool_connections hosts
+# Process-wide counters; they live outside the pools, which the PoolManager discards past pool_connections hosts
+_contadores_lock = threading.Lock()
+_contadores = {"requisicoes": 0, "conexoes": 0, "bytes": 0}
+
+
+def _somar(chave, valor=1):
+    with _contadores_lock:
+        _contadores[chave] += valor
+
+class _PoolHTTPContado(HTTPConnectionPool):
+    """
+    Pool HTTP que soma requisições e conexões novas nos contadores do processo.
+    HTTP pool that adds requests and new connections to the process-wide counters.
+    """
+
+    def urlopen(self, *args, **kwargs):
+        _somar("requisicoes")
+        return super().urlopen(*args, **kwargs)
+
+    def _new_conn(self):
+        _somar("conexoes")
+        return super()._new_conn()
+
+class _PoolHTTPSContado(HTTPSConnectionPool):
+    """
+    Pool HTTPS que soma requisições e conexões novas nos contadores do processo.
+    HTTPS pool that adds requests and new connections to the process-wide counters.
+    """
+
+    def urlopen(self, *args, **kwargs):
+        _somar("requisicoes")
+        return super().urlopen(*args, **kwargs)
+
+    def _new_conn(self):
+        _somar("conexoes")
+        return super()._new_conn()
+
+class _AdaptadorContado(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _PoolHTTPContado, "https": _PoolHTTPSContado}
+
+def criar_sessao(tamanho_pool=TAMANHO_POOL_HTTP):
+    """
+    Cria uma sessão HTTP com pool de conexões keep-alive.
+    Creates an HTTP session with a keep-alive connection pool.
+
+    Args:
+        tamanho_pool (int): Conexões mantidas abertas por host.
+                            Connections kept open per host.
+
+    Returns:
+        Session: Sessão do requests.
+                 requests Session.
+    """
+    sessao = requests.Session()
+    adaptador = _AdaptadorContado(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool)
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    sessao.hooks["response"].append(_contar_bytes)
+    return sessao
+
+def obter_sessao():
+    """
+    Retorna a sessão HTTP compartilhada pelo processo, criando-a na primeira chamada.
+    Returns the process-wide shared HTTP session, creating it on the first call.
+    """
+    global _sessao
+    with _sessao_lock:
+        if _sessao is None:
+            _sessao = criar_sessao()
+        return _sessao
+
+def _contar_bytes(response, *args, **kwargs):
+    """
+    Hook de resposta que acumula os bytes do corpo como vieram da rede (antes de descomprimir).
+    Response hook that accumulates the body bytes as they came off the wire (before decompressing).
+    """
+    # Lê o corpo (o requests o leria logo em seguida) para que tell() conte a resposta inteira
+    # Reads the body (requests would read it right after) so tell() covers the whole response
+    corpo = response.content
+    tell = getattr(response.raw, "tell", None)
+    _somar("bytes", tell() if tell is not None else len(corpo))
+
+def metricas_http():
+    """
+    Retorna contadores acumulados do processo de requisições, conexões abertas e bytes recebidos.
+    Returns the process's cumulative counters of requests, opened connections and received bytes.
+
+    Os contadores só crescem, mesmo quando um pool de conexões é descartado, então a diferença
+    entre duas leituras é sempre a atividade do intervalo. A diferença entre requisições e
+    conexões é a quantidade de conexões reaproveitadas.
+    The counters only grow, even when a connection pool is discarded, so the difference between
+    two readings is always the activity of the interval. The difference between requests and
+    connections is the number of reused connections.
+
+    Returns:
+        dict: Chaves "requisicoes", "conexoes", "reusos" e "bytes".
+              Keys "requisicoes", "conexoes", "reusos" and "bytes".
+    """
+    with _contadores_lock:
+        contadores = dict(_contadores)
+    contadores["reusos"] = contadores["requisicoes"] - contadores["conexoes"]
+    return contadores
+
+def diferenca_metricas(antes, depois):
+    """
+    Calcula a variação dos contadores entre duas leituras de metricas_http (por ciclo).
+    Computes the counter change between two metricas_http readings (per cycle).
+    """
+    return {chave: depois[chave] - antes.get(chave, 0) for chave in depois}
@@ -0,0 +1,265 @@
+import math
+from array import array
+from collections import deque
+from datetime import datetime
+from config import JANELA_INDICADORES, PERIODO_EMA, INTERVALO_BARRA
+from logger_config import logger
+
+# Coluna de símbolo e de horário de cada classe coletada | Symbol and timestamp column of each collected class
+COLUNAS_ENTRADA = {
+    "acoes": ("AÇÃO", "HORÁRIO"),
+    "moedas": ("MOEDA", "DATA E HORÁRIO")
+}
+
+# Fração do pico de M2 abaixo da qual a janela é recalculada do buffer | Fraction of the M2 peak below which the window is recomputed from the buffer
+QUEDA_RECALCULO = 1e-6
+
+
+class BufferCircular:
+    """
+    Buffer circular de tamanho fixo sobre um array de floats.
+    Fixed-size ring buffer over a float array.
+
+    Args:
+        capacidade (int): Quantidade máxima de valores.
+                          Maximum number of values.
+    """
+
+    __slots__ = ("_valores", "_proximo", "tamanho", "capacidade")
+
+    def __init__(self, capacidade):
+        self._valores = array("d", bytes(8 * capacidade))
+        self._proximo = 0
+        self.tamanho = 0
+        self.capacidade = capacidade
+
+    def adicionar(self, valor):
+        """
+        Adiciona um valor e retorna o valor descartado, ou None se o buffer não estava cheio.
+        Adds a value and returns the evicted value, or None if the buffer was not full.
+        """
+        descartado = self._valores[self._proximo] if self.tamanho == self.capacidade else None
+        self._valores[self._proximo] = valor
+        self._proximo = (self._proximo + 1) % self.capacidade
+        self.tamanho = min(self.tamanho + 1, self.capacidade)
+        return descartado
+
+    def valores(self):
+        """
+        Retorna os valores guardados, fora de ordem.
+        Returns the stored values, out of order.
+        """
+        return self._valores[:self.tamanho]
+
+class JanelaMovel:
+    """
+    Estatísticas de uma janela móvel (média, desvio padrão, mínimo e máximo) com atualização O(1).
+    Rolling window statistics (mean, standard deviation, min and max) with O(1) updates.
+
+    Média e desvio usam as atualizações de Welford (entrada e saída de valores), recalculadas do
+    buffer a cada capacidade inserções, para que o erro de arredondamento não se acumule, e quando
+    M2 despenca em relação ao seu pico (ex.: o preço muda de patamar), onde o cancelamento pesa;
+    mínimo e máximo usam deques monotônicas (O(1) amortizado).
+    Mean and deviation use Welford updates (values entering and leaving), recomputed from the
+    buffer every capacidade insertions, so rounding error does not pile up, and when M2 collapses
+    relative to its peak (e.g. the price changes level), where cancellation matters; min and max
+    use monotonic deques (amortized O(1)).
+
+    Args:
+        tamanho (int): Quantidade de valores na janela.
+                       Number of values in the window.
+    """
+
+    __slots__ = ("_buffer", "_media", "_m2", "_m2_pico", "_minimos", "_maximos", "_contador")
+
+    def __init__(self, tamanho):
+        self._buffer = BufferCircular(tamanho)
+        self._media = 0.0
+        # Soma dos quadrados dos desvios em relação à média | Sum of squared deviations from the mean
+        self._m2 = 0.0
+        self._m2_pico = 0.0
+        self._minimos = deque()
+        self._maximos = deque()
+        self._contador = 0
+
+    def adicionar(self, valor):
+        descartado = self._buffer.adicionar(valor)
+        n = self._buffer.tamanho
+        if descartado is None:
+            delta = valor - self._media
+            self._media += delta / n
+            self._m2 += delta * (valor - self._media)
+        else:
+            # O valor novo substitui o descartado, sem mudar n | The new value replaces the evicted one, n unchanged
+            anterior = self._media
+            self._media += (valor - descartado) / n
+            self._m2 += (valor - descartado) * (valor - self._media + descartado - anterior)
+
+        # As deques guardam (posição, valor); posições fora da janela saem pela esquerda
+        # The deques hold (position, value); positions outside the window leave from the left
+        limite = self._contador - self._buffer.capacidade
+        while self._minimos and self._minimos[-1][1] >= valor:
+            self._minimos.pop()
+        while self._maximos and self._maximos[-1][1] <= valor:
+            self._maximos.pop()
+        self._minimos.append((self._contador, valor))
+        self._maximos.append((self._contador, valor))
+        while self._minimos[0][0] <= limite:
+            self._minimos.popleft()
+        while self._maximos[0][0] <= limite:
+            self._maximos.popleft()
+        self._contador += 1
+        self._m2_pico = max(self._m2_pico, self._m2)
+        if self._contador % self._buffer.capacidade == 0 or self._m2 < self._m2_pico * QUEDA_RECALCULO:
+            self._recalcular()
+
+    def _recalcular(self):
+        """
+        Recalcula média e M2 do zero, em duas passadas sobre o buffer (O(capacidade), amortizado O(1)).
+        Recomputes mean and M2 from scratch, in two passes over the buffer (O(capacidade), amortized O(1)).
+        """
+        valores = self._buffer.valores()
+        self._media = math.fsum(valores) / len(valores)
+        self._m2 = self._m2_pico = math.fsum((valor - self._media) ** 2 for valor in valores)
+
+    @property
+    def cheia(self):
+        return self._buffer.tamanho == self._buffer.capacidade
+
+    @property
+    def media(self):
+        return self._media if self._buffer.tamanho else math.nan
+
+    @property
+    def desvio(self):
+        """
+        Desvio padrão amostral (ddof=1), como o rolling().std() do pandas.
+        Sample standard deviation (ddof=1), like pandas rolling().std().
+        """
+        n = self._buffer.tamanho
+        if n < 2:
+            return math.nan
+        return math.sqrt(max(self._m2, 0.0) / (n - 1))
+
+    @property
+    def minimo(self):
+        return self._minimos[0][1] if self._minimos else math.nan
+
+    @property
+    def maximo(self):
+        return self._maximos[0][1] if self._maximos else math.nan
+
+class EstadoSimbolo:
+    """
+    Estado incremental de um símbolo: barra OHLC atual, EMA e janelas móveis de preço e retorno.
+    Incremental state of one symbol: current OHLC bar, EMA and rolling windows of price and return.
+
+    Args:
+        janela (int): Tamanho das janelas móveis.
+                      Rolling window size.
+        periodo_ema (int): Período da média móvel exponencial.
+                           Exponential moving average period.
+        intervalo_barra (int): Duração das barras OHLC em segundos.
+                               OHLC bar length in seconds.
+    """
+
+    __slots__ = ("intervalo_barra", "alfa", "barra", "abertura", "maxima", "minima",
+                 "ultimo", "ema", "precos", "retornos")
+
+    def __init__(self, janela, periodo_ema, intervalo_barra):
+        self.intervalo_barra = intervalo_barra
+        self.alfa = 2.0 / (periodo_ema + 1)
+        self.barra = None
+        self.abertura = self.maxima = self.minima = self.ultimo = self.ema = math.nan
+        self.precos = JanelaMovel(janela)
+        self.retornos = JanelaMovel(janela)
+
+    def atualizar(self, preco, instante):
+        """
+        Incorpora uma cotação em O(1).
+        Incorporates one quote in O(1).
+
+        Args:
+            preco (float): Cotação.
+                           Quote.
+            instante (float): Horário em segundos desde a época.
+                              Timestamp in seconds since the epoch.
+        """
+        barra = int(instante // self.intervalo_barra) * self.intervalo_barra
+        if barra != self.barra:
+            self.barra = barra
+            self.abertura = self.maxima = self.minima = preco
+        else:
+            self.maxima = max(self.maxima, preco)
+            self.minima = min(self.minima, preco)
+
+        if not math.isnan(self.ultimo) and self.ultimo:
+            self.retornos.adicionar(preco / self.ultimo - 1)
+        self.ema = preco if math.isnan(self.ema) else self.alfa * preco + (1 - self.alfa) * self.ema
+        self.precos.adicionar(preco)
+        self.ultimo = preco
+
+class MotorIndicadores:
+    """
+    Mantém o estado incremental de cada símbolo e gera as linhas de indicadores a cada ciclo.
+    Keeps the incremental state of each symbol and produces the indicator rows each cycle.
+
+    Args:
+        janela (int): Tamanho das janelas móveis (média, volatilidade, mínimo e máximo).
+                      Rolling window size (mean, volatility, min and max).
+        periodo_ema (int): Período da média móvel exponencial.
+                           Exponential moving average period.
+        intervalo_barra (int): Duração das barras OHLC em segundos.
+                               OHLC bar length in seconds.
+    """
+
+    def __init__(self, janela=JANELA_INDICADORES, periodo_ema=PERIODO_EMA, intervalo_barra=INTERVALO_BARRA):
+        self.janela = janela
+        self.periodo_ema = periodo_ema
+        self.intervalo_barra = intervalo_barra
+        self._estados = {}
+
+    def atualizar(self, classe, dados):
+        """
+        Atualiza os indicadores com as cotações de um ciclo.
+        Updates the indicators with one cycle's quotes.
+
+        Args:
+            classe (str): "acoes" ou "moedas".
+                          "acoes" or "moedas".
+            dados (list): Lista de dicionários com os dados coletados.
+                          List of dictionaries with the collected data.
+
+        Returns:
+            list: Uma linha de indicadores por cotação, no esquema "indicadores" do dataset.
+                  One indicator row per quote, in the dataset's "indicadores" schema.
+        """
+        coluna_simbolo, coluna_horario = COLUNAS_ENTRADA[classe]
+        linhas = []
+        for item in dados:
+            try:
+                simbolo = item[coluna_simbolo]
+                horario = str(item[coluna_horario])
+                estado = self._estados.get((classe, simbolo))
+                if estado is None:
+                    estado = EstadoSimbolo(self.janela, self.periodo_ema, self.intervalo_barra)
+                    self._estados[(classe, simbolo)] = estado
+                estado.atualizar(float(item["COTAÇÃO"]), datetime.fromisoformat(horario).timestamp())
+                linhas.append({
+                    "CLASSE": classe,
+                    "SÍMBOLO": simbolo,
+                    "HORÁRIO": horario,
+                    "INÍCIO DA BARRA": datetime.fromtimestamp(estado.barra).strftime("%Y-%m-%d %H:%M:%S"),
+                    "ABERTURA": estado.abertura,
+                    "MÁXIMA": estado.maxima,
+                    "MÍNIMA": estado.minima,
+                    "FECHAMENTO": estado.ultimo,
+                    "MÉDIA MÓVEL": estado.precos.media,
+                    "EMA": estado.ema,
+                    "VOLATILIDADE": estado.retornos.desvio,
+                    "MÍNIMA DA JANELA": estado.precos.minimo,
+                    "MÁXIMA DA JANELA": estado.precos.maximo
+                })
+            except Exception as e:
+                logger.error(f"Erro ao calcular indicadores de {item.get(coluna_simbolo)}: {e} | Error computing indicators for {item.get(coluna_simbolo)}: {e}")
+        return linhas
@@ -1,18 +1,76 @@
+import atexit
 import logging
+import multiprocessing
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from config import NIVEL_LOG
 
 # Caminho para a pasta de logs | Path to the logs folder
 caminho_logs = Path.home() / "Documents" / "BolsaValores" / "logs"
 caminho_logs.mkdir(parents=True, exist_ok=True)
 
-# Configuração do logging | Logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(caminho_logs / "app.log"),
-        logging.StreamHandler()
-    ]
-)
-
-logger = logging.getLogger(__name__)
\ No newline at end of file
+# As threads do pipeline só enfileiram o registro; arquivo e terminal são escritos por uma thread própria
+# Pipeline threads only enqueue the record; file and terminal are written by a dedicated thread
+fila_logs = queue.SimpleQueue()
+formato = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+
+# Processos filhos (spawn) reimportam este módulo; só o processo principal abre o app.log e escuta a fila
+# Child (spawn) processes re-import this module; only the main process opens app.log and listens to the queue
+processo_filho = multiprocessing.parent_process() is not None
+saidas = [] if processo_filho else [logging.FileHandler(caminho_logs / "app.log"), logging.StreamHandler()]
+for saida in saidas:
+    saida.setFormatter(formato)
+
+# Configuração do logging; o QueueHandler só resolve a mensagem, o formato fica com as saídas
+# Logging configuration; the QueueHandler only resolves the message, the format stays with the outputs
+logging.basicConfig(level=NIVEL_LOG, format="%(message)s", handlers=[QueueHandler(fila_logs)])
+if not processo_filho:
+    ouvinte_logs = QueueListener(fila_logs, *saidas, respect_handler_level=True)
+    ouvinte_logs.start()
+    # Esvazia a fila antes de sair | Drains the queue before exiting
+    atexit.register(ouvinte_logs.stop)
+
+_fila_processos = None
+_lock_processos = threading.Lock()
+
+def fila_logs_processos():
+    """
+    Retorna a fila entre processos que leva os logs dos filhos às saídas do processo principal.
+    Returns the inter-process queue that carries the children's logs to the main process's outputs.
+
+    A fila e o seu ouvinte são criados na primeira chamada; passe a fila nos args do Process e
+    chame configurar_logs_processo(fila) no início do alvo.
+    The queue and its listener are created on the first call; pass the queue in the Process args
+    and call configurar_logs_processo(fila) at the start of the target.
+
+    Returns:
+        multiprocessing.Queue: Fila compartilhada com os processos filhos.
+                               Queue shared with the child processes.
+    """
+    global _fila_processos
+    with _lock_processos:
+        if _fila_processos is None:
+            _fila_processos = multiprocessing.get_context("spawn").Queue()
+            ouvinte = QueueListener(_fila_processos, *saidas, respect_handler_level=True)
+            ouvinte.start()
+            atexit.register(ouvinte.stop)
+    return _fila_processos
+
+def configurar_logs_processo(fila):
+    """
+    Num processo filho, envia todos os logs à fila do processo principal (só um QueueHandler).
+    In a child process, sends every log to the main process's queue (a single QueueHandler).
+
+    Args:
+        fila (multiprocessing.Queue): Fila retornada por fila_logs_processos() no processo principal.
+                                      Queue returned by fila_logs_processos() in the main process.
+    """
+    raiz = logging.getLogger()
+    for manipulador in list(raiz.handlers):
+        raiz.removeHandler(manipulador)
+    raiz.addHandler(QueueHandler(fila))
+    raiz.setLevel(NIVEL_LOG)
+
+logger = logging.getLogger(__name__)
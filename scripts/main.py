@@ -1,69 +1,303 @@
-from data_collector import coletar_dados_acoes, obter_cotacoes_moedas
-from file_handler import salvar_parquet, salvar_excel_formatado, abrir_excel
-from database_manager import conectar_banco_dados, criar_tabelas, inserir_dados
-from config import ASSETS, MOEDAS
+from data_collector import coletar_ciclo
+from file_handler import EscritorDataset, compactar_dataset, salvar_excel_streaming, abrir_excel, CAMINHO_DATASET
+from database_manager import criar_tabelas, salvar_ciclo, migrar_para_serie_temporal
+from connection_pool import PoolConexoes
+from indicators import MotorIndicadores
+from cycle_batch import LoteCotacoes
+from http_client import metricas_http, diferenca_metricas
+from scheduler import Agendador
+from quote_cache import CacheCotacoes, coletar_acoes_com_cache, obter_moedas_com_cache, registros_novos
+from resilience import FilaMortos, coletar_com_fila, metricas_disjuntores
+from backfill import DESTINOS, executar_backfill
+from asset_registry import carregar_registro
+from process_pool import ColetorProcessos
+from metrics import metricas, iniciar_servidor_metricas, gravar_metricas_json, observar
+from config import (
+    MAX_WORKERS, PRAZO_CICLO, USAR_BANCO, DB_HOST, DB_USER, DB_PASSWORD, DB_NAME,
+    TEMPO_EXECUCAO, INTERVALO_COLETA, REGISTRO_ATIVOS, SHARD, PROCESSOS_COLETA, PORTA_METRICAS, ARQUIVO_METRICAS
+)
 from logger_config import logger
-import time
-from datetime import datetime, timedelta
+import argparse
+from datetime import datetime
+from functools import partial
 
-def main():
-    # Verifica se o usuário tem um banco de dados MySQL aberto | Check if the user has a MySQL database open
-    print("O MySQL já está rodando? (Sim/Não) | Is MySQL already running? (Yes/No)")
-    resposta = input().strip().lower()
-    tem_banco = resposta in ["s", "sim", "y", "yes"]
+def coletar_em_processos(processos, usar_banco=USAR_BANCO, intervalo=INTERVALO_COLETA, tempo_execucao=TEMPO_EXECUCAO,
+                         registro=REGISTRO_ATIVOS, shard=SHARD, porta_metricas=PORTA_METRICAS,
+                         arquivo_metricas=ARQUIVO_METRICAS):
+    """
+    Coleta contínua com vários processos coletores e um processo escritor (dataset, indicadores e, opcionalmente, MySQL).
+    Continuous collection with several collector processes and one writer process (dataset, indicators and, optionally, MySQL).
+
+    Args:
+        processos (int): Processos coletores.
+                         Collector processes.
+        usar_banco (bool): Grava também no MySQL; se False, só no dataset Parquet.
+                           Also writes to MySQL; if False, only to the Parquet dataset.
+        intervalo (float): Segundos entre tiques.
+                           Seconds between ticks.
+        tempo_execucao (float): Minutos de execução (0 = até ser interrompido).
+                                Minutes to run (0 = until interrupted).
+        registro (str, optional): Arquivo CSV/JSON ou "banco" com os ativos (padrão: ASSETS e MOEDAS).
+                                  CSV/JSON file or "banco" with the assets (default: ASSETS and MOEDAS).
+        shard (str): Fatia deste coletor, "índice/total".
+                     This collector's slice, "index/total".
+        porta_metricas (int): Porta do endpoint de métricas (0 = desligado).
+                              Metrics endpoint port (0 = off).
+        arquivo_metricas (str, optional): JSON Lines que recebe as métricas de cada ciclo.
+                                          JSON Lines file that receives each cycle's metrics.
+    """
+    banco = (DB_HOST, DB_USER, DB_PASSWORD, DB_NAME) if usar_banco else None
+    pool = PoolConexoes(*banco) if banco else None
+    try:
+        if pool:
+            pool.executar(criar_tabelas)
+        ativos = carregar_registro(registro, shard, pool, intervalo)
+    finally:
+        # O escritor abre as próprias conexões | The writer opens its own connections
+        if pool:
+            pool.fechar()
+
+    coletor = ColetorProcessos(processos, banco=banco)
+    # Coletores e escritor têm registros próprios; aqui ficam as filas e a gravação de cada ciclo
+    # Collectors and writer have their own registries; here go the queues and each cycle's write
+    metricas.registrar_medidor("fila", lambda: coletor.metricas()["fila_tarefas"], fila="tarefas")
+    metricas.registrar_medidor("fila", lambda: coletor.metricas()["fila_resultados"], fila="resultados")
+    metricas.registrar_medidor("espera_contrapressao_segundos", lambda: coletor.metricas()["espera_envio"])
+    servidor = iniciar_servidor_metricas(porta_metricas) if porta_metricas else None
+
+    def etapa_coleta(tique):
+        # Só distribui as tarefas; a espera pela gravação fica na persistência
+        # Only hands the tasks out; waiting for the write happens in persistence
+        try:
+            return coletor.enviar(ativos.devidos("acoes", tique), ativos.devidos("moedas", tique))
+        except RuntimeError:
+            # Um processo morreu e as filas podem estar travadas: encerra em vez de repetir o erro a cada tique
+            # A process died and the queues may be jammed: stop instead of repeating the error every tick
+            agendador.parar()
+            raise
+
+    def etapa_persistencia(ciclo):
+        # Sem confirmação no prazo o ciclo conta como atrasado e a coleta segue
+        # Without an acknowledgement in time the cycle counts as late and collection goes on
+        try:
+            resumos = coletor.aguardar(ciclo, timeout=3 * coletor.prazo)
+        except RuntimeError:
+            agendador.parar()
+            raise
+        for resumo in resumos[-1:]:
+            observar("etapa_segundos", resumo["segundos"], etapa="gravacao_processos")
+        metricas_coletor = coletor.metricas()
+        logger.info(f"Coleta em processos: {metricas_coletor} | Multi-process collection: {metricas_coletor}")
+        if arquivo_metricas:
+            gravar_metricas_json(arquivo_metricas, ciclo=ciclo)
+
+    try:
+        # Confirmar o ciclo mais recente confirma os anteriores | Acknowledging the latest cycle acknowledges the earlier ones
+        agendador = Agendador(intervalo, etapa_coleta, etapa_persistencia, tempo_execucao * 60 or None, combinar=max)
+        agendador.executar()
+    except Exception as e:
+        logger.error(f"Erro na coleta em processos: {e} | Error in multi-process collection: {e}")
+    finally:
+        coletor.fechar()
+        if servidor:
+            servidor.shutdown()
+
+def coletar(usar_banco=USAR_BANCO, intervalo=INTERVALO_COLETA, tempo_execucao=TEMPO_EXECUCAO,
+            registro=REGISTRO_ATIVOS, shard=SHARD, porta_metricas=PORTA_METRICAS, arquivo_metricas=ARQUIVO_METRICAS):
+    """
+    Coleta os dados do mercado sem interação, usando a configuração em config.py.
+    Collects market data non-interactively, using the configuration in config.py.
+
+    Args:
+        usar_banco (bool): Coleta contínua com MySQL e dataset Parquet; se False, exporta um Excel.
+                           Continuous collection with MySQL and the Parquet dataset; if False, exports an Excel file.
+        intervalo (float): Segundos entre tiques.
+                           Seconds between ticks.
+        tempo_execucao (float): Minutos de execução (0 = até ser interrompido).
+                                Minutes to run (0 = until interrupted).
+        registro (str, optional): Arquivo CSV/JSON ou "banco" com os ativos (padrão: ASSETS e MOEDAS).
+                                  CSV/JSON file or "banco" with the assets (default: ASSETS and MOEDAS).
+        shard (str): Fatia deste coletor, "índice/total".
+                     This collector's slice, "index/total".
+        porta_metricas (int): Porta do endpoint de métricas (0 = desligado).
+                              Metrics endpoint port (0 = off).
+        arquivo_metricas (str, optional): JSON Lines que recebe as métricas de cada ciclo.
+                                          JSON Lines file that receives each cycle's metrics.
+    """
+    # Cache de cotações: mercados fechados não são consultados de novo | Quote cache: closed markets are not queried again
+    cache = CacheCotacoes()
+    # Símbolos que falharam voltam nos ciclos seguintes | Failed symbols come back on the following cycles
+    fila = FilaMortos()
+
+    def coletores(ativos):
+        # A validade no cache segue o mercado de cada símbolo no registro | Cache lifetime follows each symbol's market in the registry
+        return (
+            partial(coletar_com_fila, "acoes", partial(coletar_acoes_com_cache, cache=cache, mercados=ativos.mercados("acoes")), fila),
+            partial(coletar_com_fila, "moedas", partial(obter_moedas_com_cache, cache=cache, mercados=ativos.mercados("moedas")), fila),
+        )
+
+    # Medidores lidos só na exportação | Gauges read only on export
+    metricas.registrar_medidor("fila", lambda: fila.metricas()["pendentes"], fila="mortos")
+    servidor = iniciar_servidor_metricas(porta_metricas) if porta_metricas else None
+
+    if usar_banco:
+        # Pool de conexões; o banco de dados é criado na primeira conexão se não existir
+        # Connection pool; the database is created on the first connection if it does not exist
+        pool = PoolConexoes(DB_HOST, DB_USER, DB_PASSWORD, DB_NAME)
+        escritor = EscritorDataset()
+        motor = MotorIndicadores()
+        metricas.registrar_medidor("fila", lambda: agendador.metricas()["pendente"], fila="persistencia")
+        metricas.registrar_medidor("conexoes_banco", lambda: pool.metricas()["livres"], estado="livres")
+        metricas.registrar_medidor("conexoes_banco", lambda: pool.metricas()["abertas"], estado="abertas")
+        ciclos = 0
 
-    if tem_banco:
-        DB_HOST = "localhost"
-        DB_USER = input("Usuário do banco (padrão: root): | Database user (default: root): ") or "root"
-        DB_PASSWORD = input("Senha do banco: | Database password: ") or ""
-        DB_NAME = "CoinAI"
+        def etapa_coleta(tique):
+            # Captura os dados do mercado | Fetch market data
+            metricas_antes = metricas_http()
+            # Só os símbolos desta fatia que vencem neste tique | Only this slice's symbols due on this tick
+            dados = coletar_ciclo(
+                ativos.devidos("acoes", tique), ativos.devidos("moedas", tique), MAX_WORKERS, PRAZO_CICLO,
+                coletar_acoes, coletar_moedas
+            )
+            metricas_ciclo = diferenca_metricas(metricas_antes, metricas_http())
+            logger.info(f"HTTP no ciclo: {metricas_ciclo} | HTTP in cycle: {metricas_ciclo}")
+            metricas_cache = cache.metricas()
+            logger.info(f"Cache de cotações: {metricas_cache} | Quote cache: {metricas_cache}")
+            metricas_falhas = {"disjuntores": metricas_disjuntores(), "fila_mortos": fila.metricas()}
+            logger.info(f"Resiliência: {metricas_falhas} | Resilience: {metricas_falhas}")
+            return dados
+
+        def etapa_persistencia(dados):
+            # Linhas do cache já foram gravadas quando chegaram | Cached rows were written when they arrived
+            dados_acoes, dados_moedas = (registros_novos(registros) for registros in dados)
+            # Um lote colunar por classe, compartilhado pelo dataset e pelo banco
+            # One columnar batch per class, shared by the dataset and the database
+            lote_acoes = LoteCotacoes.de_registros("acoes", dados_acoes)
+            lote_moedas = LoteCotacoes.de_registros("moedas", dados_moedas)
+
+            # Acumula os dados no dataset Parquet particionado | Buffer data into the partitioned Parquet dataset
+            escritor.adicionar("acoes", lote_acoes)
+            escritor.adicionar("moedas", lote_moedas)
+            escritor.adicionar("indicadores", motor.atualizar("acoes", dados_acoes) + motor.atualizar("moedas", dados_moedas))
+
+            # Insere os dados no banco de dados | Insert data into the database
+            salvar_ciclo(pool, lote_acoes, lote_moedas)
+            metricas_pool = pool.metricas()
+            logger.info(f"Pool do banco: {metricas_pool} | Database pool: {metricas_pool}")
+
+            nonlocal ciclos
+            ciclos += 1
+            if arquivo_metricas:
+                gravar_metricas_json(arquivo_metricas, ciclo=ciclos)
 
         try:
-            # Conectar ao MySQL e garantir que o banco de dados existe | Connect to MySQL and ensure the database exists
-            conn, cursor = conectar_banco_dados(DB_HOST, DB_USER, DB_PASSWORD, DB_NAME)
-            criar_tabelas(cursor)
-
-            # Pergunta o tempo de execução e intervalo de coleta | Ask for execution time and collection interval
-            tempo_execucao = int(input("Tempo de execução (minutos): | Execution time (minutes): "))
-            intervalo = int(input("Intervalo entre coletas (segundos): | Interval between collections (seconds): "))
-            tempo_final = datetime.now() + timedelta(minutes=tempo_execucao)
-
-            while datetime.now() < tempo_final:
-                # Captura os dados do mercado | Fetch market data
-                dados_acoes = coletar_dados_acoes(ASSETS)
-                dados_moedas = obter_cotacoes_moedas(MOEDAS)
-
-                # Salva os dados em arquivos Parquet | Save data in Parquet files
-                nome_arquivo_acoes = f"dados_acoes_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.parquet"
-                nome_arquivo_moedas = f"dados_moedas_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.parquet"
-                salvar_parquet(dados_acoes, nome_arquivo_acoes)
-                salvar_parquet(dados_moedas, nome_arquivo_moedas)
-
-                # Insere os dados no banco de dados | Insert data into the database
-                inserir_dados(cursor, "acoes", dados_acoes)
-                inserir_dados(cursor, "moedas", dados_moedas)
-                conn.commit()
-
-                logger.info(f"Próxima coleta em {intervalo} segundos. | Next collection in {intervalo} seconds.")
-                time.sleep(intervalo)
-
-            # Fecha a conexão com o banco de dados | Close the database connection
-            cursor.close()
-            conn.close()
+            pool.executar(criar_tabelas)
+            ativos = carregar_registro(registro, shard, pool, intervalo)
+            coletar_acoes, coletar_moedas = coletores(ativos)
+            agendador = Agendador(intervalo, etapa_coleta, etapa_persistencia, tempo_execucao * 60 or None)
+            agendador.executar()
         except Exception as e:
             logger.error(f"Erro ao interagir com o banco de dados: {e} | Error interacting with the database: {e}")
+        finally:
+            # Grava os dados pendentes e fecha as conexões | Flush pending data and close the connections
+            escritor.fechar()
+            pool.fechar()
+            cache.fechar()
+            fila.fechar()
+            if servidor:
+                servidor.shutdown()
     else:
         # Caso não tenha banco, apenas salva os dados em Excel | If no database, save data in Excel only
-        dados_acoes = coletar_dados_acoes(ASSETS)
-        dados_moedas = obter_cotacoes_moedas(MOEDAS)
+        ativos = carregar_registro(registro, shard, intervalo_base=intervalo)
+        coletar_acoes, coletar_moedas = coletores(ativos)
+        dados_acoes, dados_moedas = coletar_ciclo(
+            ativos.simbolos("acoes"), ativos.simbolos("moedas"), MAX_WORKERS, PRAZO_CICLO, coletar_acoes, coletar_moedas
+        )
+        cache.fechar()
+        fila.fechar()
 
         # Gera um arquivo Excel com os dados | Generate an Excel file with the data
         nome_arquivo = f"dados_bolsa_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.xlsx"
-        caminho_excel = salvar_excel_formatado(dados_acoes, dados_moedas, nome_arquivo)
+        caminho_excel = salvar_excel_streaming(
+            LoteCotacoes.de_registros("acoes", dados_acoes), LoteCotacoes.de_registros("moedas", dados_moedas), nome_arquivo
+        )
+
+        if arquivo_metricas:
+            gravar_metricas_json(arquivo_metricas, ciclo=1)
+        if servidor:
+            servidor.shutdown()
 
         if caminho_excel:
             # Abre o arquivo Excel gerado | Open the generated Excel file
             abrir_excel(caminho_excel)
 
+def main():
+    parser = argparse.ArgumentParser(description="Coletor de ações e moedas | Stock and currency collector")
+    subparsers = parser.add_subparsers(dest="comando")
+    coleta = subparsers.add_parser("coletar", help="Coleta dados do mercado (padrão) | Collects market data (default)")
+    coleta.add_argument("--sem-banco", action="store_true", help="Não usa o MySQL; com threads, exporta um Excel | Does not use MySQL; with threads, exports an Excel file")
+    coleta.add_argument("--intervalo", type=float, default=INTERVALO_COLETA, help="Segundos entre tiques | Seconds between ticks")
+    coleta.add_argument("--tempo-execucao", type=float, default=TEMPO_EXECUCAO, help="Minutos (0 = sem limite) | Minutes (0 = no limit)")
+    coleta.add_argument("--registro", default=REGISTRO_ATIVOS, help="Arquivo CSV/JSON ou \"banco\" | CSV/JSON file or \"banco\"")
+    coleta.add_argument("--shard", default=SHARD, help="Fatia deste coletor, índice/total | This collector's slice, index/total")
+    coleta.add_argument("--porta-metricas", type=int, default=PORTA_METRICAS, help="Endpoint HTTP local das métricas (0 = desligado) | Local HTTP metrics endpoint (0 = off)")
+    coleta.add_argument("--metricas-json", default=ARQUIVO_METRICAS, help="JSON Lines com as métricas de cada ciclo | JSON Lines with each cycle's metrics")
+    coleta.add_argument("--processos", type=int, default=PROCESSOS_COLETA, help="Processos coletores (0 = threads) | Collector processes (0 = threads)")
+    compactar = subparsers.add_parser("compactar", help="Junta os arquivos pequenos do dataset Parquet | Merges the Parquet dataset's small files")
+    compactar.add_argument("--raiz", default=str(CAMINHO_DATASET))
+
+    subparsers.add_parser("migrar", help="Migra as tabelas antigas para o esquema de série temporal | Migrates the old tables to the time-series schema")
+
+    backfill = subparsers.add_parser("backfill", help="Preenche o histórico diário das ações | Fills the stocks' daily history")
+    backfill.add_argument("--inicio", required=True, help="Primeiro dia, AAAA-MM-DD | First day, YYYY-MM-DD")
+    backfill.add_argument("--fim", default=datetime.now().date().isoformat(), help="Último dia (exclusive) | Last day (exclusive)")
+    backfill.add_argument("--destino", choices=list(DESTINOS), default="dataset")
+    backfill.add_argument("--workers", type=int, default=MAX_WORKERS)
+    backfill.add_argument("--raiz", default=str(CAMINHO_DATASET))
+    backfill.add_argument("--registro", default=REGISTRO_ATIVOS, help="Arquivo CSV/JSON ou \"banco\" | CSV/JSON file or \"banco\"")
+    backfill.add_argument("--shard", default=SHARD, help="Fatia deste processo, índice/total | This process's slice, index/total")
+    backfill.add_argument("--compactar", action="store_true", help="Compacta o dataset ao final | Compacts the dataset at the end")
+
+    args = parser.parse_args()
+    if args.comando == "compactar":
+        resumo = compactar_dataset(args.raiz)
+        logger.info(f"Compactação concluída: {resumo} | Compaction finished: {resumo}")
+    elif args.comando == "migrar":
+        pool = PoolConexoes(DB_HOST, DB_USER, DB_PASSWORD, DB_NAME)
+        try:
+            pool.executar(migrar_para_serie_temporal)
+            # Cria as tabelas que ainda não existiam | Creates the tables that did not exist yet
+            pool.executar(lambda cursor: criar_tabelas(cursor, "serie_temporal"))
+        finally:
+            pool.fechar()
+    elif args.comando == "backfill":
+        usar_pool = DESTINOS[args.destino][1] or args.registro == "banco"
+        pool = PoolConexoes(DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, local_infile=True) if usar_pool else None
+        try:
+            if pool:
+                pool.executar(criar_tabelas)
+            ativos = carregar_registro(args.registro, args.shard, pool).simbolos("acoes")
+            resumo = executar_backfill(ativos, args.inicio, args.fim, args.destino, args.raiz, pool, max_workers=args.workers)
+            logger.info(f"Backfill concluído: {resumo} | Backfill finished: {resumo}")
+            if args.compactar and DESTINOS[args.destino][0]:
+                compactar_dataset(args.raiz)
+        finally:
+            if pool:
+                pool.fechar()
+    else:
+        # Sem subcomando vale a configuração padrão de "coletar" | With no subcommand, "coletar"'s defaults apply
+        opcoes = args if args.comando == "coletar" else coleta.parse_args([])
+        usar_banco = USAR_BANCO and not opcoes.sem_banco
+        if opcoes.processos > 0:
+            coletar_em_processos(
+                opcoes.processos, usar_banco, opcoes.intervalo, opcoes.tempo_execucao, opcoes.registro, opcoes.shard,
+                opcoes.porta_metricas, opcoes.metricas_json
+            )
+        else:
+            coletar(
+                usar_banco, opcoes.intervalo, opcoes.tempo_execucao, opcoes.registro, opcoes.shard,
+                opcoes.porta_metricas, opcoes.metricas_json
+            )
+
 if __name__ == "__main__":
     main()
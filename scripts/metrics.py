@@ -0,0 +1,299 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import LIMITES_HISTOGRAMA, PREFIXO_METRICAS
+from logger_config import logger
+
+
+class Histograma:
+    """
+    Histograma de latências com faixas fixas (acumuladas no formato do Prometheus), seguro entre threads.
+    Latency histogram with fixed buckets (cumulative in the Prometheus format), thread-safe.
+
+    Args:
+        limites (tuple): Limites superiores das faixas, em segundos, em ordem crescente.
+                         Bucket upper bounds, in seconds, in ascending order.
+    """
+
+    __slots__ = ("limites", "contagens", "soma", "quantidade", "_lock")
+
+    def __init__(self, limites=LIMITES_HISTOGRAMA):
+        self.limites = tuple(limites)
+        # Uma contagem por faixa, mais a faixa +Inf | One count per bucket, plus the +Inf bucket
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.soma = 0.0
+        self.quantidade = 0
+        self._lock = threading.Lock()
+
+    def observar(self, valor):
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            self.contagens[indice] += 1
+            self.soma += valor
+            self.quantidade += 1
+
+    def quantil(self, q):
+        """
+        Estima um quantil interpolando dentro da faixa, como o histogram_quantile do Prometheus.
+        Estimates a quantile by interpolating inside the bucket, like Prometheus's histogram_quantile.
+        """
+        with self._lock:
+            contagens, quantidade = list(self.contagens), self.quantidade
+        if quantidade == 0:
+            return 0.0
+        alvo = q * quantidade
+        acumulado = 0
+        for indice, contagem in enumerate(contagens):
+            if acumulado + contagem >= alvo and contagem:
+                if indice == len(self.limites):
+                    # Acima da última faixa só se sabe o limite inferior | Above the last bucket only the lower bound is known
+                    return self.limites[-1]
+                inferior = self.limites[indice - 1] if indice else 0.0
+                return inferior + (self.limites[indice] - inferior) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return self.limites[-1]
+
+    def resumo(self):
+        return {
+            "quantidade": self.quantidade,
+            "soma": self.soma,
+            "p50": self.quantil(0.5),
+            "p99": self.quantil(0.99),
+        }
+
+def _rotulos(rotulos):
+    return tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _formatar_rotulos(rotulos, **extras):
+    pares = list(rotulos) + list(extras.items())
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in pares) + "}"
+
+class RegistroMetricas:
+    """
+    Contadores, histogramas e medidores do processo, identificados por nome e rótulos.
+    The process's counters, histograms and gauges, identified by name and labels.
+
+    Os medidores são funções lidas na hora da exportação (ex.: profundidade de uma fila), de modo
+    que o caminho quente não paga nada por eles.
+    Gauges are functions read at export time (e.g. a queue depth), so the hot path pays nothing
+    for them.
+    """
+
+    def __init__(self, prefixo=PREFIXO_METRICAS):
+        self.prefixo = prefixo
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._histogramas = {}
+        self._medidores = {}
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = (nome, _rotulos(rotulos))
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def observar(self, nome, valor, **rotulos):
+        chave = (nome, _rotulos(rotulos))
+        histograma = self._histogramas.get(chave)
+        if histograma is None:
+            with self._lock:
+                histograma = self._histogramas.setdefault(chave, Histograma())
+        histograma.observar(valor)
+
+    @contextmanager
+    def cronometrar(self, nome, **rotulos):
+        """
+        Mede a duração do bloco e a registra no histograma, mesmo se o bloco falhar.
+        Times the block and records it in the histogram, even if the block fails.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio, **rotulos)
+
+    def registrar_medidor(self, nome, funcao, **rotulos):
+        """
+        Registra (ou substitui) um medidor calculado por funcao() a cada leitura.
+        Registers (or replaces) a gauge computed by funcao() on every read.
+        """
+        with self._lock:
+            self._medidores[(nome, _rotulos(rotulos))] = funcao
+
+    def remover_medidor(self, nome, **rotulos):
+        with self._lock:
+            self._medidores.pop((nome, _rotulos(rotulos)), None)
+
+    def _ler_medidores(self):
+        with self._lock:
+            medidores = list(self._medidores.items())
+        valores = []
+        for chave, funcao in medidores:
+            try:
+                valor = funcao()
+            except Exception as e:
+                logger.debug(f"Medidor {chave[0]} indisponível: {e} | Gauge {chave[0]} unavailable: {e}")
+                continue
+            if valor is not None:
+                valores.append((chave, float(valor)))
+        return valores
+
+    def instantaneo(self):
+        """
+        Retorna todas as métricas como dicionário serializável em JSON.
+        Returns every metric as a JSON-serializable dictionary.
+        """
+        with self._lock:
+            contadores = dict(self._contadores)
+            histogramas = dict(self._histogramas)
+
+        def nome_completo(nome, rotulos):
+            return nome + _formatar_rotulos(rotulos)
+
+        return {
+            "contadores": {nome_completo(*chave): valor for chave, valor in sorted(contadores.items())},
+            "histogramas": {nome_completo(*chave): h.resumo() for chave, h in sorted(histogramas.items())},
+            "medidores": {nome_completo(*chave): valor for chave, valor in sorted(self._ler_medidores())},
+        }
+
+    def texto_prometheus(self):
+        """
+        Exporta as métricas no formato de texto do Prometheus (versão 0.0.4).
+        Exports the metrics in the Prometheus text format (version 0.0.4).
+        """
+        with self._lock:
+            contadores = sorted(self._contadores.items())
+            histogramas = sorted(self._histogramas.items())
+        linhas = []
+        tipos = set()
+
+        def cabecalho(nome, tipo):
+            if nome not in tipos:
+                tipos.add(nome)
+                linhas.append(f"# TYPE {nome} {tipo}")
+
+        for (nome, rotulos), valor in contadores:
+            nome = f"{self.prefixo}_{nome}"
+            cabecalho(nome, "counter")
+            linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {valor}")
+        for (nome, rotulos), valor in sorted(self._ler_medidores()):
+            nome = f"{self.prefixo}_{nome}"
+            cabecalho(nome, "gauge")
+            linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {valor}")
+        for (nome, rotulos), histograma in histogramas:
+            nome = f"{self.prefixo}_{nome}"
+            cabecalho(nome, "histogram")
+            with histograma._lock:
+                contagens, soma, quantidade = list(histograma.contagens), histograma.soma, histograma.quantidade
+            acumulado = 0
+            for limite, contagem in zip(histograma.limites + ("+Inf",), contagens):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos, le=limite)} {acumulado}")
+            linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {soma}")
+            linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {quantidade}")
+        return "\n".join(linhas) + "\n"
+
+    def limpar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+            self._medidores.clear()
+
+# Registro compartilhado pelo processo | Process-wide shared registry
+metricas = RegistroMetricas()
+
+def medir_etapa(etapa, **rotulos):
+    """
+    Cronometra uma etapa do pipeline (fetch, parse, parquet, banco, excel) no histograma de etapas.
+    Times a pipeline stage (fetch, parse, parquet, banco, excel) in the stages histogram.
+
+    Args:
+        etapa (str): Nome da etapa.
+                     Stage name.
+        **rotulos: Rótulos extras, como a fonte ou a tabela.
+                   Extra labels, such as the source or the table.
+    """
+    return metricas.cronometrar("etapa_segundos", etapa=etapa, **rotulos)
+
+def contar(nome, valor=1, **rotulos):
+    """
+    Soma valor ao contador nome com os rótulos informados.
+    Adds valor to the nome counter with the given labels.
+    """
+    metricas.incrementar(nome, valor, **rotulos)
+
+def observar(nome, valor, **rotulos):
+    """
+    Registra valor (em segundos) no histograma nome com os rótulos informados.
+    Records valor (in seconds) in the nome histogram with the given labels.
+    """
+    metricas.observar(nome, valor, **rotulos)
+
+class _ManipuladorMetricas(BaseHTTPRequestHandler):
+    registro = metricas
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            corpo, tipo = self.registro.texto_prometheus().encode(), "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path.split("?")[0] == "/metrics.json":
+            corpo, tipo = json.dumps(self.registro.instantaneo()).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        logger.debug(f"Métricas: {formato % args} | Metrics: {formato % args}")
+
+def iniciar_servidor_metricas(porta, host="127.0.0.1", registro=metricas):
+    """
+    Serve as métricas em /metrics (texto do Prometheus) e /metrics.json, numa thread em segundo plano.
+    Serves the metrics at /metrics (Prometheus text) and /metrics.json, on a background thread.
+
+    Args:
+        porta (int): Porta local (0 = escolhida pelo sistema).
+                     Local port (0 = chosen by the system).
+        host (str): Endereço de escuta (padrão: só a máquina local).
+                    Listen address (default: local machine only).
+        registro (RegistroMetricas): Registro exportado.
+                                     Exported registry.
+
+    Returns:
+        ThreadingHTTPServer: Servidor em execução; encerre com shutdown().
+                             Running server; stop it with shutdown().
+    """
+    manipulador = type("ManipuladorMetricas", (_ManipuladorMetricas,), {"registro": registro})
+    servidor = ThreadingHTTPServer((host, porta), manipulador)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    logger.info(f"Métricas em http://{host}:{servidor.server_address[1]}/metrics | Metrics at http://{host}:{servidor.server_address[1]}/metrics")
+    return servidor
+
+def gravar_metricas_json(caminho, registro=metricas, **extras):
+    """
+    Acrescenta uma linha JSON com o instantâneo das métricas ao arquivo (um registro por ciclo).
+    Appends one JSON line with the metrics snapshot to the file (one record per cycle).
+
+    Args:
+        caminho (str): Arquivo JSON Lines de saída.
+                       Output JSON Lines file.
+        registro (RegistroMetricas): Registro gravado.
+                                     Registry written.
+        **extras: Campos adicionais da linha, como o número do ciclo.
+                  Extra fields of the line, such as the cycle number.
+    """
+    linha = {"horario": datetime.now().isoformat(timespec="seconds"), **extras, **registro.instantaneo()}
+    with open(caminho, "a", encoding="utf-8") as arquivo:
+        arquivo.write(json.dumps(linha, default=str) + "\n")
@@ -0,0 +1,410 @@
+import multiprocessing
+import queue
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from concurrency import calcular_limite, configurar_limites
+from config import (
+    TAMANHO_LOTE_ACOES, TAMANHO_LOTE_MOEDAS, URL_AWESOMEAPI, PRAZO_CICLO, CAPACIDADE_FILA_PROCESSOS, LIMITES_TAXA
+)
+from connection_pool import PoolConexoes
+from cycle_batch import LoteCotacoes, ler_ipc
+from data_collector import baixar_yfinance, baixar_variacoes, horarios_mercado, obter_cotacoes_moedas_lote
+from database_manager import criar_tabelas, inserir_dados
+from file_handler import CAMINHO_DATASET, EscritorDataset
+from indicators import MotorIndicadores
+from logger_config import configurar_logs_processo, fila_logs_processos, logger
+
+# Segundos entre verificações dos processos enquanto uma fila está bloqueada
+# Seconds between process checks while a queue is blocked
+INTERVALO_VERIFICACAO = 1.0
+
+
+def _coletar_tarefa(classe, itens, baixar, url_base, limite):
+    """
+    Coleta um lote de uma classe e o devolve como LoteCotacoes.
+    Collects one batch of a class and returns it as a LoteCotacoes.
+    """
+    if classe == "moedas":
+        return LoteCotacoes.de_registros("moedas", obter_cotacoes_moedas_lote(itens, url_base=url_base, limite=limite))
+    lote = list(itens)
+    variacoes = baixar_variacoes(lote, baixar, limite=limite)
+    presentes = variacoes.reindex([simbolo for simbolo in lote if simbolo in variacoes.index])
+    if len(presentes) < len(lote):
+        logger.warning(f"{len(lote) - len(presentes)} ações sem dados no lote {lote[0]}..{lote[-1]} | "
+                       f"{len(lote) - len(presentes)} stocks without data in batch {lote[0]}..{lote[-1]}")
+    # Mesmo horário de mercado da coleta em threads | Same market timestamp as the threaded collection
+    horarios = pd.to_datetime(horarios_mercado(presentes["pregao"])).to_numpy(dtype="datetime64[s]").astype(np.int64)
+    return LoteCotacoes.de_colunas(
+        "acoes", presentes.index, presentes["atual"], presentes["variacao"], horarios, itens
+    )
+
+def _trabalhador(tarefas, resultados, baixar, url_base, prazo, limites, processos, fila_logs):
+    """
+    Laço de um processo coletor: lê tarefas até receber None e envia cada lote como stream IPC do Arrow.
+    Collector process loop: reads tasks until it gets None and sends each batch as an Arrow IPC stream.
+
+    Um lote que falhar é enviado como None, para que o escritor saiba que o ciclo terminou.
+    A failed batch is sent as None, so the writer knows the cycle is over.
+    """
+    configurar_logs_processo(fila_logs)
+    # Cada processo tem seus limitadores; juntos, os coletores respeitam a cota de cada host
+    # Each process has its own limiters; together, the collectors honour each host's quota
+    configurar_limites(limites, processos)
+    while True:
+        tarefa = tarefas.get()
+        if tarefa is None:
+            return
+        ciclo, classe, itens = tarefa
+        buffer = None
+        try:
+            buffer = _coletar_tarefa(classe, itens, baixar, url_base, calcular_limite(prazo)).para_ipc()
+        except Exception as e:
+            logger.error(f"Erro no lote de {classe} do ciclo {ciclo}: {e} | Error in the {classe} batch of cycle {ciclo}: {e}")
+        resultados.put(("lote", ciclo, classe, buffer))
+
+def _gravar_ciclo(ciclo, tabelas, escritor, motor, pool):
+    """
+    Grava as tabelas de um ciclo no dataset (e indicadores) e no banco, uma classe por vez.
+    Writes a cycle's tables to the dataset (and indicators) and the database, one class at a time.
+    """
+    inicio = time.perf_counter()
+    por_classe = {classe: pa.concat_tables(partes) for classe, partes in tabelas.items()}
+    for classe, tabela in por_classe.items():
+        escritor.adicionar(classe, tabela)
+        if motor is not None:
+            escritor.adicionar("indicadores", motor.atualizar(classe, tabela.to_pylist()))
+    if pool is not None and por_classe:
+        def inserir(cursor):
+            for classe, tabela in por_classe.items():
+                inserir_dados(cursor, classe, tabela)
+
+        pool.executar(inserir)
+    return {
+        "ciclo": ciclo,
+        "linhas": sum(tabela.num_rows for tabela in por_classe.values()),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+def _escritor(resultados, status, raiz, banco, indicadores, fila_logs):
+    """
+    Processo escritor único: junta os lotes de cada ciclo, grava o ciclo completo e confirma em status.
+    Single writer process: gathers each cycle's batches, writes the complete cycle and acknowledges on status.
+
+    Ao receber None, grava também os ciclos ainda incompletos (ex.: o coordenador encerrou porque
+    um coletor morreu), para não descartar os lotes que já chegaram.
+    On receiving None, it also writes the still incomplete cycles (e.g. the coordinator shut down
+    because a collector died), so the batches that already arrived are not discarded.
+    """
+    configurar_logs_processo(fila_logs)
+    escritor = EscritorDataset(raiz)
+    motor = MotorIndicadores() if indicadores else None
+    pool = PoolConexoes(*banco) if banco else None
+    esperados, recebidos, tabelas = {}, {}, {}
+    try:
+        if pool is not None:
+            pool.executar(criar_tabelas)
+        while True:
+            item = resultados.get()
+            if item is None:
+                prontos = sorted(tabelas)
+            elif item[0] == "fim":
+                _, ciclo, total = item
+                esperados[ciclo] = total
+                prontos = [ciclo] if recebidos.get(ciclo, 0) == total else []
+            else:
+                _, ciclo, classe, buffer = item
+                recebidos[ciclo] = recebidos.get(ciclo, 0) + 1
+                if buffer is not None:
+                    tabelas.setdefault(ciclo, {}).setdefault(classe, []).append(ler_ipc(buffer))
+                prontos = [ciclo] if recebidos[ciclo] == esperados.get(ciclo) else []
+            for ciclo in prontos:
+                completo = recebidos.pop(ciclo, 0) == esperados.pop(ciclo, None)
+                try:
+                    resumo = _gravar_ciclo(ciclo, tabelas.pop(ciclo, {}), escritor, motor, pool)
+                except Exception as e:
+                    logger.error(f"Erro ao gravar o ciclo {ciclo}: {e} | Error writing cycle {ciclo}: {e}")
+                    resumo = {"ciclo": ciclo, "linhas": 0, "segundos": 0.0, "erro": str(e)}
+                if not completo:
+                    resumo["incompleto"] = True
+                status.put(resumo)
+            if item is None:
+                return
+    finally:
+        escritor.fechar()
+        if pool is not None:
+            pool.fechar()
+
+def _profundidade(fila):
+    try:
+        return fila.qsize()
+    except NotImplementedError:
+        # macOS não implementa qsize em multiprocessing.Queue | macOS does not implement qsize on multiprocessing.Queue
+        return None
+
+class ColetorProcessos:
+    """
+    Coleta em vários processos: o coordenador distribui lotes de símbolos por uma fila local, os
+    processos coletores devolvem cada lote como stream IPC do Arrow a um único processo escritor.
+    Multi-process collection: the coordinator hands symbol batches out through a local queue, the
+    collector processes return each batch as an Arrow IPC stream to a single writer process.
+
+    As duas filas são limitadas (capacidade): se o escritor atrasar, os coletores bloqueiam ao
+    entregar; se os coletores atrasarem, enviar() bloqueia o coordenador. O tempo bloqueado entra
+    nas métricas como espera por contrapressão. O cache de cotações e a fila de mortos continuam
+    exclusivos da coleta no processo principal.
+    Both queues are bounded (capacidade): if the writer falls behind, the collectors block when
+    handing off; if the collectors fall behind, enviar() blocks the coordinator. The time spent
+    blocked shows in the metrics as backpressure wait. The quote cache and the dead-letter queue
+    remain exclusive to in-process collection.
+
+    Args:
+        processos (int): Processos coletores.
+                         Collector processes.
+        baixar (function): Transporte compatível com baixar_yfinance (precisa ser serializável).
+                           Transport compatible with baixar_yfinance (must be picklable).
+        raiz (Path): Diretório raiz do dataset.
+                     Dataset root directory.
+        banco (tuple, optional): (host, user, password, database) para o escritor gravar no MySQL.
+                                 (host, user, password, database) for the writer to write to MySQL.
+        url_base (str): URL base da AwesomeAPI.
+                        AwesomeAPI base URL.
+        tamanho_lote (int): Ações por tarefa.
+                            Stocks per task.
+        tamanho_lote_moedas (int): Moedas por tarefa.
+                                   Currencies per task.
+        capacidade (int): Itens máximos em cada fila.
+                          Maximum items in each queue.
+        indicadores (bool): Calcular os indicadores no escritor.
+                            Compute the indicators in the writer.
+        prazo (float): Prazo de cada tarefa em segundos.
+                       Deadline of each task in seconds.
+        limites (dict): Limites por host somados entre todos os coletores (padrão: LIMITES_TAXA).
+                        Per-host limits summed across all collectors (default: LIMITES_TAXA).
+    """
+
+    def __init__(self, processos, baixar=baixar_yfinance, raiz=CAMINHO_DATASET, banco=None, url_base=URL_AWESOMEAPI,
+                 tamanho_lote=TAMANHO_LOTE_ACOES, tamanho_lote_moedas=TAMANHO_LOTE_MOEDAS,
+                 capacidade=CAPACIDADE_FILA_PROCESSOS, indicadores=True, prazo=PRAZO_CICLO, limites=LIMITES_TAXA):
+        contexto = multiprocessing.get_context("spawn")
+        self.tamanho_lote = tamanho_lote
+        self.tamanho_lote_moedas = tamanho_lote_moedas
+        self.prazo = prazo
+        self._tarefas = contexto.Queue(maxsize=capacidade)
+        self._resultados = contexto.Queue(maxsize=capacidade)
+        self._status = contexto.Queue()
+        fila_logs = fila_logs_processos()
+        self._trabalhadores = [
+            contexto.Process(
+                target=_trabalhador,
+                args=(self._tarefas, self._resultados, baixar, url_base, prazo, limites, processos, fila_logs),
+                name=f"coletor-{indice}", daemon=True
+            )
+            for indice in range(processos)
+        ]
+        self._escritor = contexto.Process(
+            target=_escritor, args=(self._resultados, self._status, raiz, banco, indicadores, fila_logs), name="escritor", daemon=True
+        )
+        for processo in self._trabalhadores + [self._escritor]:
+            processo.start()
+        self._lock = threading.Lock()
+        self._encerrando = False
+        self._ciclo = 0
+        self._aguardado = 0
+        # Só os resumos ainda não devolvidos por aguardar(); os totais ficam em _metricas
+        # Only the summaries not yet returned by aguardar(); the totals live in _metricas
+        self._gravados = {}
+        self._metricas = {
+            "ciclos": 0, "tarefas": 0, "espera_envio": 0.0, "espera_envio_max": 0.0, "ciclos_atrasados": 0,
+            "ciclos_gravados": 0, "linhas_gravadas": 0
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def verificar_processos(self):
+        """
+        Confere se coletores e escritor continuam vivos.
+        Checks that the collectors and the writer are still alive.
+
+        Um processo morto (ex.: falta de memória) não é reiniciado: ele pode ter morrido segurando
+        o lock de uma das filas, que ficaria travada para os substitutos. O coordenador deve
+        encerrar com fechar(), que grava o que o escritor já recebeu.
+        A dead process (e.g. out of memory) is not restarted: it may have died holding the lock of
+        one of the queues, which would stay stuck for the replacements. The coordinator must shut
+        down with fechar(), which writes what the writer already received.
+
+        Raises:
+            RuntimeError: Se algum processo tiver encerrado fora de fechar().
+                          If any process exited outside fechar().
+        """
+        if self._encerrando:
+            return
+        for processo in self._trabalhadores + [self._escritor]:
+            if not processo.is_alive():
+                raise RuntimeError(f"processo {processo.name} encerrou (código {processo.exitcode}) | "
+                                   f"process {processo.name} exited (code {processo.exitcode})")
+
+    def _colocar(self, fila, item):
+        inicio = time.perf_counter()
+        while True:
+            try:
+                fila.put(item, timeout=INTERVALO_VERIFICACAO)
+                break
+            except queue.Full:
+                # Fila cheia pode ser só contrapressão, ou um consumidor morto | A full queue may be just backpressure, or a dead consumer
+                self.verificar_processos()
+        espera = time.perf_counter() - inicio
+        with self._lock:
+            self._metricas["espera_envio"] += espera
+            self._metricas["espera_envio_max"] = max(self._metricas["espera_envio_max"], espera)
+
+    def enviar(self, assets, moedas):
+        """
+        Divide um ciclo em tarefas e as coloca na fila; bloqueia enquanto a fila estiver cheia.
+        Splits a cycle into tasks and queues them; blocks while the queue is full.
+
+        Args:
+            assets (dict): Ações do ciclo (símbolo -> empresa).
+                           The cycle's stocks (symbol -> company).
+            moedas (dict): Moedas do ciclo (código -> nome).
+                           The cycle's currencies (code -> name).
+
+        Returns:
+            int: Número do ciclo, para aguardar().
+                 Cycle number, for aguardar().
+        """
+        with self._lock:
+            self._ciclo += 1
+            ciclo = self._ciclo
+        tarefas = []
+        for classe, itens, tamanho in (("acoes", assets, self.tamanho_lote), ("moedas", moedas, self.tamanho_lote_moedas)):
+            simbolos = list(itens)
+            for inicio in range(0, len(simbolos), tamanho):
+                tarefas.append((ciclo, classe, {simbolo: itens[simbolo] for simbolo in simbolos[inicio:inicio + tamanho]}))
+        for tarefa in tarefas:
+            self._colocar(self._tarefas, tarefa)
+        # O escritor só grava o ciclo depois de receber todos os lotes anunciados aqui
+        # The writer only writes the cycle after receiving every batch announced here
+        self._colocar(self._resultados, ("fim", ciclo, len(tarefas)))
+        with self._lock:
+            self._metricas["ciclos"] += 1
+            self._metricas["tarefas"] += len(tarefas)
+        return ciclo
+
+    def aguardar(self, ciclo=None, timeout=None):
+        """
+        Espera o escritor confirmar os ciclos ainda não aguardados até o informado.
+        Waits for the writer to acknowledge the not yet awaited cycles up to the given one.
+
+        Enquanto espera, confere a cada INTERVALO_VERIFICACAO segundos se os processos estão vivos.
+        Ciclos sem confirmação no prazo contam como atrasados e não são aguardados de novo.
+        While waiting, it checks every INTERVALO_VERIFICACAO seconds that the processes are alive.
+        Cycles not acknowledged in time count as late and are not awaited again.
+
+        Args:
+            ciclo (int, optional): Último ciclo esperado (padrão: o último enviado).
+                                   Last expected cycle (default: the last one sent).
+            timeout (float, optional): Segundos máximos de espera (padrão: sem limite).
+                                       Maximum seconds to wait (default: no limit).
+
+        Returns:
+            list: Resumos dos ciclos confirmados (ciclo, linhas, segundos).
+                  Summaries of the acknowledged cycles (ciclo, linhas, segundos).
+
+        Raises:
+            TimeoutError: Se o tempo acabar antes da confirmação.
+                          If time runs out before the acknowledgement.
+            RuntimeError: Se um coletor ou o escritor tiver morrido (ver verificar_processos).
+                          If a collector or the writer died (see verificar_processos).
+        """
+        ciclo = self._ciclo if ciclo is None else ciclo
+        limite = calcular_limite(timeout)
+        numeros = range(self._aguardado + 1, ciclo + 1)
+        self._aguardado = max(self._aguardado, ciclo)
+        while any(numero not in self._gravados for numero in numeros):
+            restante = INTERVALO_VERIFICACAO if limite is None else limite - time.monotonic()
+            if restante <= 0:
+                with self._lock:
+                    atrasados = [numero for numero in numeros if self._gravados.pop(numero, None) is None]
+                    self._metricas["ciclos_atrasados"] += len(atrasados)
+                raise TimeoutError(f"ciclos {atrasados} não confirmados | cycles {atrasados} not acknowledged")
+            try:
+                resumo = self._status.get(timeout=min(restante, INTERVALO_VERIFICACAO))
+            except queue.Empty:
+                self.verificar_processos()
+                continue
+            self._registrar(resumo, numeros)
+        with self._lock:
+            return [self._gravados.pop(numero) for numero in numeros]
+
+    def _registrar(self, resumo, numeros=()):
+        """
+        Soma um resumo do escritor aos totais e o guarda se algum aguardar() ainda for pedi-lo.
+        Adds a writer summary to the totals and keeps it if some aguardar() will still ask for it.
+        """
+        with self._lock:
+            self._metricas["ciclos_gravados"] += 1
+            self._metricas["linhas_gravadas"] += resumo["linhas"]
+            # Ciclos atrasados já desistidos não são pedidos de novo | Late cycles already given up on are not asked for again
+            if resumo["ciclo"] in numeros or resumo["ciclo"] > self._aguardado:
+                self._gravados[resumo["ciclo"]] = resumo
+
+    def metricas(self):
+        """
+        Retorna ciclos e tarefas enviados, ciclos e linhas gravados, espera por contrapressão e
+        profundidade das filas.
+        Returns cycles and tasks sent, cycles and rows written, backpressure wait and queue depths.
+        """
+        with self._lock:
+            return {
+                **self._metricas,
+                "fila_tarefas": _profundidade(self._tarefas),
+                "fila_resultados": _profundidade(self._resultados),
+            }
+
+    def fechar(self):
+        """
+        Encerra os coletores depois das tarefas pendentes e o escritor depois dos lotes pendentes.
+        Stops the collectors after the pending tasks and the writer after the pending batches.
+        """
+        self._encerrando = True
+        # Com um processo morto as filas podem estar travadas: tudo aqui tem prazo
+        # With a dead process the queues may be stuck: everything here has a deadline
+        limite = time.monotonic() + self.prazo + INTERVALO_VERIFICACAO
+        travado = False
+        for _ in self._trabalhadores:
+            try:
+                self._tarefas.put(None, timeout=max(0.0, limite - time.monotonic()))
+            except queue.Full:
+                travado = True
+                break
+        for processo in self._trabalhadores:
+            processo.join(max(0.0, limite - time.monotonic()))
+            if processo.is_alive():
+                logger.warning(f"Processo {processo.name} não encerrou; terminando | Process {processo.name} did not exit; terminating")
+                processo.terminate()
+                travado = True
+        try:
+            self._resultados.put(None, timeout=max(INTERVALO_VERIFICACAO, limite - time.monotonic()))
+            self._escritor.join()
+        except queue.Full:
+            logger.error("Escritor não recebeu o encerramento; terminando | Writer did not get the shutdown; terminating")
+            self._escritor.terminate()
+            travado = True
+        if travado:
+            # Sem leitor, as threads que alimentam as filas nunca terminariam e travariam a saída do processo
+            # Without a reader, the threads feeding the queues would never finish and would hang process exit
+            self._tarefas.cancel_join_thread()
+            self._resultados.cancel_join_thread()
+        while True:
+            try:
+                resumo = self._status.get_nowait()
+            except queue.Empty:
+                break
+            self._registrar(resumo)
@@ -0,0 +1,379 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import partial
+from zoneinfo import ZoneInfo
+from concurrency import executar_em_paralelo
+from config import (
+    TTL_CACHE, CAPACIDADE_CACHE, CAMINHO_CACHE, HORARIOS_MERCADO, CRIPTOMOEDAS, ATRASO_COTACOES,
+    TAMANHO_LOTE_ACOES
+)
+from data_collector import baixar_yfinance, baixar_variacoes, registros_acoes, obter_cotacoes_moedas_lote
+from logger_config import logger
+
+# Marca as linhas servidas pelo cache, que já foram persistidas no ciclo em que chegaram
+# Flags rows served by the cache, which were already persisted in the cycle they arrived
+CAMPO_CACHE = "EM CACHE"
+
+
+def mercado_do_simbolo(classe, simbolo):
+    """
+    Retorna o mercado (chave de HORARIOS_MERCADO) em que um símbolo é negociado.
+    Returns the market (HORARIOS_MERCADO key) where a symbol trades.
+    """
+    if classe == "acoes":
+        return "B3" if simbolo.endswith(".SA") else "NYSE"
+    return "CRIPTO" if simbolo in CRIPTOMOEDAS else "FOREX"
+
+def _sessao(mercado, instante):
+    """
+    Retorna (início, fim) do pregão em andamento ou do próximo após o instante, em segundos desde a época.
+    Returns (start, end) of the running session or the next one after the instant, in seconds since the epoch.
+
+    O fim inclui ATRASO_COTACOES nos mercados com fechamento, pois as cotações chegam atrasadas.
+    The end includes ATRASO_COTACOES on markets with a close, since quotes arrive delayed.
+    """
+    fuso, abertura, fechamento, dias = HORARIOS_MERCADO[mercado]
+    fuso = ZoneInfo(fuso)
+    local = datetime.fromtimestamp(instante, fuso)
+    for deslocamento in range(8):
+        dia = local.date() + timedelta(days=deslocamento)
+        if dia.weekday() not in dias:
+            continue
+        if abertura is None:
+            inicio = datetime(dia.year, dia.month, dia.day, tzinfo=fuso)
+            fim = inicio + timedelta(days=1)
+        else:
+            inicio = datetime.combine(dia, datetime.strptime(abertura, "%H:%M").time(), fuso)
+            fim = datetime.combine(dia, datetime.strptime(fechamento, "%H:%M").time(), fuso)
+            fim += timedelta(seconds=ATRASO_COTACOES)
+        if local < fim:
+            return inicio.timestamp(), fim.timestamp()
+    raise ValueError(f"mercado {mercado} sem pregão na semana | market {mercado} has no session in the week")
+
+def mercado_aberto(mercado, agora=None):
+    """
+    Indica se o mercado está em pregão (incluindo a margem de atraso das cotações).
+    Tells whether the market is in session (including the quote delay margin).
+    """
+    agora = time.time() if agora is None else agora
+    return _sessao(mercado, agora)[0] <= agora
+
+def validade_cotacao(classe, simbolo, agora=None, mercado=None):
+    """
+    Calcula até quando uma cotação recém-obtida continua válida.
+    Computes until when a freshly fetched quote stays valid.
+
+    Com o mercado aberto vale o TTL da classe; fechado, a cotação só muda na próxima abertura.
+    While the market is open the class TTL applies; when closed, the quote only changes at the next open.
+
+    Args:
+        mercado (str, optional): Mercado do registro de ativos (padrão: deduzido do símbolo).
+                                 Market from the asset registry (default: inferred from the symbol).
+
+    Returns:
+        float: Expiração em segundos desde a época.
+               Expiry in seconds since the epoch.
+    """
+    agora = time.time() if agora is None else agora
+    inicio, fim = _sessao(mercado or mercado_do_simbolo(classe, simbolo), agora)
+    if inicio <= agora:
+        return min(agora + TTL_CACHE[classe], fim)
+    return inicio
+
+def validade_anterior(classe, simbolo, agora=None, mercado=None):
+    """
+    Calcula até quando o fechamento anterior continua válido: até a próxima abertura do mercado.
+    Computes until when the previous close stays valid: until the market's next open.
+
+    Args:
+        mercado (str, optional): Mercado do registro de ativos (padrão: deduzido do símbolo).
+                                 Market from the asset registry (default: inferred from the symbol).
+
+    Returns:
+        float: Expiração em segundos desde a época.
+               Expiry in seconds since the epoch.
+    """
+    agora = time.time() if agora is None else agora
+    mercado = mercado or mercado_do_simbolo(classe, simbolo)
+    inicio, fim = _sessao(mercado, agora)
+    if inicio <= agora:
+        inicio, fim = _sessao(mercado, fim)
+    return inicio
+
+class CacheCotacoes:
+    """
+    Cache de cotações com LRU em memória e armazenamento opcional em SQLite.
+    Quote cache with an in-memory LRU and optional SQLite storage.
+
+    As chaves são tuplas (tipo, classe, símbolo), com tipo "cotacao" ou "anterior". Cada item
+    guarda sua própria expiração; o arquivo SQLite mantém o cache entre execuções.
+    Keys are (type, class, symbol) tuples, with type "cotacao" or "anterior". Each item keeps
+    its own expiry; the SQLite file keeps the cache across runs.
+
+    Args:
+        capacidade (int): Itens mantidos em memória.
+                          Items kept in memory.
+        caminho (str, optional): Arquivo SQLite (padrão: só memória).
+                                 SQLite file (default: memory only).
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_CACHE, caminho=CAMINHO_CACHE):
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self._metricas = {"acertos": 0, "acertos_disco": 0, "faltas": 0, "expirados": 0, "remocoes": 0}
+        self._banco = None
+        if caminho:
+            self._banco = sqlite3.connect(caminho, check_same_thread=False)
+            self._banco.execute("""
+                CREATE TABLE IF NOT EXISTS cotacoes (
+                    tipo TEXT, classe TEXT, simbolo TEXT, expira REAL, valor TEXT,
+                    PRIMARY KEY (tipo, classe, simbolo)
+                )
+            """)
+            self._banco.commit()
+
+    def _ler_disco(self, chave):
+        linha = self._banco.execute(
+            "SELECT expira, valor FROM cotacoes WHERE tipo = ? AND classe = ? AND simbolo = ?", chave
+        ).fetchone()
+        return None if linha is None else (linha[0], json.loads(linha[1]))
+
+    def _inserir_memoria(self, chave, item):
+        self._itens[chave] = item
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+            self._metricas["remocoes"] += 1
+
+    def obter(self, chave, agora=None):
+        """
+        Retorna o valor em cache, ou None se não existir ou tiver expirado.
+        Returns the cached value, or None if missing or expired.
+        """
+        agora = time.time() if agora is None else agora
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+            elif self._banco is not None:
+                item = self._ler_disco(chave)
+                if item is not None and item[0] > agora:
+                    self._metricas["acertos_disco"] += 1
+                    self._inserir_memoria(chave, item)
+
+            if item is None:
+                self._metricas["faltas"] += 1
+                return None
+            if item[0] <= agora:
+                self._itens.pop(chave, None)
+                self._metricas["expirados"] += 1
+                self._metricas["faltas"] += 1
+                return None
+            self._metricas["acertos"] += 1
+            return item[1]
+
+    def guardar(self, itens):
+        """
+        Guarda vários itens de uma vez (uma transação no SQLite).
+        Stores several items at once (one SQLite transaction).
+
+        Args:
+            itens (dict): Chave -> (expiração em segundos desde a época, valor serializável em JSON).
+                          Key -> (expiry in seconds since the epoch, JSON-serializable value).
+        """
+        with self._lock:
+            for chave, item in itens.items():
+                self._inserir_memoria(chave, item)
+            if self._banco is not None and itens:
+                self._banco.executemany(
+                    "INSERT OR REPLACE INTO cotacoes (tipo, classe, simbolo, expira, valor) VALUES (?, ?, ?, ?, ?)",
+                    [(*chave, expira, json.dumps(valor)) for chave, (expira, valor) in itens.items()]
+                )
+                self._banco.commit()
+
+    def metricas(self):
+        """
+        Retorna os contadores de acertos, faltas, expirações e remoções do LRU.
+        Returns the hit, miss, expiry and LRU eviction counters.
+
+        Returns:
+            dict: Contadores, taxa de acerto e itens em memória.
+                  Counters, hit ratio and items in memory.
+        """
+        with self._lock:
+            m = dict(self._metricas)
+            m["itens"] = len(self._itens)
+        consultas = m["acertos"] + m["faltas"]
+        m["taxa_acerto"] = m["acertos"] / consultas if consultas else 0.0
+        return m
+
+    def fechar(self):
+        """
+        Fecha o arquivo SQLite, se houver.
+        Closes the SQLite file, if any.
+        """
+        if self._banco is not None:
+            self._banco.close()
+            self._banco = None
+
+def _coletar_lote_cache(assets, lote, baixar, periodo, anteriores, limite=None):
+    """
+    Coleta um lote de ações e retorna os registros junto com os fechamentos anteriores.
+    Collects a stock batch and returns the records along with the previous closes.
+    """
+    try:
+        variacoes = baixar_variacoes(lote, baixar, periodo, anteriores, limite)
+    except Exception as e:
+        logger.error(f"Erro ao obter dados do lote {lote[0]}..{lote[-1]}: {e} | Error getting data for batch {lote[0]}..{lote[-1]}: {e}")
+        return [], {}
+    return registros_acoes(assets, lote, variacoes), variacoes["anterior"].to_dict()
+
+def coletar_acoes_com_cache(assets, cache, max_workers=1, limite=None, tamanho_lote=TAMANHO_LOTE_ACOES,
+                            baixar=baixar_yfinance, agora=None, mercados=None):
+    """
+    Coleta ações passando pelo cache: só baixa os símbolos sem cotação válida.
+    Collects stocks through the cache: only downloads symbols without a valid quote.
+
+    Símbolos com o fechamento anterior em cache baixam só o último pregão (periodo="1d");
+    o histórico de 2 dias é baixado uma vez por pregão.
+    Symbols with the previous close cached download only the last session (periodo="1d");
+    the 2-day history is downloaded once per session.
+
+    Args:
+        assets (dict): Dicionário de ativos.
+                       Dictionary of assets.
+        cache (CacheCotacoes): Cache de cotações.
+                               Quote cache.
+        max_workers (int): Quantidade de lotes baixados simultaneamente.
+                           Number of batches downloaded concurrently.
+        limite (float, optional): Prazo absoluto do ciclo em time.monotonic().
+                                  Absolute cycle deadline in time.monotonic().
+        tamanho_lote (int): Quantidade de símbolos por requisição.
+                            Number of symbols per request.
+        baixar (function): Transporte compatível com baixar_yfinance.
+                           Transport compatible with baixar_yfinance.
+        agora (float, optional): Horário atual em segundos desde a época (padrão: time.time()).
+                                 Current time in seconds since the epoch (default: time.time()).
+        mercados (dict, optional): Símbolo -> mercado do registro de ativos, para a validade no cache
+                                   (padrão: deduzido do símbolo).
+                                   Symbol -> market from the asset registry, for the cache lifetime
+                                   (default: inferred from the symbol).
+
+    Returns:
+        list: Lista de dicionários com os dados das ações, na ordem de assets; as linhas do cache
+              trazem CAMPO_CACHE.
+              List of dictionaries with stock data, in assets order; rows from the cache carry
+              CAMPO_CACHE.
+    """
+    agora = time.time() if agora is None else agora
+    mercados = mercados or {}
+    registros, completos, anteriores = {}, [], {}
+    for symbol in assets:
+        registro = cache.obter(("cotacao", "acoes", symbol), agora)
+        if registro is not None:
+            registros[symbol] = {**registro, CAMPO_CACHE: True}
+            continue
+        anterior = cache.obter(("anterior", "acoes", symbol), agora)
+        if anterior is None:
+            completos.append(symbol)
+        else:
+            anteriores[symbol] = anterior
+
+    parciais = list(anteriores)
+    tarefas = [
+        partial(_coletar_lote_cache, assets, completos[inicio:inicio + tamanho_lote], baixar, "2d", None, limite)
+        for inicio in range(0, len(completos), tamanho_lote)
+    ] + [
+        partial(_coletar_lote_cache, assets, lote, baixar, "1d", {s: anteriores[s] for s in lote}, limite)
+        for lote in (parciais[inicio:inicio + tamanho_lote] for inicio in range(0, len(parciais), tamanho_lote))
+    ]
+
+    novos = {}
+    for resultado in executar_em_paralelo(tarefas, max_workers, limite):
+        if not resultado:
+            continue
+        dados_lote, anteriores_lote = resultado
+        for registro in dados_lote:
+            symbol = registro["AÇÃO"]
+            registros[symbol] = registro
+            novos[("cotacao", "acoes", symbol)] = (validade_cotacao("acoes", symbol, agora, mercados.get(symbol)), registro)
+        for symbol, anterior in anteriores_lote.items():
+            if symbol not in anteriores:
+                novos[("anterior", "acoes", symbol)] = (
+                    validade_anterior("acoes", symbol, agora, mercados.get(symbol)), anterior
+                )
+    cache.guardar(novos)
+    logger.debug(f"Cache de ações: {len(assets) - len(completos) - len(parciais)} em cache, {len(parciais)} com anterior, {len(completos)} completos | Stock cache: {len(assets) - len(completos) - len(parciais)} cached, {len(parciais)} with previous close, {len(completos)} full")
+    return [registros[symbol] for symbol in assets if symbol in registros]
+
+def obter_moedas_com_cache(moedas, cache, max_workers=1, limite=None, coletar=obter_cotacoes_moedas_lote, agora=None,
+                           mercados=None):
+    """
+    Obtém cotações de moedas passando pelo cache: só consulta as moedas sem cotação válida.
+    Gets currency quotes through the cache: only queries currencies without a valid quote.
+
+    Args:
+        moedas (dict): Dicionário de moedas.
+                       Dictionary of currencies.
+        cache (CacheCotacoes): Cache de cotações.
+                               Quote cache.
+        max_workers (int): Quantidade de requisições simultâneas.
+                           Number of concurrent requests.
+        limite (float, optional): Prazo absoluto do ciclo em time.monotonic().
+                                  Absolute cycle deadline in time.monotonic().
+        coletar (function): Coletor de moedas (padrão: obter_cotacoes_moedas_lote).
+                            Currency collector (default: obter_cotacoes_moedas_lote).
+        agora (float, optional): Horário atual em segundos desde a época (padrão: time.time()).
+                                 Current time in seconds since the epoch (default: time.time()).
+        mercados (dict, optional): Moeda -> mercado do registro de ativos (padrão: deduzido da moeda).
+                                   Currency -> market from the asset registry (default: inferred from the currency).
+
+    Returns:
+        list: Lista de dicionários com as cotações, na ordem de moedas; as linhas do cache trazem
+              CAMPO_CACHE.
+              List of dictionaries with the quotes, in moedas order; rows from the cache carry
+              CAMPO_CACHE.
+    """
+    agora = time.time() if agora is None else agora
+    mercados = mercados or {}
+    registros, faltantes = {}, {}
+    for moeda, nome in moedas.items():
+        registro = cache.obter(("cotacao", "moedas", moeda), agora)
+        if registro is None:
+            faltantes[moeda] = nome
+        else:
+            registros[moeda] = {**registro, CAMPO_CACHE: True}
+
+    if faltantes:
+        novos = {}
+        for registro in coletar(faltantes, max_workers=max_workers, limite=limite):
+            moeda = registro["MOEDA"]
+            registros[moeda] = registro
+            novos[("cotacao", "moedas", moeda)] = (validade_cotacao("moedas", moeda, agora, mercados.get(moeda)), registro)
+        cache.guardar(novos)
+    return [registros[moeda] for moeda in moedas if moeda in registros]
+
+def registros_novos(dados):
+    """
+    Descarta as linhas servidas pelo cache, que repetiriam uma cotação já gravada.
+    Drops the rows served by the cache, which would repeat an already written quote.
+
+    Com o mercado fechado o cache devolve a mesma cotação (com o mesmo horário) a cada tique;
+    gravá-la de novo duplicaria o histórico e daria retornos zero aos indicadores.
+    With the market closed the cache returns the same quote (with the same timestamp) every
+    tick; writing it again would duplicate the history and feed zero returns to the indicators.
+
+    Args:
+        dados (list): Lista de dicionários de um coletor com cache.
+                      List of dictionaries from a cached collector.
+
+    Returns:
+        list: Só as linhas baixadas neste ciclo.
+              Only the rows downloaded in this cycle.
+    """
+    return [registro for registro in dados if not registro.get(CAMPO_CACHE)]
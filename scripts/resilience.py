@@ -0,0 +1,347 @@
+import random
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from concurrency import aguardar_taxa
+from config import (
+    TIMEOUT_HTTP, TENTATIVAS_REDE, ESPERA_BASE_REDE, ESPERA_MAXIMA_REDE, FALHAS_DISJUNTOR,
+    TEMPO_DISJUNTOR_ABERTO, TENTATIVAS_FILA_MORTOS, CAMINHO_FILA_MORTOS
+)
+from cycle_batch import COLUNAS_LOTE
+from http_client import obter_sessao
+from metrics import contar, medir_etapa
+from logger_config import logger
+
+
+class CircuitoAberto(Exception):
+    """
+    A fonte está degradada e o disjuntor recusou a requisição sem tentar.
+    The source is degraded and the circuit breaker refused the request without trying.
+    """
+
+class Disjuntor:
+    """
+    Disjuntor por fonte: abre após falhas seguidas e falha rápido até o tempo de espera acabar.
+    Per-source circuit breaker: opens after consecutive failures and fails fast until the wait ends.
+
+    Depois do tempo aberto, uma única requisição de teste passa (meio aberto); se ela der certo
+    o circuito fecha, senão volta a abrir.
+    After the open time, a single probe request goes through (half-open); if it succeeds the
+    circuit closes, otherwise it opens again.
+
+    Args:
+        nome (str): Nome da fonte, para os logs.
+                    Source name, for the logs.
+        falhas_para_abrir (int): Falhas seguidas que abrem o circuito.
+                                 Consecutive failures that open the circuit.
+        tempo_aberto (float): Segundos com o circuito aberto antes do teste.
+                              Seconds with the circuit open before the probe.
+    """
+
+    def __init__(self, nome, falhas_para_abrir=FALHAS_DISJUNTOR, tempo_aberto=TEMPO_DISJUNTOR_ABERTO):
+        self.nome = nome
+        self.falhas_para_abrir = falhas_para_abrir
+        self.tempo_aberto = tempo_aberto
+        self.estado = "fechado"
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._testando = False
+        self._lock = threading.Lock()
+        self._metricas = {"aberturas": 0, "rejeicoes": 0}
+
+    def permitir(self):
+        """
+        Indica se uma requisição pode ser feita agora.
+        Tells whether a request may be made now.
+        """
+        with self._lock:
+            if self.estado == "aberto" and time.monotonic() - self._aberto_em >= self.tempo_aberto:
+                self.estado = "meio_aberto"
+                self._testando = False
+            if self.estado == "fechado":
+                return True
+            if self.estado == "meio_aberto" and not self._testando:
+                self._testando = True
+                return True
+            self._metricas["rejeicoes"] += 1
+            return False
+
+    def registrar_sucesso(self):
+        with self._lock:
+            if self.estado != "fechado":
+                logger.info(f"Circuito de {self.nome} fechado. | {self.nome} circuit closed.")
+            self.estado = "fechado"
+            self._falhas = 0
+            self._testando = False
+
+    def registrar_falha(self):
+        with self._lock:
+            self._falhas += 1
+            if self.estado == "meio_aberto" or (self.estado == "fechado" and self._falhas >= self.falhas_para_abrir):
+                self.estado = "aberto"
+                self._aberto_em = time.monotonic()
+                self._testando = False
+                self._metricas["aberturas"] += 1
+                logger.warning(f"Circuito de {self.nome} aberto após {self._falhas} falhas. | {self.nome} circuit opened after {self._falhas} failures.")
+
+    def metricas(self):
+        """
+        Retorna o estado, as falhas seguidas, as aberturas e as requisições recusadas.
+        Returns the state, consecutive failures, openings and refused requests.
+        """
+        with self._lock:
+            return {"estado": self.estado, "falhas": self._falhas, **self._metricas}
+
+_disjuntores = {}
+_disjuntores_lock = threading.Lock()
+
+def disjuntor_para(url_ou_host):
+    """
+    Retorna o disjuntor compartilhado do host, criando-o na primeira chamada.
+    Returns the host's shared circuit breaker, creating it on the first call.
+    """
+    host = urlparse(url_ou_host).hostname if "://" in url_ou_host else url_ou_host
+    with _disjuntores_lock:
+        if host not in _disjuntores:
+            _disjuntores[host] = Disjuntor(host)
+        return _disjuntores[host]
+
+def metricas_disjuntores():
+    """
+    Retorna as métricas de todos os disjuntores, por host.
+    Returns the metrics of all circuit breakers, by host.
+    """
+    with _disjuntores_lock:
+        disjuntores = dict(_disjuntores)
+    return {host: disjuntor.metricas() for host, disjuntor in disjuntores.items()}
+
+def erro_transitorio(erro):
+    """
+    Indica se vale repetir a requisição: erros HTTP 4xx (exceto 429) são definitivos.
+    Tells whether the request is worth retrying: HTTP 4xx errors (except 429) are permanent.
+    """
+    if isinstance(erro, requests.HTTPError) and erro.response is not None:
+        status = erro.response.status_code
+        return status == 429 or status >= 500
+    return True
+
+def tempo_limite(limite=None, timeout=TIMEOUT_HTTP):
+    """
+    Ajusta o timeout (conexão, leitura) ao que resta do prazo do ciclo.
+    Fits the (connect, read) timeout into what is left of the cycle deadline.
+
+    Raises:
+        TimeoutError: Se o prazo já acabou.
+                      If the deadline is already over.
+    """
+    if limite is None:
+        return timeout
+    restante = limite - time.monotonic()
+    if restante <= 0:
+        raise TimeoutError("prazo do ciclo esgotado | cycle deadline exhausted")
+    return tuple(min(parte, restante) for parte in timeout)
+
+def executar_resiliente(url_ou_host, funcao, limite=None, tentativas=TENTATIVAS_REDE):
+    """
+    Executa uma requisição com disjuntor, limite de taxa e repetição com backoff exponencial e jitter.
+    Runs a request with circuit breaker, rate limit and retries with exponential backoff and jitter.
+
+    Args:
+        url_ou_host (str): URL ou host da fonte (escolhe o disjuntor e o limitador).
+                           Source URL or host (selects the breaker and the limiter).
+        funcao (function): Faz a requisição e retorna o resultado.
+                           Makes the request and returns the result.
+        limite (float, optional): Prazo absoluto do ciclo em time.monotonic().
+                                  Absolute cycle deadline in time.monotonic().
+        tentativas (int): Quantidade máxima de tentativas.
+                          Maximum number of attempts.
+
+    Returns:
+        O retorno de funcao.
+        The return value of funcao.
+
+    Raises:
+        CircuitoAberto: Se a fonte estiver com o circuito aberto.
+                        If the source circuit is open.
+    """
+    disjuntor = disjuntor_para(url_ou_host)
+    fonte = disjuntor.nome
+    for tentativa in range(1, tentativas + 1):
+        if not disjuntor.permitir():
+            contar("erros_total", fonte=fonte, tipo="circuito_aberto")
+            raise CircuitoAberto(f"circuito de {disjuntor.nome} aberto | {disjuntor.nome} circuit open")
+        with medir_etapa("espera_taxa", fonte=fonte):
+            aguardar_taxa(url_ou_host, limite)
+        if limite is not None and time.monotonic() >= limite:
+            # Prazo do ciclo esgotado não é falha da fonte | An exhausted cycle deadline is not a source failure
+            contar("erros_total", fonte=fonte, tipo="prazo")
+            raise TimeoutError("prazo do ciclo esgotado | cycle deadline exhausted")
+        contar("requisicoes_total", fonte=fonte)
+        try:
+            with medir_etapa("fetch", fonte=fonte):
+                resultado = funcao()
+        except Exception as e:
+            if not erro_transitorio(e):
+                # A fonte respondeu; o erro é da requisição | The source answered; the error is the request's
+                contar("erros_total", fonte=fonte, tipo="requisicao")
+                disjuntor.registrar_sucesso()
+                raise
+            contar("erros_total", fonte=fonte, tipo="transitorio")
+            disjuntor.registrar_falha()
+            # Full jitter: espera aleatória até o teto exponencial | Full jitter: random wait up to the exponential cap
+            espera = random.uniform(0, min(ESPERA_MAXIMA_REDE, ESPERA_BASE_REDE * 2 ** (tentativa - 1)))
+            if tentativa == tentativas or (limite is not None and time.monotonic() + espera > limite):
+                raise
+            logger.warning(f"Falha em {url_ou_host} ({e}); nova tentativa em {espera:.2f}s ({tentativa}/{tentativas}). | {url_ou_host} failed ({e}); retrying in {espera:.2f}s ({tentativa}/{tentativas}).")
+            time.sleep(espera)
+        else:
+            disjuntor.registrar_sucesso()
+            return resultado
+
+def obter_json(url, limite=None):
+    """
+    Faz um GET com timeout e resiliência e retorna o corpo JSON.
+    Makes a GET with timeout and resilience and returns the JSON body.
+    """
+    def requisitar():
+        response = obter_sessao().get(url, timeout=tempo_limite(limite))
+        response.raise_for_status()
+        return response.json()
+
+    return executar_resiliente(url, requisitar, limite)
+
+class FilaMortos:
+    """
+    Fila local de símbolos que falharam, repetidos nos ciclos seguintes até darem certo.
+    Local queue of failed symbols, replayed on the following cycles until they succeed.
+
+    Cada símbolo guarda quantas vezes falhou; depois de max_tentativas ele é descartado.
+    Com caminho, a fila fica em um arquivo SQLite e sobrevive a reinícios.
+    Each symbol keeps how many times it failed; after max_tentativas it is dropped.
+    With caminho, the queue lives in a SQLite file and survives restarts.
+
+    Args:
+        caminho (str, optional): Arquivo SQLite (padrão: só memória).
+                                 SQLite file (default: memory only).
+        max_tentativas (int): Falhas antes de descartar o símbolo.
+                              Failures before the symbol is dropped.
+    """
+
+    def __init__(self, caminho=CAMINHO_FILA_MORTOS, max_tentativas=TENTATIVAS_FILA_MORTOS):
+        self.max_tentativas = max_tentativas
+        self._lock = threading.Lock()
+        self._banco = sqlite3.connect(caminho or ":memory:", check_same_thread=False)
+        self._banco.execute("""
+            CREATE TABLE IF NOT EXISTS fila_mortos (
+                classe TEXT, simbolo TEXT, nome TEXT, tentativas INTEGER, erro TEXT, atualizado REAL,
+                PRIMARY KEY (classe, simbolo)
+            )
+        """)
+        self._banco.commit()
+        self._metricas = {"registrados": 0, "recuperados": 0, "descartados": 0}
+
+    def registrar(self, classe, itens, erro=""):
+        """
+        Registra (ou conta mais uma falha de) símbolos que não vieram no ciclo.
+        Records (or counts one more failure of) symbols missing from the cycle.
+
+        Args:
+            classe (str): "acoes" ou "moedas".
+                          "acoes" or "moedas".
+            itens (dict): Símbolo -> nome.
+                          Symbol -> name.
+            erro (str): Motivo, para diagnóstico.
+                        Reason, for diagnostics.
+        """
+        if not itens:
+            return
+        with self._lock:
+            self._banco.executemany("""
+                INSERT INTO fila_mortos (classe, simbolo, nome, tentativas, erro, atualizado) VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT (classe, simbolo) DO UPDATE SET tentativas = tentativas + 1, erro = excluded.erro,
+                atualizado = excluded.atualizado
+            """, [(classe, simbolo, nome, erro, time.time()) for simbolo, nome in itens.items()])
+            descartados = self._banco.execute(
+                "SELECT simbolo FROM fila_mortos WHERE classe = ? AND tentativas >= ?", (classe, self.max_tentativas)
+            ).fetchall()
+            self._banco.execute(
+                "DELETE FROM fila_mortos WHERE classe = ? AND tentativas >= ?", (classe, self.max_tentativas)
+            )
+            self._banco.commit()
+            self._metricas["registrados"] += len(itens)
+            self._metricas["descartados"] += len(descartados)
+        for (simbolo,) in descartados:
+            logger.error(f"{simbolo} descartado da fila de mortos após {self.max_tentativas} falhas. | {simbolo} dropped from the dead-letter queue after {self.max_tentativas} failures.")
+
+    def pendentes(self, classe):
+        """
+        Retorna os símbolos da classe aguardando nova tentativa (símbolo -> nome).
+        Returns the class symbols awaiting another attempt (symbol -> name).
+        """
+        with self._lock:
+            return dict(self._banco.execute(
+                "SELECT simbolo, nome FROM fila_mortos WHERE classe = ? ORDER BY atualizado", (classe,)
+            ).fetchall())
+
+    def remover(self, classe, simbolos):
+        """
+        Remove da fila os símbolos que voltaram a ser coletados.
+        Removes from the queue the symbols that were collected again.
+        """
+        with self._lock:
+            antes = self._banco.total_changes
+            self._banco.executemany(
+                "DELETE FROM fila_mortos WHERE classe = ? AND simbolo = ?", [(classe, s) for s in simbolos]
+            )
+            self._banco.commit()
+            self._metricas["recuperados"] += self._banco.total_changes - antes
+
+    def metricas(self):
+        """
+        Retorna os contadores da fila e a quantidade de símbolos pendentes.
+        Returns the queue counters and the number of pending symbols.
+        """
+        with self._lock:
+            pendentes = self._banco.execute("SELECT COUNT(*) FROM fila_mortos").fetchone()[0]
+            return {**self._metricas, "pendentes": pendentes}
+
+    def fechar(self):
+        with self._lock:
+            self._banco.close()
+
+def coletar_com_fila(classe, coletar, fila, itens, max_workers=1, limite=None):
+    """
+    Coleta os itens do ciclo mais os pendentes da fila de mortos e atualiza a fila.
+    Collects the cycle's items plus the dead-letter queue's pending ones and updates the queue.
+
+    Args:
+        classe (str): "acoes" ou "moedas".
+                      "acoes" or "moedas".
+        coletar (function): Coletor com a assinatura coletar(itens, max_workers=, limite=).
+                            Collector with the signature coletar(itens, max_workers=, limite=).
+        fila (FilaMortos): Fila de mortos.
+                           Dead-letter queue.
+        itens (dict): Símbolo -> nome a coletar neste ciclo.
+                      Symbol -> name to collect in this cycle.
+        max_workers (int): Repassado ao coletor.
+                           Passed to the collector.
+        limite (float, optional): Prazo absoluto do ciclo em time.monotonic().
+                                  Absolute cycle deadline in time.monotonic().
+
+    Returns:
+        list: Lista de dicionários retornada pelo coletor.
+              List of dictionaries returned by the collector.
+    """
+    pendentes = fila.pendentes(classe)
+    pedidos = {**pendentes, **itens}
+    dados = coletar(pedidos, max_workers=max_workers, limite=limite) or []
+    coluna = COLUNAS_LOTE[classe]["simbolo"]
+    coletados = {item[coluna] for item in dados}
+    fila.remover(classe, [simbolo for simbolo in pendentes if simbolo in coletados])
+    fila.registrar(
+        classe, {simbolo: nome for simbolo, nome in pedidos.items() if simbolo not in coletados},
+        "ausente no ciclo | missing from the cycle"
+    )
+    return dados
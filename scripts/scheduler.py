@@ -0,0 +1,208 @@
+import math
+import threading
+import time
+from metrics import observar
+from logger_config import logger
+
+
+def proximo_tique(agora, intervalo):
+    """
+    Retorna o próximo instante alinhado ao relógio (múltiplo do intervalo) após agora.
+    Returns the next wall-clock-aligned instant (a multiple of the interval) after agora.
+
+    Args:
+        agora (float): Horário atual em segundos desde a época.
+                       Current time in seconds since the epoch.
+        intervalo (float): Intervalo entre tiques em segundos.
+                           Interval between ticks in seconds.
+
+    Returns:
+        float: Próximo tique.
+               Next tick.
+    """
+    return (math.floor(agora / intervalo) + 1) * intervalo
+
+def combinar_resultados(anterior, novo):
+    """
+    Junta dois resultados de coleta (tuplas de listas) em um só, para gravação conjunta.
+    Merges two collection results (tuples of lists) into one, for a joint write.
+    """
+    return tuple(a + b for a, b in zip(anterior, novo))
+
+class _Estatistica:
+    """
+    Contador com média e máximo de uma medida em segundos.
+    Counter with mean and maximum of a measurement in seconds.
+    """
+
+    __slots__ = ("quantidade", "total", "maximo")
+
+    def __init__(self):
+        self.quantidade = 0
+        self.total = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, valor):
+        self.quantidade += 1
+        self.total += valor
+        self.maximo = max(self.maximo, valor)
+
+    def resumo(self):
+        return {"media": self.total / self.quantidade if self.quantidade else 0.0, "max": self.maximo}
+
+class Agendador:
+    """
+    Executa coleta e persistência em tiques alinhados ao relógio, com as etapas sobrepostas.
+    Runs collection and persistence on wall-clock-aligned ticks, with overlapping stages.
+
+    A coleta roda na thread chamadora e entrega o resultado para a thread de persistência,
+    de modo que a gravação do ciclo N acontece durante a coleta do ciclo N+1. Se a coleta
+    passar do intervalo, os tiques perdidos são pulados; se a persistência atrasar, os
+    resultados pendentes são combinados e gravados juntos.
+    Collection runs on the calling thread and hands results to the persistence thread, so
+    writing cycle N happens while cycle N+1 is collected. If collection overruns the interval,
+    missed ticks are skipped; if persistence falls behind, pending results are merged and
+    written together.
+
+    Args:
+        intervalo (float): Intervalo entre tiques em segundos.
+                           Interval between ticks in seconds.
+        coletar (function): Recebe o horário do tique e retorna o resultado da coleta.
+                            Takes the tick time and returns the collection result.
+        persistir (function): Recebe um resultado de coleta e o grava.
+                              Takes a collection result and writes it.
+        duracao (float, optional): Duração total em segundos (padrão: até parar() ser chamado).
+                                   Total duration in seconds (default: until parar() is called).
+        combinar (function): Junta dois resultados pendentes em um.
+                             Merges two pending results into one.
+    """
+
+    def __init__(self, intervalo, coletar, persistir, duracao=None, combinar=combinar_resultados):
+        self.intervalo = intervalo
+        self.coletar = coletar
+        self.persistir = persistir
+        self.duracao = duracao
+        self.combinar = combinar
+        self._condicao = threading.Condition()
+        self._pendente = None
+        self._tique_pendente = None
+        self._encerrar = threading.Event()
+        self._coleta_terminou = False
+        self._estatisticas = {
+            "coleta": _Estatistica(),
+            "persistencia": _Estatistica(),
+            "jitter": _Estatistica(),
+            "atraso": _Estatistica(),
+        }
+        self._tiques_pulados = 0
+        self._ciclos_combinados = 0
+        self._falhas = {"coleta": 0, "persistencia": 0}
+
+    def parar(self):
+        """
+        Pede o encerramento; o ciclo em andamento termina e os dados pendentes são gravados.
+        Requests shutdown; the running cycle finishes and pending data is written.
+        """
+        self._encerrar.set()
+
+    def _entregar(self, tique, resultado):
+        with self._condicao:
+            if self._pendente is None:
+                self._pendente, self._tique_pendente = resultado, tique
+            else:
+                # A persistência ainda não consumiu o ciclo anterior: combinar em uma única gravação
+                # Persistence has not consumed the previous cycle yet: merge into a single write
+                self._pendente = self.combinar(self._pendente, resultado)
+                self._ciclos_combinados += 1
+                logger.warning("Persistência atrasada; ciclos combinados. | Persistence behind; cycles merged.")
+            self._condicao.notify()
+
+    def _laco_persistencia(self):
+        while True:
+            with self._condicao:
+                while self._pendente is None and not self._coleta_terminou:
+                    self._condicao.wait()
+                if self._pendente is None:
+                    return
+                resultado, tique = self._pendente, self._tique_pendente
+                self._pendente = self._tique_pendente = None
+            inicio = time.perf_counter()
+            try:
+                self.persistir(resultado)
+            except Exception as e:
+                self._falhas["persistencia"] += 1
+                logger.error(f"Erro na etapa de persistência: {e} | Error in the persistence stage: {e}")
+            duracao, atraso = time.perf_counter() - inicio, time.time() - tique
+            self._estatisticas["persistencia"].registrar(duracao)
+            self._estatisticas["atraso"].registrar(atraso)
+            observar("ciclo_segundos", duracao, etapa="persistencia")
+            observar("ciclo_segundos", atraso, etapa="atraso")
+
+    def executar(self):
+        """
+        Roda o agendador até a duração acabar ou parar() ser chamado.
+        Runs the scheduler until the duration ends or parar() is called.
+
+        Returns:
+            dict: Métricas finais (ver metricas()).
+                  Final metrics (see metricas()).
+        """
+        fim = None if self.duracao is None else time.time() + self.duracao
+        persistencia = threading.Thread(target=self._laco_persistencia, name="persistencia", daemon=True)
+        persistencia.start()
+        try:
+            tique = proximo_tique(time.time(), self.intervalo)
+            while not self._encerrar.is_set() and (fim is None or tique < fim):
+                if self._encerrar.wait(max(0.0, tique - time.time())):
+                    break
+                self._estatisticas["jitter"].registrar(time.time() - tique)
+
+                inicio = time.perf_counter()
+                try:
+                    self._entregar(tique, self.coletar(tique))
+                except Exception as e:
+                    self._falhas["coleta"] += 1
+                    logger.error(f"Erro na etapa de coleta: {e} | Error in the collection stage: {e}")
+                duracao = time.perf_counter() - inicio
+                self._estatisticas["coleta"].registrar(duracao)
+                observar("ciclo_segundos", duracao, etapa="coleta")
+
+                proximo = proximo_tique(time.time(), self.intervalo)
+                pulados = round((proximo - tique) / self.intervalo) - 1
+                if pulados > 0:
+                    self._tiques_pulados += pulados
+                    logger.warning(f"Coleta passou do intervalo; {pulados} tiques pulados. | Collection overran the interval; {pulados} ticks skipped.")
+                tique = proximo
+        except KeyboardInterrupt:
+            logger.info("Interrompido pelo usuário. | Interrupted by the user.")
+        finally:
+            with self._condicao:
+                self._coleta_terminou = True
+                self._condicao.notify()
+            persistencia.join()
+        metricas = self.metricas()
+        logger.info(f"Agendador encerrado: {metricas} | Scheduler finished: {metricas}")
+        return metricas
+
+    def metricas(self):
+        """
+        Retorna as métricas por etapa, em segundos.
+        Returns the per-stage metrics, in seconds.
+
+        Returns:
+            dict: Duração de coleta e persistência, jitter (início real - tique), atraso
+                  (fim da gravação - tique), tiques pulados, ciclos combinados, falhas e
+                  se há um resultado esperando a persistência.
+                  Collection and persistence duration, jitter (actual start - tick), lag
+                  (write end - tick), skipped ticks, merged cycles, failures and whether a
+                  result is waiting for persistence.
+        """
+        with self._condicao:
+            return {
+                **{nome: estatistica.resumo() for nome, estatistica in self._estatisticas.items()},
+                "ciclos": self._estatisticas["coleta"].quantidade,
+                "tiques_pulados": self._tiques_pulados,
+                "ciclos_combinados": self._ciclos_combinados,
+                "falhas": dict(self._falhas),
+                "pendente": int(self._pendente is not None),
+            }
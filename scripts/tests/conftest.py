@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Os módulos usam imports planos (from config import ...), como ao rodar de dentro de scripts/
+# The modules use flat imports (from config import ...), as when running from inside scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,26 @@
+import pytest
+from asset_registry import RegistroAtivos, _novo_ativo, shard_do_simbolo
+
+
+@pytest.fixture
+def registro():
+    ativos = [_novo_ativo(f"SIM{i:04d}.SA", f"Empresa {i}", "acoes", intervalo=60 if i % 3 else None) for i in range(500)]
+    ativos += [_novo_ativo(f"M{i:02d}", f"Moeda {i}", "moedas") for i in range(40)]
+    return RegistroAtivos(ativos, intervalo_base=10)
+
+@pytest.mark.parametrize("total", [2, 3, 8])
+def test_fatias_disjuntas_cobrem_todos_os_simbolos(registro, total):
+    fatias = [registro.fatia(indice, total) for indice in range(total)]
+
+    vistos = set()
+    for indice, fatia in enumerate(fatias):
+        chaves = set(fatia.ativos)
+        assert vistos.isdisjoint(chaves)
+        vistos |= chaves
+        assert all(shard_do_simbolo(classe, simbolo, total) == indice for classe, simbolo in chaves)
+    assert vistos == set(registro.ativos)
+    for classe in ("acoes", "moedas"):
+        assert sum(len(fatia.simbolos(classe)) for fatia in fatias) == len(registro.simbolos(classe))
+
+def test_fatia_unica_e_o_proprio_registro(registro):
+    assert registro.fatia(0, 1) is registro
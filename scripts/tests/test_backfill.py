@@ -0,0 +1,55 @@
+from datetime import date
+from backfill import CheckpointBackfill, dividir_tarefas, executar_backfill
+from history_reader import carregar_precos
+from benchmarks.stubs import transporte_historico_sintetico
+
+ASSETS = {f"SIM{i:02d}": f"Empresa {i}" for i in range(6)}
+INICIO, FIM = date(2024, 1, 1), date(2024, 3, 1)
+PARAMETROS = {"simbolos_por_tarefa": 2, "dias_por_tarefa": 20, "tarefas_por_onda": 4, "max_workers": 2}
+
+
+def _transporte_contado(falhar=None):
+    chamadas = []
+    sintetico = transporte_historico_sintetico(falhar=falhar)
+
+    def baixar(simbolos, inicio, fim):
+        chamadas.append(tuple(simbolos))
+        return sintetico(simbolos, inicio, fim)
+
+    return baixar, chamadas
+
+def test_checkpoint_retoma_so_as_tarefas_pendentes(tmp_path):
+    raiz = tmp_path / "dataset"
+    total = len(dividir_tarefas(list(ASSETS), INICIO, FIM, PARAMETROS["simbolos_por_tarefa"], PARAMETROS["dias_por_tarefa"]))
+
+    # Primeira execução "interrompida": as tarefas de SIM04/SIM05 falham e ficam sem marca
+    # First "interrupted" run: the SIM04/SIM05 tasks fail and stay unmarked
+    checkpoint = CheckpointBackfill(tmp_path / "backfill.sqlite")
+    baixar, _ = _transporte_contado(falhar=lambda simbolos, inicio, fim: "SIM04" in simbolos)
+    primeira = executar_backfill(ASSETS, INICIO, FIM, raiz=raiz, baixar=baixar, checkpoint=checkpoint, **PARAMETROS)
+    checkpoint.fechar()
+    falhas = primeira["falhas"]
+    assert primeira["tarefas"] == total
+    assert 0 < falhas < total
+    assert primeira["concluidas"] == total - falhas
+
+    # O checkpoint reaberto do disco só deixa baixar o que faltou | The checkpoint reopened from disk only lets the missing part download
+    checkpoint = CheckpointBackfill(tmp_path / "backfill.sqlite")
+    baixar, chamadas = _transporte_contado()
+    segunda = executar_backfill(ASSETS, INICIO, FIM, raiz=raiz, baixar=baixar, checkpoint=checkpoint, **PARAMETROS)
+    assert segunda["puladas"] == total - falhas
+    assert segunda["concluidas"] == falhas
+    assert segunda["falhas"] == 0
+    assert set(chamadas) == {("SIM04", "SIM05")}
+
+    # Terceira execução: nada pendente | Third run: nothing pending
+    baixar, chamadas = _transporte_contado()
+    terceira = executar_backfill(ASSETS, INICIO, FIM, raiz=raiz, baixar=baixar, checkpoint=checkpoint, **PARAMETROS)
+    checkpoint.fechar()
+    assert terceira["puladas"] == total
+    assert chamadas == []
+
+    tabela = carregar_precos(colunas=["AÇÃO", "HORÁRIO"], raiz=raiz)
+    chaves = list(zip(tabela.column("AÇÃO").to_pylist(), tabela.column("HORÁRIO").to_pylist()))
+    assert len(chaves) == len(set(chaves))
+    assert set(tabela.column("AÇÃO").to_pylist()) == set(ASSETS)
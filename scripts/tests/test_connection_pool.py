@@ -0,0 +1,37 @@
+import pytest
+import connection_pool
+from connection_pool import PoolConexoes
+
+
+class _ConexaoFalsa:
+    def __init__(self):
+        self.fechada = False
+
+    def ping(self, reconnect=False):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.fechada = True
+
+class _CursorFalso:
+    def close(self):
+        pass
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(connection_pool, "conectar_banco_dados", lambda *args, **kwargs: (_ConexaoFalsa(), _CursorFalso()))
+    return PoolConexoes("host", "user", "senha", "banco", tamanho=1, timeout=0.1)
+
+@pytest.mark.parametrize("erro", [KeyboardInterrupt, SystemExit, ValueError])
+def test_conexao_devolve_a_vaga_em_qualquer_excecao(pool, erro):
+    with pytest.raises(erro):
+        with pool.conexao() as conn:
+            raise erro()
+    # Com uma vaga só, o próximo checkout esgotaria o timeout se ela tivesse vazado
+    # With a single slot, the next checkout would time out had it leaked
+    with pool.conexao() as seguinte:
+        assert not seguinte.fechada
+    assert conn.fechada == (erro is not ValueError)
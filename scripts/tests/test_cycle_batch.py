@@ -0,0 +1,45 @@
+import pytest
+from cycle_batch import COLUNAS_LOTE, LoteCotacoes, ler_ipc
+
+REGISTROS = {
+    "acoes": [
+        {"EMPRESA": "Petrobras", "AÇÃO": "PETR4.SA", "COTAÇÃO": 38.5, "VARIAÇÃO PERCENTUAL": 1.25,
+         "HORÁRIO": "2024-06-03 10:00:00", "TENDÊNCIA": "Subindo | Up", "LINK": "https://finance.yahoo.com/quote/PETR4.SA"},
+        {"EMPRESA": "Vale", "AÇÃO": "VALE3.SA", "COTAÇÃO": 61.2, "VARIAÇÃO PERCENTUAL": -0.5,
+         "HORÁRIO": "2024-06-03 10:00:00", "TENDÊNCIA": "Caindo | Down", "LINK": "https://finance.yahoo.com/quote/VALE3.SA"},
+        {"EMPRESA": "Petrobras", "AÇÃO": "PETR4.SA", "COTAÇÃO": 38.7, "VARIAÇÃO PERCENTUAL": 0.0,
+         "HORÁRIO": "2024-06-03 10:00:10", "TENDÊNCIA": "Caindo | Down", "LINK": "https://finance.yahoo.com/quote/PETR4.SA"},
+    ],
+    "moedas": [
+        {"NOME": "Dólar", "MOEDA": "USD", "COTAÇÃO": 5.12, "VARIAÇÃO PERCENTUAL": 0.3,
+         "TENDÊNCIA": "Subindo | Up", "DATA E HORÁRIO": "2024-06-03 10:00:00"},
+        {"NOME": "Euro", "MOEDA": "EUR", "COTAÇÃO": 5.55, "VARIAÇÃO PERCENTUAL": -0.1,
+         "TENDÊNCIA": "Caindo | Down", "DATA E HORÁRIO": "2024-06-03 10:00:05"},
+    ],
+}
+
+
+@pytest.mark.parametrize("classe", ["acoes", "moedas"])
+def test_ipc_ida_e_volta(classe):
+    lote = LoteCotacoes.de_registros(classe, REGISTROS[classe])
+    tabela = ler_ipc(lote.para_ipc())
+
+    assert tabela.equals(lote.para_arrow())
+    assert tabela.column_names == list(COLUNAS_LOTE[classe].values())
+    coluna_horario = COLUNAS_LOTE[classe]["horario"]
+    for nome in tabela.column_names:
+        valores = tabela.column(nome).to_pylist()
+        if nome == coluna_horario:
+            valores = [horario.strftime("%Y-%m-%d %H:%M:%S") for horario in valores]
+        assert valores == [registro[nome] for registro in REGISTROS[classe]]
+
+def test_de_colunas_igual_a_de_registros():
+    registros = REGISTROS["acoes"]
+    por_registros = LoteCotacoes.de_registros("acoes", registros)
+    por_colunas = LoteCotacoes.de_colunas(
+        "acoes", [r["AÇÃO"] for r in registros], [r["COTAÇÃO"] for r in registros],
+        [r["VARIAÇÃO PERCENTUAL"] for r in registros], list(por_registros.horarios),
+        {r["AÇÃO"]: r["EMPRESA"] for r in registros}
+    )
+    assert ler_ipc(por_colunas.para_ipc()).equals(ler_ipc(por_registros.para_ipc()))
+    assert list(por_colunas) == registros
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from data_collector import calcular_variacoes
+
+
+def _variacoes_por_linha(fechamentos):
+    """
+    Cálculo de referência, símbolo a símbolo, com os dois últimos fechamentos válidos.
+    Reference computation, symbol by symbol, with the last two valid closes.
+    """
+    linhas = {}
+    for simbolo, serie in fechamentos.items():
+        validos = serie.dropna()
+        if len(validos) < 2:
+            continue
+        atual, anterior = validos.iloc[-1], validos.iloc[-2]
+        variacao = (atual - anterior) / anterior * 100
+        linhas[simbolo] = {
+            "atual": atual,
+            "anterior": anterior,
+            "pregao": validos.index[-1],
+            "variacao": variacao,
+            "tendencia": "Subindo | Up" if variacao > 0 else "Caindo | Down",
+        }
+    return pd.DataFrame.from_dict(linhas, orient="index")
+
+def test_calcular_variacoes_igual_ao_calculo_por_linha():
+    gerador = np.random.default_rng(7)
+    datas = pd.date_range("2024-06-03", periods=5, tz="America/Sao_Paulo")
+    precos = gerador.uniform(10, 100, size=(len(datas), 40))
+    # Feriados diferentes por mercado, símbolo só com um pregão e símbolo sem nenhum
+    # Different holidays per market, a symbol with a single session and one with none
+    precos[gerador.random(precos.shape) < 0.25] = np.nan
+    precos[:, 0] = [np.nan, np.nan, np.nan, np.nan, 50.0]
+    precos[:, 1] = np.nan
+    precos[:, 2] = [20.0, 20.0, 20.0, 20.0, 20.0]
+    fechamentos = pd.DataFrame(precos, index=datas, columns=[f"SIM{i:02d}" for i in range(precos.shape[1])])
+
+    esperado = _variacoes_por_linha(fechamentos)
+    resultado = calcular_variacoes(fechamentos)
+
+    assert sorted(resultado.index) == sorted(esperado.index)
+    assert {"SIM00", "SIM01"}.isdisjoint(resultado.index)
+    resultado = resultado.loc[esperado.index]
+    for coluna in ("atual", "anterior", "variacao"):
+        np.testing.assert_allclose(resultado[coluna].to_numpy(dtype=float), esperado[coluna].to_numpy(dtype=float))
+    assert list(resultado["pregao"]) == list(esperado["pregao"])
+    assert list(resultado["tendencia"]) == list(esperado["tendencia"])
+    # Variação zero não é alta | Zero change is not up
+    assert resultado.loc["SIM02", "tendencia"] == "Caindo | Down"
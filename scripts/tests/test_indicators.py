@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from indicators import JanelaMovel
+
+
+@pytest.mark.parametrize("tamanho", [1, 5, 20])
+def test_janela_movel_igual_ao_rolling_do_pandas(tamanho):
+    gerador = np.random.default_rng(3)
+    # Valores repetidos exercitam os empates das deques de mínimo e máximo
+    # Repeated values exercise the ties of the min and max deques
+    valores = np.round(100 + gerador.normal(0, 5, 300).cumsum(), 0)
+    janela = JanelaMovel(tamanho)
+    medias, desvios, minimos, maximos = [], [], [], []
+    for valor in valores:
+        janela.adicionar(float(valor))
+        medias.append(janela.media)
+        desvios.append(janela.desvio)
+        minimos.append(janela.minimo)
+        maximos.append(janela.maximo)
+
+    rolante = pd.Series(valores).rolling(tamanho, min_periods=1)
+    np.testing.assert_allclose(medias, rolante.mean(), rtol=1e-9)
+    np.testing.assert_allclose(desvios, rolante.std(), rtol=1e-6, atol=1e-9)
+    np.testing.assert_array_equal(minimos, rolante.min())
+    np.testing.assert_array_equal(maximos, rolante.max())
+    assert janela.cheia
+
+@pytest.mark.parametrize("deslocamento", [0, 7, 13])
+def test_janela_movel_estavel_apos_mudanca_de_patamar(deslocamento):
+    tamanho = 20
+    gerador = np.random.default_rng(11)
+    janela = JanelaMovel(tamanho)
+    # Muitas atualizações em um patamar alto, depois um patamar baixo
+    # Many updates at a high level, then a low level
+    for valor in 1e6 + gerador.normal(0, 1e3, 200000 + deslocamento):
+        janela.adicionar(float(valor))
+    for _ in range(tamanho):
+        janela.adicionar(1.0)
+    assert janela.media == pytest.approx(1.0, abs=1e-12)
+    assert janela.desvio == pytest.approx(0.0, abs=1e-12)
+
+    baixos = 1.0 + gerador.normal(0, 1e-3, 3 * tamanho)
+    for indice, valor in enumerate(baixos, start=1):
+        janela.adicionar(float(valor))
+        ultimos = baixos[max(0, indice - tamanho):indice]
+        ultimos = np.concatenate([np.ones(tamanho - len(ultimos)), ultimos])
+        assert janela.media == pytest.approx(ultimos.mean(), rel=1e-12)
+        assert janela.desvio == pytest.approx(ultimos.std(ddof=1), rel=1e-6)
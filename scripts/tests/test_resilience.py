@@ -0,0 +1,54 @@
+import time
+from resilience import Disjuntor
+
+
+def _abrir(disjuntor):
+    for _ in range(disjuntor.falhas_para_abrir):
+        assert disjuntor.permitir()
+        disjuntor.registrar_falha()
+
+def test_disjuntor_abre_apos_falhas_seguidas():
+    disjuntor = Disjuntor("teste", falhas_para_abrir=3, tempo_aberto=60)
+    disjuntor.registrar_falha()
+    disjuntor.registrar_falha()
+    # Um sucesso zera as falhas seguidas | A success resets the consecutive failures
+    disjuntor.registrar_sucesso()
+    disjuntor.registrar_falha()
+    disjuntor.registrar_falha()
+    assert disjuntor.estado == "fechado"
+
+    disjuntor.registrar_falha()
+    assert disjuntor.estado == "aberto"
+    assert not disjuntor.permitir()
+    assert disjuntor.metricas() == {"estado": "aberto", "falhas": 3, "aberturas": 1, "rejeicoes": 1}
+
+def test_disjuntor_meio_aberto_deixa_passar_um_teste():
+    disjuntor = Disjuntor("teste", falhas_para_abrir=2, tempo_aberto=0.05)
+    _abrir(disjuntor)
+    time.sleep(0.06)
+
+    assert disjuntor.permitir()
+    assert disjuntor.estado == "meio_aberto"
+    # Só uma requisição de teste por vez | Only one probe request at a time
+    assert not disjuntor.permitir()
+
+    disjuntor.registrar_sucesso()
+    assert disjuntor.estado == "fechado"
+    assert disjuntor.permitir()
+
+def test_disjuntor_reabre_se_o_teste_falhar():
+    disjuntor = Disjuntor("teste", falhas_para_abrir=2, tempo_aberto=0.05)
+    _abrir(disjuntor)
+    time.sleep(0.06)
+
+    assert disjuntor.permitir()
+    disjuntor.registrar_falha()
+    assert disjuntor.estado == "aberto"
+    assert not disjuntor.permitir()
+    assert disjuntor.metricas()["aberturas"] == 2
+
+    time.sleep(0.06)
+    assert disjuntor.permitir()
+    disjuntor.registrar_sucesso()
+    assert disjuntor.metricas()["estado"] == "fechado"
+    assert disjuntor.metricas()["falhas"] == 0